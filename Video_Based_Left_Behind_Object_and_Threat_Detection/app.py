@@ -3,7 +3,7 @@ Flask API for Video-Based Left Behind Object and Threat Detection System
 Provides REST API endpoints for Laravel integration
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 import cv2
 import numpy as np
@@ -11,8 +11,11 @@ import base64
 import logging
 import os
 import sys
+import threading
+import time
 from pathlib import Path
 from datetime import datetime
+from typing import Optional
 import yaml
 
 # Add src to path
@@ -20,7 +23,14 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from src.models.object_detector import LeftBehindObjectDetector
 from src.models.threat_detector import ThreatDetector
+from src.models.threat_scheduler import ThreatScheduler, person_boxes
+from src.models.detection_zones import DetectionZones
 from src.tracking.object_tracker import ObjectTracker
+from src.runtime.sessions import CameraSession, SessionRegistry
+from src.runtime.stream_pull import EventBroker, StreamPullWorker
+from src.runtime.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, pipeline_metrics
+from src.runtime.supervisor import camera_source
+from src.video.frame_grabber import LatestFrameGrabber
 
 # Setup logging
 logging.basicConfig(
@@ -43,12 +53,22 @@ class FlaskConfig:
 # Global instances
 object_detector = None
 threat_detector = None
-object_tracker = None
+sessions = None  # SessionRegistry: tracker and threat clip per camera_id
 config = None
+event_broker = EventBroker()  # SSE subscribers per camera_id
+stream_workers = {}  # camera_id -> StreamPullWorker (stream pull mode)
+metrics = pipeline_metrics  # Stage timers and counters served at /metrics
+
+# Cameras that do not send a camera_id share this session
+DEFAULT_CAMERA_ID = 'default'
+
+# The detector is shared by all camera sessions; ultralytics models are
+# not safe to call from several request threads at once
+detector_lock = threading.Lock()
 
 def initialize_models():
     """Initialize detection models"""
-    global object_detector, threat_detector, object_tracker, config
+    global object_detector, threat_detector, sessions, config
     
     try:
         # Load configuration
@@ -67,7 +87,10 @@ def initialize_models():
             object_detector = LeftBehindObjectDetector(
                 model_path=obj_weights,
                 confidence_threshold=config['object_detection']['model']['confidence_threshold'],
-                target_classes=config['object_detection']['target_classes']
+                target_classes=config['object_detection']['target_classes'],
+                model_type=config['object_detection']['model'].get('type', 'yolov8'),
+                input_size=config['object_detection']['model'].get('input_size', [640, 640]),
+                scale_up=config['object_detection']['model'].get('scale_up', True)
             )
         except Exception as inner_e:
             logger.error(f"Failed to initialize LeftBehindObjectDetector with {obj_weights}: {inner_e}")
@@ -80,13 +103,18 @@ def initialize_models():
             if threat_weights and not (Path(__file__).parent / threat_weights).exists():
                 logger.warning(f"Threat model weights not found at {threat_weights}, continuing with fallback model")
                 threat_weights = None
+            quantized_weights = config['threat_detection']['model'].get('quantized_weights')
+            if quantized_weights and not (Path(__file__).parent / quantized_weights).exists():
+                logger.warning(f"Quantized threat model not found at {quantized_weights}, using FP32")
+                quantized_weights = None
 
             try:
                 threat_detector = ThreatDetector(
                     model_path=threat_weights,
                     model_type=config['threat_detection']['model']['type'],
                     confidence_threshold=config['threat_detection']['model']['confidence_threshold'],
-                    clip_length=config['threat_detection']['model']['clip_length']
+                    clip_length=config['threat_detection']['model']['clip_length'],
+                    quantized_model_path=quantized_weights
                 )
             except Exception as inner_e:
                 logger.error(f"Failed to initialize ThreatDetector: {inner_e}")
@@ -95,13 +123,14 @@ def initialize_models():
             logger.warning("Threat detection is DISABLED via ENABLE_THREAT_DETECTION=False")
             threat_detector = None
 
-        logger.info("Initializing object tracker...")
-        object_tracker = ObjectTracker(
-            iou_threshold=config['tracking']['iou_threshold'],
-            max_age=config['tracking']['max_age'],
-            min_hits=config['tracking']['min_hits'],
-            left_behind_threshold_minutes=config['object_detection']['left_behind_threshold']
+        # Trackers and threat clips are created per camera on first use
+        session_config = config['performance'].get('api_sessions', {})
+        sessions = SessionRegistry(
+            create_session,
+            idle_timeout=session_config.get('idle_timeout', 600),
+            max_sessions=session_config.get('max_sessions')
         )
+        event_broker.queue_size = config['performance'].get('stream_pull', {}).get('queue_size', 64)
 
         logger.info("Model initialization complete (some components may be fallback or unavailable)")
         return True
@@ -109,6 +138,253 @@ def initialize_models():
         logger.error(f"Error initializing models: {e}")
         return False
 
+# Camera metadata accepted with raw JPEG uploads: query parameter -> header
+FRAME_METADATA = {
+    'camera_id': 'X-Camera-Id',
+    'timestamp': 'X-Frame-Timestamp',
+    'frame_index': 'X-Frame-Index'
+}
+
+
+def decode_jpeg(buffer) -> Optional[np.ndarray]:
+    """Decode JPEG bytes into a BGR frame (None if the data is not an image)"""
+    if not buffer:
+        return None
+    return cv2.imdecode(np.frombuffer(buffer, np.uint8), cv2.IMREAD_COLOR)
+
+
+def read_base64_frame(req):
+    """
+    Decode the base64 'frame' field of a JSON request
+
+    Returns:
+        Tuple of (frame or None, error message or None)
+    """
+    data = req.get_json(silent=True)
+    if not data or 'frame' not in data:
+        return None, 'No frame data provided'
+
+    frame = decode_jpeg(base64.b64decode(data['frame']))
+    if frame is None:
+        return None, 'Invalid frame data'
+    return frame, None
+
+
+def read_jpeg_frame(req):
+    """
+    Decode a raw JPEG upload without JSON parsing or base64
+
+    Accepts an ``image/jpeg`` body (read straight from the request stream)
+    or a multipart form with the image in a ``frame`` (or the first) file field.
+
+    Returns:
+        Tuple of (frame or None, error message or None)
+    """
+    if req.mimetype == 'multipart/form-data':
+        upload = req.files.get('frame') or next(iter(req.files.values()), None)
+        if upload is None:
+            return None, 'No frame file provided'
+        buffer = upload.stream.read()
+    elif req.mimetype in ('image/jpeg', 'image/jpg', 'application/octet-stream'):
+        buffer = req.get_data(cache=False)
+    else:
+        return None, f"Unsupported content type: {req.mimetype or 'none'}"
+
+    if not buffer:
+        return None, 'No frame data provided'
+
+    frame = decode_jpeg(buffer)
+    if frame is None:
+        return None, 'Invalid frame data'
+    return frame, None
+
+
+def frame_metadata(req) -> dict:
+    """Camera metadata of a raw JPEG upload (headers take precedence over the query string)"""
+    metadata = {}
+    for key, header in FRAME_METADATA.items():
+        value = req.headers.get(header) or req.args.get(key)
+        if value is not None:
+            metadata[key] = value
+    return metadata
+
+
+def request_camera_id(req) -> str:
+    """camera_id from the JSON body, X-Camera-Id header or query string"""
+    data = req.get_json(silent=True) if req.is_json else None
+    camera_id = (data or {}).get('camera_id') or frame_metadata(req).get('camera_id')
+    return str(camera_id) if camera_id else DEFAULT_CAMERA_ID
+
+
+def create_session(camera_id: str) -> CameraSession:
+    """Build the tracker, threat stream and detection zones for a new camera"""
+    tracker = ObjectTracker(
+        iou_threshold=config['tracking']['iou_threshold'],
+        max_age=config['tracking']['max_age'],
+        min_hits=config['tracking']['min_hits'],
+        left_behind_threshold_minutes=config['object_detection']['left_behind_threshold']
+    )
+
+    # Run clip inference every few frames instead of every frame, on this
+    # camera's own clip buffer (the model itself is shared)
+    threat_stream = None
+    if threat_detector is not None:
+        threat_stream = ThreatScheduler.from_config(
+            threat_detector.spawn_stream(),
+            config['threat_detection'].get('scheduler', {}),
+            config['threat_detection'].get('person_gate', {})
+        )
+
+    zones = None
+    zone_config = config['object_detection'].get('detection_zones', {})
+    camera = next((cam for cam in config.get('cameras', []) if cam['id'] == camera_id), None)
+    if zone_config.get('enabled', False) and camera is not None:
+        zones = DetectionZones.from_camera(camera, margin=zone_config.get('crop_margin', 0))
+
+    return CameraSession(camera_id, tracker, threat_stream, zones=zones)
+
+
+def run_object_detection(frame, session: CameraSession) -> dict:
+    """Detect and track objects in a decoded frame for one camera"""
+    # Only the camera's detection zones are analysed
+    zones = session.zones
+    region, offset = zones.crop(frame) if zones is not None else (frame, (0, 0))
+
+    # Detect objects
+    with detector_lock:
+        with metrics.time('inference', session.camera_id):
+            detections = object_detector.detect(region)
+
+    # Filter by minimum size
+    min_size = config['object_detection']['min_object_size']
+    detections = object_detector.filter_by_size(detections, min_size)
+    if zones is not None:
+        detections = zones.filter(zones.to_frame(detections, offset))
+
+    with metrics.time('tracking', session.camera_id):
+        # Update this camera's tracker
+        tracked_objects = session.tracker.update(detections)
+
+        # Get left-behind objects
+        left_behind = session.tracker.get_left_behind_objects()
+
+    metrics.frames.inc(camera_id=session.camera_id)
+    metrics.observe_tracks(session.camera_id, tracked_objects, left_behind)
+
+    return {
+        'detections': [
+            {
+                'bbox': obj.bbox.tolist() if hasattr(obj.bbox, 'tolist') else obj.bbox,
+                'class_name': obj.class_name,
+                'confidence': float(obj.confidence),
+                'track_id': obj.track_id,
+                'is_left_behind': obj.is_left_behind,
+                'time_stationary': obj.time_stationary
+            }
+            for obj in tracked_objects
+        ],
+        'left_behind_count': len(left_behind),
+        'total_objects': len(tracked_objects),
+        '_tracked_objects': tracked_objects
+    }
+
+
+def detect_threats_timed(session: CameraSession, frame, person_boxes=None) -> dict:
+    """Run a camera's threat scheduler, timing the frames where the clip model ran"""
+    start = time.perf_counter()
+    result = session.threat_stream.detect(frame, person_boxes=person_boxes)
+    if result.get('fresh'):
+        metrics.stage_seconds.observe(
+            time.perf_counter() - start, stage='threat_inference', camera_id=session.camera_id
+        )
+    metrics.observe_threat_stream(session.camera_id, session.threat_stream)
+    return result
+
+
+def run_frame_processing(frame, session: CameraSession) -> dict:
+    """Run object and threat detection on a decoded frame for one camera"""
+    objects = run_object_detection(frame, session)
+    tracked_objects = objects.pop('_tracked_objects')
+
+    # Detect threats (with error handling)
+    threat_result = {
+        'is_threat': False,
+        'threat_type': None,
+        'confidence': 0.0,
+        'all_scores': {},
+        'status': 'disabled'
+    }
+
+    if session.threat_stream is not None:
+        try:
+            threat_result = detect_threats_timed(
+                session, frame, person_boxes=person_boxes(tracked_objects)
+            )
+        except Exception as threat_error:
+            logger.error(f"Threat detection failed: {threat_error}")
+            threat_result['status'] = 'error'
+            threat_result['error'] = str(threat_error)
+
+    return {
+        'success': True,
+        'camera_id': session.camera_id,
+        'objects': objects,
+        'threats': threat_result
+    }
+
+
+def process_stream_frame(camera_id: str, frame) -> dict:
+    """Process a frame pulled from a camera stream in that camera's session"""
+    with sessions.session(camera_id) as session:
+        return run_frame_processing(frame, session)
+
+
+def start_stream_workers() -> int:
+    """
+    Start pulling the configured camera streams in background workers
+
+    Returns:
+        Number of workers started
+    """
+    pull_config = config['performance'].get('stream_pull', {})
+    capture_config = config['performance'].get('capture', {})
+    selected = pull_config.get('cameras')
+
+    started = 0
+    for camera in config.get('cameras', []):
+        if not camera.get('enabled', True) or camera['id'] in stream_workers:
+            continue
+        if selected is not None and camera['id'] not in selected:
+            continue
+
+        grabber = LatestFrameGrabber(
+            camera_source(camera),
+            camera_id=camera['id'],
+            buffer_size=capture_config.get('buffer_size', 1),
+            read_timeout=capture_config.get('read_timeout', 5.0),
+            reconnect_delay=capture_config.get('reconnect_delay', 1.0),
+            max_reconnect_delay=capture_config.get('max_reconnect_delay', 30.0),
+            target_fps=pull_config.get('target_fps'),
+            decode_skipped=not capture_config.get('decode_skip', True)
+        )
+        worker = StreamPullWorker(
+            camera['id'], grabber, process_stream_frame, event_broker, metrics=metrics
+        )
+        worker.start()
+        stream_workers[camera['id']] = worker
+        started += 1
+
+    logger.info(f"Pulling {started} camera stream(s)")
+    return started
+
+
+def stop_stream_workers():
+    """Stop all stream pull workers"""
+    for worker in stream_workers.values():
+        worker.stop()
+    stream_workers.clear()
+
+
 def create_app():
     """Create and configure Flask application"""
     app = Flask(__name__)
@@ -120,6 +396,11 @@ def create_app():
     # Initialize models on startup
     with app.app_context():
         initialize_models()
+
+    # Optionally pull the camera streams here instead of waiting for pushed frames
+    if config is not None and object_detector is not None and \
+            config.get('performance', {}).get('stream_pull', {}).get('enabled', False):
+        start_stream_workers()
     
     @app.route('/')
     def index():
@@ -132,7 +413,13 @@ def create_app():
                 'status': 'GET /api/video/status',
                 'detect_objects': 'POST /api/video/detect-objects',
                 'detect_threats': 'POST /api/video/detect-threats',
-                'process_frame': 'POST /api/video/process-frame'
+                'process_frame': 'POST /api/video/process-frame',
+                'detect_objects_jpeg': 'POST /api/video/jpeg/detect-objects',
+                'detect_threats_jpeg': 'POST /api/video/jpeg/detect-threats',
+                'process_frame_jpeg': 'POST /api/video/jpeg/process-frame',
+                'streams': 'GET /api/video/streams',
+                'stream_events': 'GET /api/video/streams/<camera_id>/events',
+                'metrics': 'GET /metrics'
             }
         })
     
@@ -152,176 +439,149 @@ def create_app():
             'status': 'active',
             'object_detector_loaded': object_detector is not None,
             'threat_detector_loaded': threat_detector is not None,
-            'tracker_active': object_tracker is not None,
-            'config_loaded': config is not None
+            'tracker_active': sessions is not None,
+            'config_loaded': config is not None,
+            'sessions': sessions.stats() if sessions is not None else None,
+            'stream_workers': len(stream_workers)
         })
-    
-    @app.route('/api/video/detect-objects', methods=['POST'])
-    def detect_objects():
-        """Detect left-behind objects in frame"""
+
+    def detect_objects_response(read_frame, metadata: Optional[dict] = None):
+        """Shared body of the base64 and JPEG object detection endpoints"""
         try:
             # Ensure object detector is available
             if object_detector is None:
                 logger.error("Object detector not initialized")
                 return jsonify({'success': False, 'error': 'Object detector not initialized'}), 503
 
-            data = request.get_json()
-            
-            if not data or 'frame' not in data:
-                return jsonify({'success': False, 'error': 'No frame data provided'}), 400
-            
-            # Decode base64 frame
-            frame_data = base64.b64decode(data['frame'])
-            nparr = np.frombuffer(frame_data, np.uint8)
-            frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            
+            camera_id = request_camera_id(request)
+            with metrics.time('decode', camera_id):
+                frame, error = read_frame(request)
             if frame is None:
-                return jsonify({'success': False, 'error': 'Invalid frame data'}), 400
-            
-            # Detect objects
-            detections = object_detector.detect(frame)
-
-            # Filter by minimum size
-            min_size = config['object_detection']['min_object_size']
-            detections = object_detector.filter_by_size(detections, min_size)
-
-            # Update tracker
-            tracked_objects = object_tracker.update(detections)
-
-            # Get left-behind objects
-            left_behind = object_tracker.get_left_behind_objects()
-
-            # Prepare response
-            result = {
-                'success': True,
-                'detections': [
-                    {
-                        'bbox': obj.bbox.tolist() if hasattr(obj.bbox, 'tolist') else obj.bbox,
-                        'class_name': obj.class_name,
-                        'confidence': float(obj.confidence),
-                        'track_id': obj.track_id,
-                        'is_left_behind': obj.is_left_behind,
-                        'time_stationary': obj.time_stationary
-                    }
-                    for obj in tracked_objects
-                ],
-                'left_behind_count': len(left_behind),
-                'total_objects': len(tracked_objects)
-            }
-
+                return jsonify({'success': False, 'error': error}), 400
+
+            with sessions.session(camera_id) as session:
+                result = run_object_detection(frame, session)
+            result.pop('_tracked_objects')
+            result = dict(success=True, camera_id=session.camera_id, **result)
+            if metadata:
+                result['metadata'] = metadata
             return jsonify(result)
 
         except Exception as e:
             logger.error(f"Error detecting objects: {e}")
             return jsonify({'success': False, 'error': str(e)}), 500
 
-    @app.route('/api/video/detect-threats', methods=['POST'])
-    def detect_threats():
-        """Detect threats in frame"""
+    def detect_threats_response(read_frame, metadata: Optional[dict] = None):
+        """Shared body of the base64 and JPEG threat detection endpoints"""
         try:
             # Ensure threat detector is available
             if threat_detector is None:
                 logger.error("Threat detector not initialized")
                 return jsonify({'success': False, 'error': 'Threat detector not initialized'}), 503
 
-            data = request.get_json()
-
-            if not data or 'frame' not in data:
-                return jsonify({'success': False, 'error': 'No frame data provided'}), 400
-
-            # Decode base64 frame
-            frame_data = base64.b64decode(data['frame'])
-            nparr = np.frombuffer(frame_data, np.uint8)
-            frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-
+            camera_id = request_camera_id(request)
+            with metrics.time('decode', camera_id):
+                frame, error = read_frame(request)
             if frame is None:
-                return jsonify({'success': False, 'error': 'Invalid frame data'}), 400
+                return jsonify({'success': False, 'error': error}), 400
 
-            # Detect threats
-            result = threat_detector.detect(frame)
+            # Detect threats on this camera's clip
+            with sessions.session(camera_id) as session:
+                result = detect_threats_timed(session, frame)
 
-            return jsonify({
+            response = {
                 'success': True,
+                'camera_id': session.camera_id,
                 'result': result
-            })
+            }
+            if metadata:
+                response['metadata'] = metadata
+            return jsonify(response)
 
         except Exception as e:
             logger.error(f"Error detecting threats: {e}")
             return jsonify({'success': False, 'error': str(e)}), 500
 
-    @app.route('/api/video/process-frame', methods=['POST'])
-    def process_frame():
-        """Process frame for both objects and threats"""
+    def process_frame_response(read_frame, metadata: Optional[dict] = None):
+        """Shared body of the base64 and JPEG full processing endpoints"""
         try:
             # Ensure detectors are available
             if object_detector is None and threat_detector is None:
                 logger.error("No detectors initialized (objects and threats)")
                 return jsonify({'success': False, 'error': 'No detectors initialized'}), 503
 
-            data = request.get_json()
-
-            if not data or 'frame' not in data:
-                return jsonify({'success': False, 'error': 'No frame data provided'}), 400
-
-            # Decode base64 frame
-            frame_data = base64.b64decode(data['frame'])
-            nparr = np.frombuffer(frame_data, np.uint8)
-            frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-
+            camera_id = request_camera_id(request)
+            with metrics.time('decode', camera_id):
+                frame, error = read_frame(request)
             if frame is None:
-                return jsonify({'success': False, 'error': 'Invalid frame data'}), 400
-
-            # Detect objects
-            detections = object_detector.detect(frame)
-            min_size = config['object_detection']['min_object_size']
-            detections = object_detector.filter_by_size(detections, min_size)
-            tracked_objects = object_tracker.update(detections)
-            left_behind = object_tracker.get_left_behind_objects()
-
-            # Detect threats (with error handling)
-            threat_result = {
-                'is_threat': False,
-                'threat_type': None,
-                'confidence': 0.0,
-                'all_scores': {},
-                'status': 'disabled'
-            }
-
-            if threat_detector is not None:
-                try:
-                    threat_result = threat_detector.detect(frame)
-                except Exception as threat_error:
-                    logger.error(f"Threat detection failed: {threat_error}")
-                    threat_result['status'] = 'error'
-                    threat_result['error'] = str(threat_error)
-
-            # Prepare response
-            result = {
-                'success': True,
-                'objects': {
-                    'detections': [
-                        {
-                            'bbox': obj.bbox.tolist() if hasattr(obj.bbox, 'tolist') else obj.bbox,
-                            'class_name': obj.class_name,
-                            'confidence': float(obj.confidence),
-                            'track_id': obj.track_id,
-                            'is_left_behind': obj.is_left_behind,
-                            'time_stationary': obj.time_stationary
-                        }
-                        for obj in tracked_objects
-                    ],
-                    'left_behind_count': len(left_behind),
-                    'total_objects': len(tracked_objects)
-                },
-                'threats': threat_result
-            }
+                return jsonify({'success': False, 'error': error}), 400
 
+            with sessions.session(camera_id) as session:
+                result = run_frame_processing(frame, session)
+            if metadata:
+                result['metadata'] = metadata
             return jsonify(result)
 
         except Exception as e:
             logger.error(f"Error processing frame: {e}")
             return jsonify({'success': False, 'error': str(e)}), 500
 
+    @app.route('/api/video/detect-objects', methods=['POST'])
+    def detect_objects():
+        """Detect left-behind objects in frame (base64 JSON)"""
+        return detect_objects_response(read_base64_frame)
+
+    @app.route('/api/video/detect-threats', methods=['POST'])
+    def detect_threats():
+        """Detect threats in frame (base64 JSON)"""
+        return detect_threats_response(read_base64_frame)
+
+    @app.route('/api/video/process-frame', methods=['POST'])
+    def process_frame():
+        """Process frame for both objects and threats (base64 JSON)"""
+        return process_frame_response(read_base64_frame)
+
+    @app.route('/api/video/jpeg/detect-objects', methods=['POST'])
+    def detect_objects_jpeg():
+        """Detect left-behind objects in a raw JPEG upload"""
+        return detect_objects_response(read_jpeg_frame, frame_metadata(request))
+
+    @app.route('/api/video/jpeg/detect-threats', methods=['POST'])
+    def detect_threats_jpeg():
+        """Detect threats in a raw JPEG upload"""
+        return detect_threats_response(read_jpeg_frame, frame_metadata(request))
+
+    @app.route('/api/video/jpeg/process-frame', methods=['POST'])
+    def process_frame_jpeg():
+        """Process a raw JPEG upload for both objects and threats"""
+        return process_frame_response(read_jpeg_frame, frame_metadata(request))
+
+    @app.route('/api/video/streams', methods=['GET'])
+    def streams():
+        """Status of the stream pull workers and SSE subscribers"""
+        return jsonify({
+            'workers': {camera_id: worker.stats() for camera_id, worker in stream_workers.items()},
+            'events': event_broker.stats()
+        })
+
+    @app.route('/api/video/streams/<camera_id>/events', methods=['GET'])
+    def stream_events(camera_id):
+        """Server-Sent Events with a pulled camera's results"""
+        if camera_id not in stream_workers:
+            return jsonify({'success': False, 'error': f"Camera {camera_id} is not being pulled"}), 404
+
+        keepalive = config['performance'].get('stream_pull', {}).get('keepalive', 15)
+        return Response(
+            stream_with_context(event_broker.stream(camera_id, keepalive=keepalive)),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics_endpoint():
+        """Stage latencies, frame/drop/alert counters and track/buffer gauges (Prometheus format)"""
+        return Response(metrics.render(), content_type=METRICS_CONTENT_TYPE)
+
     @app.errorhandler(404)
     def not_found(error):
         return jsonify({'error': 'Endpoint not found'}), 404
@@ -344,6 +604,9 @@ if __name__ == '__main__':
     print("   - POST /api/video/detect-objects  Detect Objects")
     print("   - POST /api/video/detect-threats  Detect Threats")
     print("   - POST /api/video/process-frame   Process Complete Frame")
+    print("   - POST /api/video/jpeg/...        Same, with raw JPEG bodies")
+    print("   - GET  /api/video/streams         Stream Pull Workers")
+    print("   - GET  /api/video/streams/<id>/events  Camera Results (SSE)")
     print("=" * 60 + "\n")
 
     app = create_app()
@@ -4,19 +4,31 @@ Integrates all components: object detection, threat detection, tracking, and ale
 """
 
 import cv2
+import time
 import yaml
 import logging
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple, Callable
+from collections import defaultdict
 import argparse
 from dotenv import load_dotenv
 import os
 
 from src.models.object_detector import LeftBehindObjectDetector
 from src.models.threat_detector import ThreatDetector
+from src.models.detection_zones import DetectionZones
+from src.models.threat_scheduler import ThreatScheduler, person_boxes
 from src.tracking.object_tracker import ObjectTracker
 from src.notifications.alert_system import AlertSystem
+from src.notifications.alert_dispatcher import AlertDispatcher
+from src.notifications.snapshots import SnapshotPipeline
+from src.runtime.load_governor import LoadGovernor
+from src.runtime.metrics import PipelineMetrics, pipeline_metrics, start_metrics_server
+from src.runtime.supervisor import CameraSupervisor, QueueAlertSink, camera_source
+from src.video.frame_grabber import LatestFrameGrabber
+from src.video.motion_gate import MotionGate
+from src.video.replay import ReplayClock, replay_frames
 
 # Setup logging
 logging.basicConfig(
@@ -35,13 +47,31 @@ class SchoolSecuritySystem:
     Main system integrating all components
     """
     
-    def __init__(self, config_path: str = "config/config.yaml"):
+    def __init__(
+        self,
+        config_path: str = "config/config.yaml",
+        alert_system=None,
+        object_detector=None,
+        clock: Optional[Callable[[], datetime]] = None,
+        metrics: Optional[PipelineMetrics] = None
+    ):
         """
         Initialize the security system
         
         Args:
             config_path: Path to configuration file
+            alert_system: Alert delivery object (defaults to an AlertSystem
+                built from SMTP environment variables)
+            object_detector: Detector to use instead of loading the YOLO
+                model (e.g. a RemoteDetector backed by batched inference)
+            clock: Time source for tracking and results (defaults to the
+                wall clock; a ReplayClock replays recordings by frame PTS)
+            metrics: Stage timers and counters (defaults to the process-wide
+                metrics served at /metrics)
         """
+        self.config_path = config_path
+        self.clock = clock or datetime.now
+        self.metrics = metrics or pipeline_metrics
         logger.info("Initializing School Security System...")
         
         # Load configuration
@@ -51,50 +81,135 @@ class SchoolSecuritySystem:
         # Load environment variables
         load_dotenv()
         
-        # Initialize object detector
-        logger.info("Loading object detection model...")
-        self.object_detector = LeftBehindObjectDetector(
-            model_path=self.config['object_detection']['model']['weights'],
-            confidence_threshold=self.config['object_detection']['model']['confidence_threshold'],
-            target_classes=self.config['object_detection']['target_classes']
-        )
-        
-        # Initialize threat detector
-        logger.info("Loading threat detection model...")
-        self.threat_detector = ThreatDetector(
-            model_path=self.config['threat_detection']['model']['weights'],
-            model_type=self.config['threat_detection']['model']['type'],
-            confidence_threshold=self.config['threat_detection']['model']['confidence_threshold'],
-            clip_length=self.config['threat_detection']['model']['clip_length']
-        )
+        # Models are loaded on first use: a supervising process only hands
+        # cameras to workers and never runs them (unless it batches detection)
+        self._object_detector = object_detector
+        self._threat_detector: Optional[ThreatDetector] = None
         
-        # Initialize object tracker
-        logger.info("Initializing object tracker...")
-        self.object_tracker = ObjectTracker(
-            iou_threshold=self.config['tracking']['iou_threshold'],
-            max_age=self.config['tracking']['max_age'],
-            min_hits=self.config['tracking']['min_hits'],
-            left_behind_threshold_minutes=self.config['object_detection']['left_behind_threshold']
-        )
+        # Per-camera state: each camera gets its own tracker and threat buffer
+        self.object_trackers: Dict[str, ObjectTracker] = {}
+        self.threat_streams: Dict[str, ThreatDetector] = {}
         
         # Initialize alert system
-        logger.info("Initializing alert system...")
-        self.alert_system = AlertSystem(
-            smtp_server=os.getenv('SMTP_SERVER'),
-            smtp_port=int(os.getenv('SMTP_PORT', 587)),
-            smtp_username=os.getenv('SMTP_USERNAME'),
-            smtp_password=os.getenv('SMTP_PASSWORD'),
-            from_email=os.getenv('SMTP_USERNAME')
-        )
+        if alert_system is None:
+            logger.info("Initializing alert system...")
+            # Alerts are delivered in the background so a slow mail server
+            # never stalls frame processing
+            dispatch_config = self.config['notifications'].get('dispatch', {})
+            dispatcher = None
+            if dispatch_config.get('enabled', False):
+                dispatcher = AlertDispatcher.from_config(dispatch_config)
+                dispatcher.start()
+            alert_system = AlertSystem(
+                smtp_server=os.getenv('SMTP_SERVER'),
+                smtp_port=int(os.getenv('SMTP_PORT', 587)),
+                smtp_username=os.getenv('SMTP_USERNAME'),
+                smtp_password=os.getenv('SMTP_PASSWORD'),
+                from_email=os.getenv('SMTP_USERNAME'),
+                smtp_pool_size=dispatch_config.get('smtp_pool_size', 2),
+                dispatcher=dispatcher
+            )
+        self.alert_system = alert_system
+
+        # Alert snapshots are encoded once and saved in the background
+        self.snapshots = SnapshotPipeline.from_config(self.config['storage'])
+        self.snapshots.start()
         
         # Camera configurations
         self.cameras = {cam['id']: cam for cam in self.config['cameras'] if cam['enabled']}
         
-        # Frame skip for performance
+        # Frame sampling for performance: every Nth frame, or by timestamp at
+        # target_fps. Skipped frames are grabbed but never decoded.
         self.frame_skip = self.config['performance']['frame_skip']
-        self.frame_count = 0
+        self.target_fps = self.config['performance'].get('target_fps')
+        self.frame_counts: Dict[str, int] = defaultdict(int)
+
+        # Background capture per camera (always hands out the newest frame)
+        self.capture_config = self.config['performance'].get('capture', {})
+        self.frame_grabbers: Dict[str, LatestFrameGrabber] = {}
+
+        # Trade frame rate and detector input size for keeping up under load
+        # (built with the first camera, as it governs the object detector)
+        self.governor_config = self.config['performance'].get('load_governor', {})
+        self._governor: Optional[LoadGovernor] = None
+
+        # Skip object detection on unchanged frames (reusing the last detections)
+        self.motion_gate_config = self.config['performance'].get('motion_gate', {})
+        self.motion_gates: Dict[str, MotionGate] = {}
+        self.last_detections: Dict[str, List[Dict]] = {}
+
+        # Per-camera detection_zones: crop inference and drop detections outside them
+        self.zone_config = self.config['object_detection'].get('detection_zones', {})
+        self.detection_zones: Dict[str, Optional[DetectionZones]] = {}
         
         logger.info("System initialized successfully!")
+
+    @property
+    def object_detector(self) -> LeftBehindObjectDetector:
+        """Object detection model (loaded on first access)"""
+        if self._object_detector is None:
+            logger.info("Loading object detection model...")
+            self._object_detector = LeftBehindObjectDetector.from_config(self.config['object_detection'])
+        return self._object_detector
+
+    @property
+    def governor(self) -> Optional[LoadGovernor]:
+        """Load governor (None if disabled; built on first access)"""
+        if self._governor is None and self.governor_config.get('enabled', False):
+            self._governor = LoadGovernor.from_config(
+                self.governor_config, self.object_detector, self.metrics,
+                default_max_fps=self.target_fps
+            )
+        return self._governor
+
+    @property
+    def threat_detector(self) -> ThreatDetector:
+        """Threat detection model (loaded on first access)"""
+        if self._threat_detector is None:
+            logger.info("Loading threat detection model...")
+            self._threat_detector = ThreatDetector.from_config(self.config['threat_detection'])
+        return self._threat_detector
+
+    def get_tracker(self, camera_id: str) -> ObjectTracker:
+        """Get (or create) the object tracker for a camera"""
+        if camera_id not in self.object_trackers:
+            logger.info(f"Initializing object tracker for camera {camera_id}...")
+            self.object_trackers[camera_id] = ObjectTracker(
+                iou_threshold=self.config['tracking']['iou_threshold'],
+                max_age=self.config['tracking']['max_age'],
+                min_hits=self.config['tracking']['min_hits'],
+                left_behind_threshold_minutes=self.config['object_detection']['left_behind_threshold'],
+                clock=self.clock
+            )
+        return self.object_trackers[camera_id]
+
+    def get_threat_stream(self, camera_id: str) -> ThreatScheduler:
+        """Get (or create) the strided threat detector stream for a camera"""
+        if camera_id not in self.threat_streams:
+            self.threat_streams[camera_id] = ThreatScheduler.from_config(
+                self.threat_detector.spawn_stream(),
+                self.config['threat_detection'].get('scheduler', {}),
+                self.config['threat_detection'].get('person_gate', {})
+            )
+        return self.threat_streams[camera_id]
+
+    def get_motion_gate(self, camera_id: str) -> Optional[MotionGate]:
+        """Get (or create) the motion gate for a camera (None if disabled)"""
+        if not self.motion_gate_config.get('enabled', False):
+            return None
+        if camera_id not in self.motion_gates:
+            self.motion_gates[camera_id] = MotionGate.from_config(self.motion_gate_config)
+        return self.motion_gates[camera_id]
+
+    def get_detection_zones(self, camera_id: str) -> Optional[DetectionZones]:
+        """Get the detection zones for a camera (None if disabled or not configured)"""
+        if not self.zone_config.get('enabled', False) or camera_id not in self.cameras:
+            return None
+        if camera_id not in self.detection_zones:
+            self.detection_zones[camera_id] = DetectionZones.from_camera(
+                self.cameras[camera_id], margin=self.zone_config.get('crop_margin', 0)
+            )
+        return self.detection_zones[camera_id]
     
     def process_frame_for_objects(
         self,
@@ -111,18 +226,36 @@ class SchoolSecuritySystem:
         Returns:
             List of tracked objects
         """
-        # Detect objects
-        detections = self.object_detector.detect(frame)
-        
-        # Filter by minimum size
-        min_size = self.config['object_detection']['min_object_size']
-        detections = self.object_detector.filter_by_size(detections, min_size)
-        
-        # Update tracker
-        tracked_objects = self.object_tracker.update(detections)
+        # Only the configured zones are analysed
+        zones = self.get_detection_zones(camera_id)
+        region, offset = zones.crop(frame) if zones is not None else (frame, (0, 0))
+
+        gate = self.get_motion_gate(camera_id)
+        if gate is None or gate.check(region) or camera_id not in self.last_detections:
+            # Detect objects
+            with self.metrics.time('inference', camera_id):
+                detections = self.object_detector.detect(region)
+
+            # Filter by minimum size
+            min_size = self.config['object_detection']['min_object_size']
+            detections = self.object_detector.filter_by_size(detections, min_size)
+
+            # Back to frame coordinates, dropping objects outside the zones
+            if zones is not None:
+                detections = zones.filter(zones.to_frame(detections, offset))
+            self.last_detections[camera_id] = detections
+        else:
+            # Scene unchanged: the tracker sees the previous detections again
+            detections = self.last_detections[camera_id]
         
-        # Check for left-behind objects
-        left_behind = self.object_tracker.get_left_behind_objects()
+        with self.metrics.time('tracking', camera_id):
+            # Update this camera's tracker
+            tracker = self.get_tracker(camera_id)
+            tracked_objects = tracker.update(detections)
+
+            # Check for left-behind objects
+            left_behind = tracker.get_left_behind_objects()
+        self.metrics.observe_tracks(camera_id, tracked_objects, left_behind)
         
         # Send alerts for new left-behind objects
         for obj in left_behind:
@@ -135,7 +268,8 @@ class SchoolSecuritySystem:
     def process_frame_for_threats(
         self,
         frame,
-        camera_id: str
+        camera_id: str,
+        people: Optional[List[List[float]]] = None
     ) -> Dict:
         """
         Process frame for threat detection
@@ -143,15 +277,25 @@ class SchoolSecuritySystem:
         Args:
             frame: Input frame
             camera_id: Camera identifier
+            people: Person boxes from object detection, used by the person
+                gate (None analyses the frame unconditionally)
             
         Returns:
             Threat detection result
         """
-        # Detect threats
-        result = self.threat_detector.detect(frame)
+        # Detect threats using this camera's clip buffer; the model only
+        # runs every few frames and the last result is carried in between
+        threat_stream = self.get_threat_stream(camera_id)
+        start = time.perf_counter()
+        result = threat_stream.detect(frame, person_boxes=people)
+        if result.get('fresh'):
+            self.metrics.stage_seconds.observe(
+                time.perf_counter() - start, stage='threat_inference', camera_id=camera_id
+            )
+        self.metrics.observe_threat_stream(camera_id, threat_stream)
         
-        # Send alert if threat detected
-        if result['is_threat']:
+        # Send alert if a fresh inference detected a threat
+        if result['is_threat'] and result['fresh']:
             self._send_threat_alert(result, camera_id, frame)
         
         return result
@@ -164,32 +308,27 @@ class SchoolSecuritySystem:
     ):
         """Send alert for left-behind object"""
         camera_info = self.cameras[camera_id]
-        
-        # Save snapshot
-        snapshot_dir = Path(self.config['storage']['snapshots_path'])
-        snapshot_dir.mkdir(parents=True, exist_ok=True)
-        
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        snapshot_path = snapshot_dir / f"{camera_id}_leftbehind_{timestamp}.jpg"
-
-        # Draw bounding box and save
-        annotated = self.object_detector.visualize_detections(frame, [obj.get_info()])
-        cv2.imwrite(str(snapshot_path), annotated)
-
-        # Prepare notification
-        recipients = {
-            'email': self.config['notifications']['left_behind_objects']['recipients'].get('email', []),
-            'telegram': self.config['notifications']['left_behind_objects']['recipients'].get('telegram', []),
-            'sms': self.config['notifications']['left_behind_objects']['recipients'].get('sms', [])
-        }
 
-        self.alert_system.send_left_behind_alert(
-            object_info=obj.get_info(),
-            camera_info=camera_info,
-            recipients=recipients,
-            image_path=str(snapshot_path),
-            cooldown_minutes=self.config['notifications']['left_behind_objects']['cooldown_minutes']
-        )
+        with self.metrics.time('alert', camera_id):
+            # Draw bounding box and encode the snapshot once for all channels
+            annotated = self.object_detector.visualize_detections(frame, [obj.get_info()])
+            snapshot = self.snapshots.capture(annotated, camera_id, 'leftbehind')
+
+            # Prepare notification
+            recipients = {
+                'email': self.config['notifications']['left_behind_objects']['recipients'].get('email', []),
+                'telegram': self.config['notifications']['left_behind_objects']['recipients'].get('telegram', []),
+                'sms': self.config['notifications']['left_behind_objects']['recipients'].get('sms', [])
+            }
+
+            sent = self.alert_system.send_left_behind_alert(
+                object_info=obj.get_info(),
+                camera_info=camera_info,
+                recipients=recipients,
+                snapshot=snapshot,
+                cooldown_minutes=self.config['notifications']['left_behind_objects']['cooldown_minutes']
+            )
+        self._count_alert('left_behind', camera_id, sent)
 
     def _send_threat_alert(
         self,
@@ -200,88 +339,194 @@ class SchoolSecuritySystem:
         """Send alert for detected threat"""
         camera_info = self.cameras[camera_id]
 
-        # Save snapshot
-        snapshot_dir = Path(self.config['storage']['snapshots_path'])
-        snapshot_dir.mkdir(parents=True, exist_ok=True)
+        with self.metrics.time('alert', camera_id):
+            # Annotate and encode the snapshot once for all channels
+            annotated = self.threat_detector.visualize_result(frame, threat_result)
+            snapshot = self.snapshots.capture(annotated, camera_id, 'threat')
+
+            # Prepare notification
+            recipients = {
+                'email': self.config['notifications']['threats']['recipients'].get('email', []),
+                'telegram': self.config['notifications']['threats']['recipients'].get('telegram', []),
+                'sms': self.config['notifications']['threats']['recipients'].get('sms', [])
+            }
+
+            sent = self.alert_system.send_threat_alert(
+                threat_info=threat_result,
+                camera_info=camera_info,
+                recipients=recipients,
+                snapshot=snapshot,
+                cooldown_minutes=self.config['notifications']['threats']['cooldown_minutes']
+            )
+        self._count_alert('threat', camera_id, sent)
+
+    def _count_alert(self, alert_type: str, camera_id: str, sent: bool):
+        """Count an alert that passed the cooldown"""
+        # Worker processes only forward alerts; the supervisor applies the
+        # cooldown and counts them
+        if sent and not isinstance(self.alert_system, QueueAlertSink):
+            self.metrics.alerts.inc(type=alert_type, camera_id=camera_id)
+
+    def process_frame(self, frame, camera_id: str) -> Tuple[List, Dict]:
+        """
+        Process one frame for both left-behind objects and threats
 
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        snapshot_path = snapshot_dir / f"{camera_id}_threat_{timestamp}.jpg"
+        Args:
+            frame: Input frame
+            camera_id: Camera identifier
 
-        # Annotate and save
-        annotated = self.threat_detector.visualize_result(frame, threat_result)
-        cv2.imwrite(str(snapshot_path), annotated)
+        Returns:
+            Tuple of (tracked objects, threat detection result)
+        """
+        self.frame_counts[camera_id] += 1
+        self.metrics.frames.inc(camera_id=camera_id)
+        tracked_objects = self.process_frame_for_objects(frame, camera_id)
+        threat_result = self.process_frame_for_threats(
+            frame, camera_id, people=person_boxes(tracked_objects)
+        )
+        return tracked_objects, threat_result
 
-        # Prepare notification
-        recipients = {
-            'email': self.config['notifications']['threats']['recipients'].get('email', []),
-            'telegram': self.config['notifications']['threats']['recipients'].get('telegram', []),
-            'sms': self.config['notifications']['threats']['recipients'].get('sms', [])
-        }
+    def process_live_frame(self, frame, camera_id: str, grabber: LatestFrameGrabber) -> Tuple[List, Dict]:
+        """
+        Process a frame from a camera's grabber and report its lag to the load governor
 
-        self.alert_system.send_threat_alert(
-            threat_info=threat_result,
-            camera_info=camera_info,
-            recipients=recipients,
-            image_path=str(snapshot_path),
-            cooldown_minutes=self.config['notifications']['threats']['cooldown_minutes']
-        )
+        Args:
+            frame: Frame just read from the grabber
+            camera_id: Camera identifier
+            grabber: The camera's frame grabber
 
-    def process_camera(self, camera_id: str, source=0):
+        Returns:
+            Tuple of (tracked objects, threat detection result)
         """
-        Process video stream from a camera
+        start = time.monotonic()
+        tracked_objects, threat_result = self.process_frame(frame, camera_id)
+
+        if self.governor is not None:
+            self.governor.record(camera_id, grabber.capture_lag + time.monotonic() - start)
+            self.governor.update()
+        return tracked_objects, threat_result
+
+    def open_camera(self, camera_id: str, source) -> Optional[LatestFrameGrabber]:
+        """
+        Start a background frame grabber for a camera
 
         Args:
             camera_id: Camera identifier
-            source: Video source (0 for webcam, path for video file, URL for stream)
+            source: Video source (webcam index, file path or stream URL)
+
+        Returns:
+            Running grabber, or None if a video file could not be opened
         """
+        grabber = LatestFrameGrabber(
+            source,
+            camera_id=camera_id,
+            buffer_size=self.capture_config.get('buffer_size', 1),
+            read_timeout=self.capture_config.get('read_timeout', 5.0),
+            reconnect_delay=self.capture_config.get('reconnect_delay', 1.0),
+            max_reconnect_delay=self.capture_config.get('max_reconnect_delay', 30.0),
+            frame_skip=self.frame_skip,
+            target_fps=self.target_fps,
+            decode_skipped=not self.capture_config.get('decode_skip', True)
+        )
+        if not grabber.start() and not grabber.live:
+            return None
+
+        self.frame_grabbers[camera_id] = grabber
+        if self.governor is not None:
+            self.governor.add_camera(camera_id, grabber)
         logger.info(f"Starting processing for camera {camera_id}")
+        return grabber
+
+    def close_camera(self, camera_id: str):
+        """Stop a camera's frame grabber"""
+        grabber = self.frame_grabbers.pop(camera_id, None)
+        if self.governor is not None:
+            self.governor.remove_camera(camera_id)
+        if grabber is not None:
+            grabber.stop()
+            logger.info(f"Stopped processing camera {camera_id}")
 
-        # Open video source
-        cap = cv2.VideoCapture(source)
+    def _summarize(self, camera_id: str, tracked_objects: List, threat_result: Dict) -> Dict:
+        """Compact, picklable summary of one processed frame"""
+        return {
+            'camera_id': camera_id,
+            'timestamp': self.clock().isoformat(),
+            'frame_count': self.frame_counts[camera_id],
+            'tracked_objects': len(tracked_objects),
+            'left_behind': sum(1 for obj in tracked_objects if obj.is_left_behind),
+            'threat_status': threat_result.get('status'),
+            'threat_type': threat_result.get('threat_type'),
+            'threat_confidence': threat_result.get('confidence', 0.0),
+            'threat_inference': (
+                self.threat_streams[camera_id].stats()
+                if camera_id in self.threat_streams else None
+            ),
+            'capture': (
+                self.frame_grabbers[camera_id].stats()
+                if camera_id in self.frame_grabbers else None
+            ),
+            'motion_gate': (
+                self.motion_gates[camera_id].stats()
+                if camera_id in self.motion_gates else None
+            ),
+            'detection_zones': (
+                self.detection_zones[camera_id].stats()
+                if self.detection_zones.get(camera_id) is not None else None
+            ),
+            'load_governor': self.governor.stats() if self.governor is not None else None
+        }
 
-        if not cap.isOpened():
-            logger.error(f"Failed to open video source: {source}")
-            return
+    def _draw_results(self, frame, tracked_objects: List, threat_result: Dict):
+        """Draw tracked objects and threat status on a copy of the frame"""
+        display_frame = frame.copy()
 
-        try:
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    logger.warning("Failed to read frame")
-                    break
+        # Draw tracked objects
+        for obj in tracked_objects:
+            x1, y1, x2, y2 = map(int, obj.bbox)
+            color = (0, 0, 255) if obj.is_left_behind else (0, 255, 0)
+            cv2.rectangle(display_frame, (x1, y1), (x2, y2), color, 2)
 
-                self.frame_count += 1
+            label = f"ID:{obj.track_id} {obj.class_name}"
+            if obj.is_left_behind:
+                label += " [LEFT BEHIND]"
 
-                # Skip frames for performance
-                if self.frame_count % self.frame_skip != 0:
-                    continue
+            cv2.putText(display_frame, label, (x1, y1-10),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
 
-                # Process for left-behind objects
-                tracked_objects = self.process_frame_for_objects(frame, camera_id)
+        # Draw threat status
+        if threat_result['is_threat']:
+            cv2.putText(display_frame, f"THREAT: {threat_result['threat_type']}",
+                       (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
 
-                # Process for threats
-                threat_result = self.process_frame_for_threats(frame, camera_id)
+        return display_frame
 
-                # Visualize results
-                display_frame = frame.copy()
+    def process_camera(self, camera_id: str, source=0):
+        """
+        Process video stream from a camera
 
-                # Draw tracked objects
-                for obj in tracked_objects:
-                    x1, y1, x2, y2 = map(int, obj.bbox)
-                    color = (0, 0, 255) if obj.is_left_behind else (0, 255, 0)
-                    cv2.rectangle(display_frame, (x1, y1), (x2, y2), color, 2)
+        Args:
+            camera_id: Camera identifier
+            source: Video source (0 for webcam, path for video file, URL for stream)
+        """
+        # Open video source
+        grabber = self.open_camera(camera_id, source)
+        if grabber is None:
+            return
 
-                    label = f"ID:{obj.track_id} {obj.class_name}"
-                    if obj.is_left_behind:
-                        label += " [LEFT BEHIND]"
+        try:
+            while True:
+                ret, frame = grabber.read(timeout=1.0)
+                if not ret:
+                    if grabber.is_finished:
+                        logger.warning("Video source ended")
+                        break
+                    continue  # Live stream stalled; the grabber reconnects
+                self.metrics.observe_capture(camera_id, grabber)
 
-                    cv2.putText(display_frame, label, (x1, y1-10),
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+                tracked_objects, threat_result = self.process_live_frame(frame, camera_id, grabber)
 
-                # Draw threat status
-                if threat_result['is_threat']:
-                    cv2.putText(display_frame, f"THREAT: {threat_result['threat_type']}",
-                               (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+                # Visualize results
+                display_frame = self._draw_results(frame, tracked_objects, threat_result)
 
                 # Display
                 cv2.imshow(f"Camera {camera_id}", display_frame)
@@ -293,31 +538,159 @@ class SchoolSecuritySystem:
         except KeyboardInterrupt:
             logger.info("Processing interrupted by user")
         finally:
-            cap.release()
+            self.close_camera(camera_id)
+            self.snapshots.stop()
             cv2.destroyAllWindows()
-            logger.info(f"Stopped processing camera {camera_id}")
+
+    def replay_video(
+        self,
+        camera_id: str,
+        path: str,
+        result_callback: Optional[Callable[[str, Dict], None]] = None
+    ) -> int:
+        """
+        Process a recording as fast as possible with time taken from its frames
+
+        Every sampled frame is processed (none are dropped for being late)
+        and the system's ReplayClock follows the frame PTS, so a replay
+        produces the same left-behind and threat alerts on every run and on
+        any machine, matching what the live pipeline would have produced.
+
+        Args:
+            camera_id: Camera the recording belongs to (registered if not configured)
+            path: Video file
+            result_callback: Called with (camera_id, summary) per processed frame
+
+        Returns:
+            Number of frames processed
+        """
+        if not isinstance(self.clock, ReplayClock):
+            raise ValueError("replay_video requires a system built with a ReplayClock")
+
+        self.cameras.setdefault(camera_id, {
+            'id': camera_id, 'name': f"Replay {camera_id}", 'location': str(path)
+        })
+
+        frames = 0
+        for frame, pts in replay_frames(
+            path,
+            frame_skip=self.frame_skip,
+            target_fps=self.target_fps,
+            decode_skipped=not self.capture_config.get('decode_skip', True)
+        ):
+            self.clock.advance(pts)
+            tracked_objects, threat_result = self.process_frame(frame, camera_id)
+            frames += 1
+
+            if result_callback is not None:
+                result_callback(
+                    camera_id,
+                    self._summarize(camera_id, tracked_objects, threat_result)
+                )
+        return frames
+
+    def process_cameras(
+        self,
+        sources: Dict[str, object],
+        stop_event=None,
+        result_callback: Optional[Callable[[str, Dict], None]] = None
+    ):
+        """
+        Process several camera streams round-robin without display
+
+        Used by camera worker processes. Each camera keeps its own tracker
+        and threat buffer.
+
+        Args:
+            sources: Mapping of camera ID to video source
+            stop_event: Event that ends processing when set
+            result_callback: Called with (camera_id, summary) per processed frame
+        """
+        captures = {}
+        for camera_id, source in sources.items():
+            grabber = self.open_camera(camera_id, source)
+            if grabber is not None:
+                captures[camera_id] = grabber
+
+        try:
+            while captures and not (stop_event is not None and stop_event.is_set()):
+                processed_any = False
+                for camera_id, grabber in list(captures.items()):
+                    ret, frame = grabber.read(timeout=0)
+                    if not ret:
+                        if grabber.is_finished:
+                            logger.warning(f"Video source for camera {camera_id} ended")
+                            self.close_camera(camera_id)
+                            del captures[camera_id]
+                        continue
+                    processed_any = True
+                    self.metrics.observe_capture(camera_id, grabber)
+
+                    tracked_objects, threat_result = self.process_live_frame(frame, camera_id, grabber)
+
+                    if result_callback is not None:
+                        result_callback(
+                            camera_id,
+                            self._summarize(camera_id, tracked_objects, threat_result)
+                        )
+
+                # No camera had a new frame: wait briefly instead of spinning
+                if not processed_any:
+                    time.sleep(0.005)
+        finally:
+            for camera_id in captures:
+                self.close_camera(camera_id)
+            self.snapshots.stop()
+
+        # A worker that lost all of its streams exits non-zero so it is restarted
+        if not captures and not (stop_event is not None and stop_event.is_set()):
+            raise RuntimeError(f"All video sources ended: {list(sources)}")
 
     def run(self):
         """Run the system for all configured cameras"""
         logger.info("Starting School Security System...")
 
-        # For now, process first camera
-        # In production, use multiprocessing for multiple cameras
-        if self.cameras:
-            first_camera = list(self.cameras.values())[0]
-            camera_id = first_camera['id']
-
-            # Determine source
-            if 'stream_url' in first_camera:
-                source = first_camera['stream_url']
-            elif 'ip' in first_camera:
-                source = f"http://{first_camera['ip']}/stream"
-            else:
-                source = 0  # Default to webcam
-
-            self.process_camera(camera_id, source)
-        else:
+        if not self.cameras:
             logger.error("No cameras configured!")
+            return
+
+        metrics_config = self.config['performance'].get('metrics', {})
+        if metrics_config.get('enabled', False):
+            start_metrics_server(metrics_config.get('port', 9108), metrics_config.get('host', '0.0.0.0'))
+
+        try:
+            self._run_cameras()
+        finally:
+            self.snapshots.stop()
+            # Deliver queued alerts and close channel connections
+            if isinstance(self.alert_system, AlertSystem):
+                self.alert_system.close()
+
+    def _run_cameras(self):
+        # A single camera runs in-process with a live display window
+        if len(self.cameras) == 1:
+            camera = list(self.cameras.values())[0]
+            self.process_camera(camera['id'], camera_source(camera))
+            return
+
+        # Multiple cameras: one worker process per camera group, each with
+        # its own trackers and threat buffers. With batch inference enabled,
+        # object detection for all workers runs batched in this process.
+        # Workers save their own snapshots, so this process's writer stops.
+        self.snapshots.stop()
+        performance = self.config['performance']
+        batching = performance.get('batch_inference', {})
+        supervisor = CameraSupervisor(
+            config_path=self.config_path,
+            cameras=list(self.cameras.values()),
+            system_factory=SchoolSecuritySystem,
+            alert_system=self.alert_system,
+            num_workers=performance.get('num_workers', 4),
+            detector=self.object_detector if batching.get('enabled', False) else None,
+            max_batch_size=batching.get('max_batch_size', 8),
+            max_wait_ms=batching.get('max_wait_ms', 10)
+        )
+        supervisor.run()
 
 
 def main():
@@ -0,0 +1,131 @@
+"""
+Benchmark frame ingestion in the video API
+Compares base64 JSON requests with raw JPEG bodies and multipart uploads
+"""
+
+import sys
+import time
+import base64
+import argparse
+import threading
+from pathlib import Path
+
+import cv2
+import numpy as np
+import requests
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def load_jpeg(image: str, size: tuple, quality: int) -> bytes:
+    """Read a JPEG, or encode a synthetic camera-like frame"""
+    if image:
+        return Path(image).read_bytes()
+
+    # Smooth noise compresses like a real scene, unlike raw noise
+    height, width = size
+    rng = np.random.default_rng(0)
+    frame = cv2.resize(rng.integers(0, 256, (height // 8, width // 8, 3), dtype=np.uint8),
+                       (width, height), interpolation=cv2.INTER_CUBIC)
+    return cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes()
+
+
+def start_local_server(weights: str, port: int) -> str:
+    """Serve the API in this process (optionally with a given detector)"""
+    from werkzeug.serving import make_server
+    import app as video_app
+
+    flask_app = video_app.create_app()
+    if weights:
+        from src.models.object_detector import LeftBehindObjectDetector
+        video_app.object_detector = LeftBehindObjectDetector(
+            weights, device='cpu',
+            target_classes=video_app.config['object_detection']['target_classes']
+        )
+
+    server = make_server('127.0.0.1', port, flask_app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{port}"
+
+
+def time_transport(send, count: int) -> dict:
+    """Send requests back to back and measure throughput"""
+    response = send()  # Warm up
+    response.raise_for_status()
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(count):
+        t0 = time.perf_counter()
+        send().raise_for_status()
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'requests_per_second': count / elapsed,
+        'ms_p50': 1000 * float(np.median(latencies)),
+        'ms_p95': 1000 * float(np.percentile(latencies, 95))
+    }
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark base64 vs raw JPEG frame ingestion")
+    parser.add_argument('--url', type=str, help='Running API (an in-process server is started if omitted)')
+    parser.add_argument('--weights', type=str, help='Object detector weights for the in-process server')
+    parser.add_argument('--port', type=int, default=5093, help='Port for the in-process server')
+    parser.add_argument('--endpoint', type=str, default='detect-objects',
+                        choices=['detect-objects', 'detect-threats', 'process-frame'])
+    parser.add_argument('--image', type=str, help='JPEG to send (synthetic frame if omitted)')
+    parser.add_argument('--height', type=int, default=480, help='Synthetic frame height')
+    parser.add_argument('--width', type=int, default=640, help='Synthetic frame width')
+    parser.add_argument('--quality', type=int, default=85, help='Synthetic frame JPEG quality')
+    parser.add_argument('--requests', type=int, default=50, help='Requests per transport')
+    parser.add_argument('--camera-id', type=str, default='CAM_001', help='Camera metadata to send')
+    args = parser.parse_args()
+
+    base_url = args.url or start_local_server(args.weights, args.port)
+    jpeg = load_jpeg(args.image, (args.height, args.width), args.quality)
+    session = requests.Session()
+
+    base64_url = f"{base_url}/api/video/{args.endpoint}"
+    jpeg_url = f"{base_url}/api/video/jpeg/{args.endpoint}"
+    transports = {
+        # The client-side encoding is part of the cost of each transport
+        'base64': lambda: session.post(
+            base64_url, json={'frame': base64.b64encode(jpeg).decode('ascii')}
+        ),
+        'jpeg': lambda: session.post(
+            jpeg_url, data=jpeg,
+            headers={'Content-Type': 'image/jpeg', 'X-Camera-Id': args.camera_id}
+        ),
+        'multipart': lambda: session.post(
+            jpeg_url, params={'camera_id': args.camera_id},
+            files={'frame': ('frame.jpg', jpeg, 'image/jpeg')}
+        )
+    }
+    payloads = {
+        'base64': len(base64.b64encode(jpeg)) + len('{"frame": ""}'),
+        'jpeg': len(jpeg),
+        'multipart': len(jpeg) + 200  # Approximate form boundary overhead
+    }
+
+    print(f"{args.requests} requests to {args.endpoint}, {len(jpeg) / 1024:.1f} KiB JPEG")
+    print(f"{'transport':>10} {'payload':>10} {'req/s':>8} {'p50':>10} {'p95':>10}")
+    baseline = None
+    for name, send in transports.items():
+        result = time_transport(send, args.requests)
+        baseline = baseline or result['requests_per_second']
+        print(
+            f"{name:>10} "
+            f"{payloads[name] / 1024:>6.1f} KiB "
+            f"{result['requests_per_second']:>8.1f} "
+            f"{result['ms_p50']:>7.2f} ms "
+            f"{result['ms_p95']:>7.2f} ms"
+            f"  ({result['requests_per_second'] / baseline:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark object detection throughput on CPU
+Compares the ultralytics PyTorch backend with the ONNX Runtime backend
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.models.object_detector import LeftBehindObjectDetector
+
+
+def load_frames(video: str, count: int, size: tuple) -> list:
+    """Read frames from a video, or generate random frames if none is given"""
+    if video:
+        cap = cv2.VideoCapture(video)
+        frames = []
+        while len(frames) < count:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        cap.release()
+        if frames:
+            return frames
+
+    rng = np.random.default_rng(0)
+    height, width = size
+    return [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def time_backend(detector: LeftBehindObjectDetector, frames: list, batch_size: int) -> dict:
+    """Measure per-frame latency and throughput"""
+    # Warm up
+    detector.detect(frames[0])
+
+    latencies = []
+    start = time.perf_counter()
+    if batch_size == 1:
+        for frame in frames:
+            t0 = time.perf_counter()
+            detector.detect(frame)
+            latencies.append(time.perf_counter() - t0)
+    else:
+        for i in range(0, len(frames), batch_size):
+            batch = frames[i:i + batch_size]
+            t0 = time.perf_counter()
+            detector.detect_batch(batch)
+            latencies.append((time.perf_counter() - t0) / len(batch))
+    elapsed = time.perf_counter() - start
+
+    return {
+        'ms_per_frame_p50': 1000 * float(np.median(latencies)),
+        'ms_per_frame_p95': 1000 * float(np.percentile(latencies, 95)),
+        'fps': len(frames) / elapsed
+    }
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark object detector backends on CPU")
+    parser.add_argument('--weights', type=str, required=True, help='YOLOv8 .pt weights')
+    parser.add_argument('--video', type=str, help='Video to take frames from (random frames if omitted)')
+    parser.add_argument('--frames', type=int, default=50, help='Frames to time per backend')
+    parser.add_argument('--height', type=int, default=480, help='Random frame height')
+    parser.add_argument('--width', type=int, default=640, help='Random frame width')
+    parser.add_argument('--batch-size', type=int, default=1, help='Frames per detect_batch call')
+    args = parser.parse_args()
+
+    frames = load_frames(args.video, args.frames, (args.height, args.width))
+
+    torch_detector = LeftBehindObjectDetector(args.weights, device='cpu')
+    if not Path(args.weights).with_suffix('.onnx').exists():
+        print("Exporting ONNX model...")
+        torch_detector.export_model('onnx')
+    onnx_detector = LeftBehindObjectDetector(args.weights, model_type='onnx')
+
+    print(f"{len(frames)} frames of {frames[0].shape[1]}x{frames[0].shape[0]}, "
+          f"batch size {args.batch_size}")
+    print(f"{'backend':>10} {'p50':>10} {'p95':>10} {'FPS':>8}")
+    for name, detector in [('pytorch', torch_detector), ('onnx', onnx_detector)]:
+        result = time_backend(detector, frames, args.batch_size)
+        print(
+            f"{name:>10} "
+            f"{result['ms_per_frame_p50']:>7.1f} ms "
+            f"{result['ms_per_frame_p95']:>7.1f} ms "
+            f"{result['fps']:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
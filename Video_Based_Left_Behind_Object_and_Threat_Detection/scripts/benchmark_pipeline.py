@@ -0,0 +1,370 @@
+"""
+End-to-end benchmark of the video pipeline
+Times every stage from decode to alert formatting and writes a baseline that can be compared across commits
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import cv2
+import yaml
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.models.object_detector import LeftBehindObjectDetector
+from src.models.threat_detector import ThreatDetector
+from src.models.threat_scheduler import ThreatScheduler, person_boxes
+from src.notifications.alert_system import AlertSystem
+from src.notifications.snapshots import SnapshotPipeline
+from src.tracking.object_tracker import ObjectTracker
+from src.video.replay import ReplayClock
+
+# 'threat' is the per-frame scheduler cost, 'threat_inference' the frames where the clip model ran
+STAGES = ['decode', 'detect', 'filter', 'track', 'left_behind', 'threat', 'threat_inference', 'alert']
+
+CAMERA = {'id': 'BENCH', 'name': 'Benchmark', 'location': 'Benchmark'}
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far in MiB (None if unavailable)"""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Bytes on macOS, KiB elsewhere
+        return peak / 2**20 if sys.platform == 'darwin' else peak / 1024
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) / 2**20
+    except ImportError:
+        return None
+
+
+def current_rss_mb() -> Optional[float]:
+    """Current resident set size of this process in MiB (None if unavailable)"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2**20
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def git_commit() -> Optional[str]:
+    """Current commit hash, if run from a git checkout"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=Path(__file__).parent, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_synthetic_video(path: str, frames: int, size: tuple, fps: float = 10.0, seed: int = 0):
+    """
+    Write a classroom-like clip: textured background, objects that stay put
+    and a person-sized block walking across the frame
+    """
+    height, width = size
+    rng = np.random.default_rng(seed)
+    background = cv2.resize(
+        rng.integers(60, 200, (height // 8, width // 8, 3), dtype=np.uint8),
+        (width, height), interpolation=cv2.INTER_CUBIC
+    )
+    objects = [
+        (int(rng.integers(0, width - 80)), int(rng.integers(height // 2, height - 80)),
+         tuple(int(c) for c in rng.integers(0, 256, 3)))
+        for _ in range(6)
+    ]
+
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), fps, (width, height))
+    for i in range(frames):
+        frame = background.copy()
+        for x, y, color in objects:
+            cv2.rectangle(frame, (x, y), (x + 60, y + 60), color, -1)
+        x = int((i * 8) % (width + 120)) - 120
+        cv2.rectangle(frame, (x, height // 4), (x + 80, height // 4 + 220), (40, 40, 160), -1)
+        writer.write(frame)
+    writer.release()
+
+
+def summarize(samples: List[float]) -> Dict:
+    """Latency percentiles in milliseconds"""
+    values = np.array(samples) * 1000
+    return {
+        'p50_ms': round(float(np.percentile(values, 50)), 3),
+        'p95_ms': round(float(np.percentile(values, 95)), 3),
+        'mean_ms': round(float(values.mean()), 3)
+    }
+
+
+def run_scenario(
+    video: str,
+    config: Dict,
+    detector: LeftBehindObjectDetector,
+    threat_detector: Optional[ThreatDetector],
+    max_frames: int,
+    warmup: int,
+    person_gate: bool = True
+) -> Dict:
+    """
+    Drive the frames of a video through every pipeline stage
+
+    Time follows the video's PTS (ReplayClock), so left-behind checks and
+    alerts happen as they would on the live stream of that video.
+    """
+    clock = ReplayClock()
+    tracker = ObjectTracker(
+        iou_threshold=config['tracking']['iou_threshold'],
+        max_age=config['tracking']['max_age'],
+        min_hits=config['tracking']['min_hits'],
+        left_behind_threshold_minutes=config['object_detection']['left_behind_threshold'],
+        clock=clock
+    )
+    threat_stream = None
+    if threat_detector is not None:
+        threat_stream = ThreatScheduler.from_config(
+            threat_detector.spawn_stream(),
+            config['threat_detection'].get('scheduler', {}),
+            config['threat_detection'].get('person_gate', {}) if person_gate else {}
+        )
+    # No recipients: messages are built but nothing is sent
+    alert_system = AlertSystem()
+    snapshots = SnapshotPipeline.from_config({'snapshots': config['storage'].get('snapshots', {})})
+    min_size = config['object_detection']['min_object_size']
+
+    timings: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    alerts = 0
+    frames = 0
+    # The process peak includes model loading and earlier scenarios, so
+    # memory is sampled per frame (outside the timed stages) instead
+    rss_start = current_rss_mb()
+    rss_peak = rss_start
+    cap = cv2.VideoCapture(video)
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video: {video}")
+    resolution = [int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))]
+
+    try:
+        total_start = None
+        while frames < max_frames + warmup:
+            if frames == warmup:
+                total_start = time.perf_counter()
+            frame_timings = {}
+
+            t0 = time.perf_counter()
+            ret, frame = cap.read()
+            frame_timings['decode'] = time.perf_counter() - t0
+            if not ret:
+                break
+            clock.advance(cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0)
+
+            t0 = time.perf_counter()
+            detections = detector.detect(frame)
+            frame_timings['detect'] = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            detections = detector.filter_by_size(detections, min_size)
+            frame_timings['filter'] = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            tracked_objects = tracker.update(detections)
+            frame_timings['track'] = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            left_behind = tracker.get_left_behind_objects()
+            frame_timings['left_behind'] = time.perf_counter() - t0
+
+            if threat_stream is not None:
+                t0 = time.perf_counter()
+                threat = threat_stream.detect(frame, person_boxes=person_boxes(tracked_objects))
+                frame_timings['threat'] = time.perf_counter() - t0
+                if threat.get('fresh'):
+                    frame_timings['threat_inference'] = frame_timings['threat']
+
+            # Format an alert for the first object every frame (cooldown 0),
+            # so there are enough samples; live alerts are far rarer
+            target = left_behind[0] if left_behind else (tracked_objects[0] if tracked_objects else None)
+            if target is not None:
+                t0 = time.perf_counter()
+                info = target.get_info()
+                annotated = detector.visualize_detections(frame, [info])
+                snapshot = snapshots.capture(annotated, CAMERA['id'], 'leftbehind')
+                alert_system.send_left_behind_alert(
+                    object_info=info, camera_info=CAMERA, recipients={},
+                    snapshot=snapshot, cooldown_minutes=0
+                )
+                frame_timings['alert'] = time.perf_counter() - t0
+                alerts += 1
+
+            rss = current_rss_mb()
+            if rss is not None:
+                rss_peak = max(rss_peak, rss)
+
+            frames += 1
+            if frames > warmup:
+                for stage, seconds in frame_timings.items():
+                    timings[stage].append(seconds)
+        elapsed = time.perf_counter() - total_start if total_start is not None else 0.0
+    finally:
+        cap.release()
+
+    measured = max(0, frames - warmup)
+    return {
+        'frames': measured,
+        'resolution': resolution,
+        'fps': round(measured / elapsed, 3) if elapsed > 0 else 0.0,
+        'alerts_formatted': alerts,
+        'left_behind': len(tracker.get_left_behind_objects()),
+        'threat_inferences': threat_stream.stats()['inferences'] if threat_stream is not None else 0,
+        'peak_rss_mb': round(rss_peak, 1) if rss_peak is not None else None,
+        'rss_growth_mb': round(rss_peak - rss_start, 1) if rss_start is not None else None,
+        'stages': {stage: summarize(samples) for stage, samples in timings.items() if samples}
+    }
+
+
+def compare(baseline: Dict, result: Dict, max_regression: Optional[float]) -> bool:
+    """
+    Print per-stage changes against an earlier baseline
+
+    Returns:
+        False if a p50 latency got worse by more than ``max_regression`` percent
+    """
+    ok = True
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'} ({baseline.get('created')})")
+    print(f"{'scenario':>10} {'stage':>16} {'p50 before':>11} {'p50 now':>9} {'change':>8}")
+    for name, scenario in result['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if before is None:
+            continue
+        for stage, stats in scenario['stages'].items():
+            old = before['stages'].get(stage)
+            if old is None or old['p50_ms'] <= 0:
+                continue
+            change = 100.0 * (stats['p50_ms'] - old['p50_ms']) / old['p50_ms']
+            flag = ''
+            if max_regression is not None and change > max_regression:
+                flag = ' REGRESSION'
+                ok = False
+            print(f"{name:>10} {stage:>16} {old['p50_ms']:>8.2f} ms {stats['p50_ms']:>6.2f} ms "
+                  f"{change:>+7.1f}%{flag}")
+        if before.get('fps'):
+            change = 100.0 * (scenario['fps'] - before['fps']) / before['fps']
+            print(f"{name:>10} {'FPS':>16} {before['fps']:>11.2f} {scenario['fps']:>9.2f} {change:>+7.1f}%")
+    return ok
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark the video pipeline stage by stage")
+    parser.add_argument('--config', type=str, default='config/config.yaml', help='Path to configuration file')
+    parser.add_argument('--video', type=str, nargs='*', default=[], help='Recorded videos to benchmark as well')
+    parser.add_argument('--frames', type=int, default=200, help='Frames to time per scenario')
+    parser.add_argument('--warmup', type=int, default=5, help='Frames run before timing starts')
+    parser.add_argument('--height', type=int, default=480, help='Synthetic frame height')
+    parser.add_argument('--width', type=int, default=640, help='Synthetic frame width')
+    parser.add_argument('--no-synthetic', action='store_true', help='Only benchmark the --video files')
+    parser.add_argument('--no-threats', action='store_true', help='Skip threat clip inference')
+    parser.add_argument(
+        '--no-person-gate',
+        action='store_true',
+        help='Analyse threat clips even when no people are detected (e.g. with untrained weights)'
+    )
+    parser.add_argument(
+        '--output',
+        type=str,
+        default='benchmarks/pipeline_baseline.json',
+        help='Where to write the machine-readable results'
+    )
+    parser.add_argument('--compare', type=str, help='Earlier results to compare against')
+    parser.add_argument(
+        '--max-regression',
+        type=float,
+        help='Exit with an error if a stage p50 is this many percent slower than --compare'
+    )
+    args = parser.parse_args()
+
+    with open(args.config, 'r') as f:
+        config = yaml.safe_load(f)
+
+    detector = LeftBehindObjectDetector.from_config(config['object_detection'])
+    threat_detector = None if args.no_threats else ThreatDetector.from_config(config['threat_detection'])
+
+    with tempfile.TemporaryDirectory() as directory:
+        scenarios = {}
+        if not args.no_synthetic:
+            scenarios['synthetic'] = os.path.join(directory, 'synthetic.avi')
+            write_synthetic_video(
+                scenarios['synthetic'], args.frames + args.warmup, (args.height, args.width)
+            )
+        for video in args.video:
+            scenarios[Path(video).stem] = video
+
+        result = {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'machine': {
+                'platform': platform.platform(),
+                'python': platform.python_version(),
+                'cpu_count': os.cpu_count()
+            },
+            'settings': {
+                'frames': args.frames,
+                'warmup': args.warmup,
+                'detector': config['object_detection']['model'].get('type', 'yolov8'),
+                'input_size': config['object_detection']['model'].get('input_size'),
+                'threats': threat_detector is not None,
+                'person_gate': not args.no_person_gate
+            },
+            'scenarios': {}
+        }
+
+        print(f"{'scenario':>10} {'stage':>16} {'p50':>10} {'p95':>10}")
+        for name, video in scenarios.items():
+            scenario = run_scenario(
+                video, config, detector, threat_detector, args.frames, args.warmup,
+                person_gate=not args.no_person_gate
+            )
+            result['scenarios'][name] = scenario
+            for stage, stats in scenario['stages'].items():
+                print(f"{name:>10} {stage:>16} {stats['p50_ms']:>7.2f} ms {stats['p95_ms']:>7.2f} ms")
+            print(f"{name:>10} {scenario['frames']} frames at {scenario['fps']:.1f} FPS, "
+                  f"peak RSS {scenario['peak_rss_mb']} MiB (+{scenario['rss_growth_mb']} MiB during the run)")
+
+    result['process_peak_rss_mb'] = peak_rss_mb()
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(result, f, indent=2, sort_keys=True)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        if not compare(baseline, result, args.max_regression):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Benchmark the object tracker's per-frame cost at different track counts
+Compares the vectorized matcher against the original per-pair Python loop
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.tracking.object_tracker import ObjectTracker
+from src.tracking.matching import match_detections
+
+
+def make_scene(num_objects: int, num_classes: int = 25, seed: int = 0):
+    """Create a grid of non-overlapping boxes with random classes"""
+    rng = np.random.default_rng(seed)
+    cols = int(np.ceil(np.sqrt(num_objects)))
+    boxes = []
+    for i in range(num_objects):
+        row, col = divmod(i, cols)
+        x1, y1 = col * 40.0, row * 40.0
+        boxes.append([x1, y1, x1 + 30.0, y1 + 30.0])
+    classes = rng.integers(0, num_classes, size=num_objects)
+    return np.array(boxes), classes
+
+
+def jittered_detections(boxes: np.ndarray, classes: np.ndarray, rng) -> list:
+    """Build detector-style dicts with small positional noise"""
+    noisy = boxes + rng.normal(0, 1.0, size=boxes.shape)
+    return [
+        {
+            'bbox': box.tolist(),
+            'confidence': 0.9,
+            'class_id': int(cls),
+            'class_name': f"class_{cls}"
+        }
+        for box, cls in zip(noisy, classes)
+    ]
+
+
+def naive_match(tracker: ObjectTracker, tracks: list, detections: list):
+    """Original O(D*T) per-pair greedy matching loop, for comparison"""
+    matches = []
+    for det_idx, detection in enumerate(detections):
+        best_iou = 0.0
+        best_track_id = None
+        for track_id, class_id, bbox in tracks:
+            if class_id != detection['class_id']:
+                continue
+            iou = tracker._calculate_iou(detection['bbox'], bbox)
+            if iou > best_iou and iou >= tracker.iou_threshold:
+                best_iou = iou
+                best_track_id = track_id
+        if best_track_id is not None:
+            matches.append((det_idx, best_track_id))
+    return matches
+
+
+def benchmark(num_tracks: int, frames: int) -> dict:
+    """Measure per-frame matching and full update cost for one track count"""
+    rng = np.random.default_rng(num_tracks)
+    boxes, classes = make_scene(num_tracks)
+
+    tracker = ObjectTracker()
+    start_time = datetime(2024, 1, 1, 8, 0, 0)
+
+    # Warm up so every object has a live track
+    tracker.update(jittered_detections(boxes, classes, rng), timestamp=start_time)
+
+    naive_times, matcher_times, update_times = [], [], []
+    for frame_idx in range(frames):
+        detections = jittered_detections(boxes, classes, rng)
+        slots = tracker.store.active_slots()
+        tracks = list(zip(
+            tracker.store.track_id[slots].tolist(),
+            tracker.store.class_id[slots].tolist(),
+            tracker.store.bbox[slots].tolist()
+        ))
+
+        t0 = time.perf_counter()
+        naive_match(tracker, tracks, detections)
+        naive_times.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        match_detections(
+            np.array([d['bbox'] for d in detections]),
+            np.array([d['class_id'] for d in detections]),
+            tracker.store.bbox[slots],
+            tracker.store.class_id[slots],
+            tracker.iou_threshold
+        )
+        matcher_times.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        tracker.update(detections, timestamp=start_time + timedelta(seconds=frame_idx + 1))
+        update_times.append(time.perf_counter() - t0)
+
+    return {
+        'tracks': num_tracks,
+        'naive_match_ms': 1000 * float(np.median(naive_times)),
+        'vectorized_match_ms': 1000 * float(np.median(matcher_times)),
+        'update_ms': 1000 * float(np.median(update_times)),
+    }
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark tracker per-frame cost")
+    parser.add_argument(
+        '--tracks',
+        type=int,
+        nargs='+',
+        default=[10, 100, 1000],
+        help='Live track counts to benchmark'
+    )
+    parser.add_argument(
+        '--frames',
+        type=int,
+        default=20,
+        help='Frames to time per track count'
+    )
+    args = parser.parse_args()
+
+    print(f"{'tracks':>8} {'naive match':>14} {'vectorized':>12} {'full update':>13}")
+    for num_tracks in args.tracks:
+        result = benchmark(num_tracks, args.frames)
+        print(
+            f"{result['tracks']:>8} "
+            f"{result['naive_match_ms']:>11.2f} ms "
+            f"{result['vectorized_match_ms']:>9.2f} ms "
+            f"{result['update_ms']:>10.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
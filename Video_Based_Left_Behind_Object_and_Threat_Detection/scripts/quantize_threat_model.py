@@ -0,0 +1,202 @@
+"""
+Quantize the threat detection model to INT8
+Calibrates on the threat_frames dataset and reports latency/accuracy against FP32
+"""
+
+import sys
+import copy
+import json
+import time
+import argparse
+from itertools import zip_longest
+from pathlib import Path
+from typing import Dict, List
+
+import cv2
+import numpy as np
+import torch
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.models.clip_buffer import ClipBuffer
+from src.models.threat_detector import ThreatDetector
+from src.models.threat_quantization import (
+    QUANTIZATION_MODES, default_mode, quantize_model, save_quantized
+)
+
+# Labels written by scripts/prepare_datasets.py
+LABELS = {'fight': 1, 'no_fight': 0}
+
+
+def load_samples(data_dir: str, split: str, max_samples: int) -> List[Dict]:
+    """
+    Load frame sequences of one threat_frames split
+
+    Returns:
+        List of {'frames': [BGR frames], 'label': 1 for fight, 0 otherwise},
+        alternating between classes so a limit keeps both
+    """
+    per_class = []
+    for class_name, label in LABELS.items():
+        class_dir = Path(data_dir) / split / class_name
+        videos = sorted(d for d in class_dir.iterdir() if d.is_dir()) if class_dir.exists() else []
+        per_class.append([(video, label) for video in videos])
+
+    samples = []
+    for pair in zip_longest(*per_class):
+        for video, label in filter(None, pair):
+            frames = [cv2.imread(str(path)) for path in sorted(video.glob('*.jpg'))]
+            frames = [frame for frame in frames if frame is not None]
+            if frames:
+                samples.append({'frames': frames, 'label': label})
+        if max_samples and len(samples) >= max_samples:
+            break
+    return samples[:max_samples] if max_samples else samples
+
+
+def fill_buffer(feed, frames: List[np.ndarray], clip_length: int):
+    """Feed a clip's frames, looping short sequences up to clip_length"""
+    for i in range(clip_length):
+        feed(frames[i % len(frames)])
+
+
+def calibration_batches(samples: List[Dict], clip_length: int):
+    """Yield (1, C, T, H, W) tensors preprocessed exactly as at runtime"""
+    buffer = ClipBuffer(clip_length)
+    for sample in samples:
+        buffer.clear()
+        fill_buffer(buffer.append, sample['frames'], clip_length)
+        yield torch.from_numpy(buffer.clip().copy()).unsqueeze(0)
+
+
+def evaluate(detector: ThreatDetector, samples: List[Dict]) -> Dict:
+    """Run detect() on every test clip and collect latency and predictions"""
+    latencies, predictions, top_classes = [], [], []
+    for sample in samples:
+        detector.reset_buffer()
+        fill_buffer(detector.add_frame, sample['frames'], detector.clip_length)
+
+        t0 = time.perf_counter()
+        result = detector.detect()
+        latencies.append(time.perf_counter() - t0)
+
+        predictions.append(int(result['is_threat']))
+        scores = result['all_scores']
+        top_classes.append(max(scores, key=scores.get) if scores else None)
+
+    labels = np.array([sample['label'] for sample in samples])
+    predicted = np.array(predictions)
+    true_pos = int(((predicted == 1) & (labels == 1)).sum())
+    precision = true_pos / max(1, int(predicted.sum()))
+    recall = true_pos / max(1, int(labels.sum()))
+
+    return {
+        'ms_per_clip_p50': 1000 * float(np.median(latencies)),
+        'ms_per_clip_p95': 1000 * float(np.percentile(latencies, 95)),
+        'clips_per_second': len(latencies) / sum(latencies),
+        'accuracy': float((predicted == labels).mean()),
+        'precision': precision,
+        'recall': recall,
+        'f1_score': 2 * precision * recall / max(1e-9, precision + recall),
+        '_top_classes': top_classes
+    }
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Quantize the threat detection model to INT8")
+    parser.add_argument('--weights', type=str, help='FP32 checkpoint (untrained model if omitted)')
+    parser.add_argument('--model-type', type=str, default='i3d',
+                        choices=['slowfast', 'x3d', 'i3d'], help='Threat model type')
+    parser.add_argument('--mode', type=str, choices=QUANTIZATION_MODES,
+                        help='Quantization mode (static unless the model needs dynamic)')
+    parser.add_argument('--data', type=str, default='datasets/threat_frames',
+                        help='threat_frames dataset from scripts/prepare_datasets.py')
+    parser.add_argument('--clip-length', type=int, default=32, help='Frames per clip')
+    parser.add_argument('--threshold', type=float, default=0.7, help='Threat confidence threshold')
+    parser.add_argument('--calibration-clips', type=int, default=32,
+                        help='Training clips used to calibrate activation ranges')
+    parser.add_argument('--test-clips', type=int, default=0, help='Test clips to evaluate (0 = all)')
+    parser.add_argument('--output', type=str, default='models/threat_detector_int8.pt',
+                        help='Quantized model artifact')
+    parser.add_argument('--report', type=str, default='models/threat_quantization_report.json',
+                        help='Latency/accuracy comparison report')
+    args = parser.parse_args()
+
+    mode = args.mode or default_mode(args.model_type)
+    detector_args = dict(
+        model_path=args.weights,
+        model_type=args.model_type,
+        confidence_threshold=args.threshold,
+        clip_length=args.clip_length,
+        device='cpu'
+    )
+    fp32 = ThreatDetector(**detector_args)
+
+    calibration = []
+    if mode == 'static':
+        calibration = load_samples(args.data, 'train', args.calibration_clips)
+        if not calibration:
+            print(f"ERROR: No calibration clips found in {args.data}/train")
+            return
+        print(f"Calibrating on {len(calibration)} clips...")
+
+    quantized = quantize_model(
+        copy.deepcopy(fp32.model), mode,
+        calibration_batches(calibration, args.clip_length) if calibration else None
+    )
+    save_quantized(quantized, args.output, mode, {
+        'model_type': args.model_type,
+        'clip_length': args.clip_length,
+        'fp32_weights': args.weights,
+        'calibration_clips': len(calibration)
+    })
+    print(f"Saved {mode} INT8 model to {args.output}")
+
+    # Reload through ThreatDetector so the report covers the shipped artifact
+    int8 = ThreatDetector(quantized_model_path=args.output, **detector_args)
+
+    test = load_samples(args.data, 'test', args.test_clips)
+    if not test:
+        print(f"ERROR: No test clips found in {args.data}/test")
+        return
+
+    results = {name: evaluate(detector, test) for name, detector in [('fp32', fp32), ('int8', int8)]}
+    top_fp32 = results['fp32'].pop('_top_classes')
+    top_int8 = results['int8'].pop('_top_classes')
+
+    report = {
+        'model_type': args.model_type,
+        'quantization': mode,
+        'clip_length': args.clip_length,
+        'test_clips': len(test),
+        'fp32': results['fp32'],
+        'int8': results['int8'],
+        'speedup': results['fp32']['ms_per_clip_p50'] / results['int8']['ms_per_clip_p50'],
+        'top_class_agreement': float(np.mean([a == b for a, b in zip(top_fp32, top_int8)]))
+    }
+
+    print(f"\n{len(test)} test clips of {args.clip_length} frames")
+    print(f"{'model':>6} {'p50':>10} {'p95':>10} {'clips/s':>8} {'acc':>6} {'f1':>6}")
+    for name in ('fp32', 'int8'):
+        r = results[name]
+        print(
+            f"{name:>6} "
+            f"{r['ms_per_clip_p50']:>7.1f} ms "
+            f"{r['ms_per_clip_p95']:>7.1f} ms "
+            f"{r['clips_per_second']:>8.2f} "
+            f"{r['accuracy']:>6.3f} "
+            f"{r['f1_score']:>6.3f}"
+        )
+    print(f"Speedup: {report['speedup']:.2f}x, "
+          f"top-class agreement: {report['top_class_agreement']:.1%}")
+
+    Path(args.report).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.report, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report saved to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
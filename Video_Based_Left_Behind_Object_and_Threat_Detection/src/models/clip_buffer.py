@@ -0,0 +1,80 @@
+"""
+Clip Buffer
+Preallocated float32 ring buffer holding normalized frames in (C, T, H, W) layout
+"""
+
+import cv2
+import numpy as np
+from typing import Tuple
+
+# ImageNet statistics
+IMAGENET_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+IMAGENET_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+
+
+class ClipBuffer:
+    """
+    Fixed-size clip of the most recent frames, ready for 3D-CNN input
+
+    Every frame is resized, converted to RGB and normalized once, directly
+    into its slot. Each frame is stored twice, at ``pos`` and ``pos + T``,
+    so the last ``T`` frames are always the contiguous time range
+    ``[head, head + T)`` and ``clip()`` returns them in temporal order as a
+    view, without stacking or copying.
+    """
+
+    def __init__(self, clip_length: int, size: Tuple[int, int] = (224, 224)):
+        """
+        Initialize clip buffer
+
+        Args:
+            clip_length: Number of frames per clip (T)
+            size: Frame size as (height, width)
+        """
+        self.clip_length = clip_length
+        self.size = size
+        height, width = size
+
+        self.data = np.zeros((3, 2 * clip_length, height, width), dtype=np.float32)
+        self.count = 0  # Total frames written
+
+        # (x / 255 - mean) / std == x * scale - offset
+        self.scale = (1.0 / (255.0 * IMAGENET_STD)).astype(np.float32)
+        self.offset = (IMAGENET_MEAN / IMAGENET_STD).astype(np.float32)
+
+    def __len__(self) -> int:
+        return min(self.count, self.clip_length)
+
+    def append(self, frame: np.ndarray):
+        """
+        Preprocess a BGR frame into the next slot
+
+        Args:
+            frame: Input frame (BGR, uint8)
+        """
+        height, width = self.size
+        rgb = cv2.cvtColor(cv2.resize(frame, (width, height)), cv2.COLOR_BGR2RGB)
+
+        pos = self.count % self.clip_length
+        slot = self.data[:, pos]
+        for channel in range(3):
+            np.multiply(rgb[..., channel], self.scale[channel], out=slot[channel])
+            slot[channel] -= self.offset[channel]
+
+        # Mirror copy keeps the latest clip contiguous in time
+        self.data[:, pos + self.clip_length] = slot
+        self.count += 1
+
+    def clip(self) -> np.ndarray:
+        """
+        Latest frames in temporal order, oldest first
+
+        Returns:
+            View of shape (C, T, H, W); it is overwritten by later appends
+        """
+        head = self.count % self.clip_length if self.count >= self.clip_length else 0
+        return self.data[:, head:head + self.clip_length]
+
+    def clear(self):
+        """Forget all frames (the memory is kept for reuse)"""
+        self.count = 0
@@ -0,0 +1,140 @@
+"""
+Detection Zones
+Restricts object detection to the polygons configured per camera
+"""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class DetectionZones:
+    """
+    Zone-aware inference for one camera
+
+    Frames are cropped to the bounding rectangle of all zone polygons (plus
+    a margin) so the detector processes fewer pixels; boxes found in the
+    crop are shifted back to frame coordinates, and detections whose
+    centres fall outside every polygon are dropped before tracking.
+
+    Coordinates are frame pixels, as in the ``detection_zones`` entries of
+    ``config.yaml``.
+    """
+
+    def __init__(self, polygons: List[List[List[float]]], margin: int = 0):
+        """
+        Initialize detection zones
+
+        Args:
+            polygons: Zone polygons, each a list of [x, y] points
+            margin: Pixels kept around the zones' bounding rectangle when cropping
+        """
+        self.polygons = [
+            np.asarray(points, dtype=np.float32).reshape(-1, 1, 2)
+            for points in polygons if len(points) >= 3
+        ]
+        if not self.polygons:
+            raise ValueError("Detection zones need at least one polygon with 3 or more points")
+        self.margin = margin
+
+        points = np.concatenate(self.polygons).reshape(-1, 2)
+        self.bounds = (
+            float(points[:, 0].min()), float(points[:, 1].min()),
+            float(points[:, 0].max()), float(points[:, 1].max())
+        )
+        self.frames_cropped = 0
+        self.detections_dropped = 0
+
+    @classmethod
+    def from_camera(cls, camera_config: Dict, margin: int = 0) -> Optional['DetectionZones']:
+        """
+        Build zones from a camera's config entry
+
+        Returns:
+            DetectionZones, or None if the camera has no usable zones
+        """
+        polygons = [
+            zone['coordinates'] for zone in camera_config.get('detection_zones') or []
+            if len(zone.get('coordinates') or []) >= 3
+        ]
+        if not polygons:
+            return None
+        return cls(polygons, margin)
+
+    def crop_rect(self, frame_shape: Tuple[int, ...]) -> Tuple[int, int, int, int]:
+        """
+        Integer crop rectangle clipped to the frame
+
+        Returns:
+            (x1, y1, x2, y2) in frame pixels
+        """
+        height, width = frame_shape[:2]
+        x1, y1, x2, y2 = self.bounds
+        x1 = int(max(0, np.floor(x1 - self.margin)))
+        y1 = int(max(0, np.floor(y1 - self.margin)))
+        x2 = int(min(width, np.ceil(x2 + self.margin)))
+        y2 = int(min(height, np.ceil(y2 + self.margin)))
+        if x2 <= x1 or y2 <= y1:
+            return 0, 0, width, height
+        return x1, y1, x2, y2
+
+    def crop(self, frame: np.ndarray) -> Tuple[np.ndarray, Tuple[int, int]]:
+        """
+        Crop a frame to the zones
+
+        Args:
+            frame: Input frame
+
+        Returns:
+            Tuple of (cropped view, (x offset, y offset))
+        """
+        x1, y1, x2, y2 = self.crop_rect(frame.shape)
+        height, width = frame.shape[:2]
+        if (x1, y1, x2, y2) == (0, 0, width, height):
+            return frame, (0, 0)
+        self.frames_cropped += 1
+        return frame[y1:y2, x1:x2], (x1, y1)
+
+    def to_frame(self, detections: List[Dict], offset: Tuple[int, int]) -> List[Dict]:
+        """Shift detection boxes from crop to frame coordinates (in place)"""
+        dx, dy = offset
+        if dx or dy:
+            for det in detections:
+                x1, y1, x2, y2 = det['bbox']
+                det['bbox'] = [x1 + dx, y1 + dy, x2 + dx, y2 + dy]
+        return detections
+
+    def contains(self, point: Tuple[float, float]) -> bool:
+        """Whether a point lies inside (or on the edge of) any zone"""
+        point = (float(point[0]), float(point[1]))
+        return any(cv2.pointPolygonTest(polygon, point, False) >= 0 for polygon in self.polygons)
+
+    def filter(self, detections: List[Dict]) -> List[Dict]:
+        """
+        Drop detections whose box centre is outside every zone
+
+        Args:
+            detections: Detections in frame coordinates
+
+        Returns:
+            Detections inside the zones
+        """
+        kept = []
+        for det in detections:
+            x1, y1, x2, y2 = det['bbox']
+            if self.contains(((x1 + x2) / 2, (y1 + y2) / 2)):
+                kept.append(det)
+        self.detections_dropped += len(detections) - len(kept)
+        return kept
+
+    def stats(self) -> Dict:
+        """Counters for status reporting"""
+        return {
+            'zones': len(self.polygons),
+            'frames_cropped': self.frames_cropped,
+            'detections_dropped': self.detections_dropped
+        }
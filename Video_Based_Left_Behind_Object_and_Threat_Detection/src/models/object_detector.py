@@ -17,6 +17,9 @@ logger = logging.getLogger(__name__)
 class LeftBehindObjectDetector:
     """
     Detects left-behind objects in classroom environments using YOLOv8
+
+    Inference runs through ultralytics/PyTorch (``model_type="yolov8"``) or
+    through ONNX Runtime on an exported model (``model_type="onnx"``).
     """
     
     def __init__(
@@ -25,22 +28,33 @@ class LeftBehindObjectDetector:
         confidence_threshold: float = 0.5,
         iou_threshold: float = 0.45,
         target_classes: Optional[List[str]] = None,
-        device: str = "cuda" if torch.cuda.is_available() else "cpu"
+        device: str = "cuda" if torch.cuda.is_available() else "cpu",
+        model_type: str = "yolov8",
+        input_size: Tuple[int, int] = (640, 640),
+        scale_up: bool = True
     ):
         """
         Initialize the object detector
         
         Args:
-            model_path: Path to YOLOv8 model weights
+            model_path: Path to YOLOv8 model weights (.pt, or .onnx for the ONNX backend)
             confidence_threshold: Minimum confidence for detections
             iou_threshold: IoU threshold for NMS
             target_classes: List of class names to detect (e.g., ['backpack', 'book'])
             device: Device to run inference on ('cuda' or 'cpu')
+            model_type: Inference backend ('yolov8' or 'onnx')
+            input_size: Model input size as (height, width)
+            scale_up: Enlarge frames smaller than input_size to fill it; with
+                False small frames (e.g. detection zone crops) run at their
+                own size, which is faster
         """
         self.model_path = model_path
         self.confidence_threshold = confidence_threshold
         self.iou_threshold = iou_threshold
         self.device = device
+        self.model_type = model_type
+        self.input_size = tuple(input_size)
+        self.scale_up = scale_up
         
         # Default target classes for left-behind objects
         if target_classes is None:
@@ -52,19 +66,45 @@ class LeftBehindObjectDetector:
             self.target_classes = target_classes
         
         # Load model
-        logger.info(f"Loading YOLOv8 model from {model_path}")
-        self.model = YOLO(model_path)
-        self.model.to(self.device)
-        
-        # Get class names from model
-        self.class_names = self.model.names
+        if model_type == "onnx":
+            from .onnx_backend import OnnxYoloBackend
+
+            onnx_path = Path(model_path)
+            if onnx_path.suffix != '.onnx':
+                onnx_path = onnx_path.with_suffix('.onnx')
+            self.model = None
+            self.backend = OnnxYoloBackend(str(onnx_path), input_size=self.input_size)
+            self.device = "cpu"
+            self.class_names = self.backend.names
+            self.stride = self.backend.stride
+        elif model_type == "yolov8":
+            logger.info(f"Loading YOLOv8 model from {model_path}")
+            self.model = YOLO(model_path)
+            self.model.to(self.device)
+            self.backend = None
+            self.class_names = self.model.names
+            self.stride = int(max(getattr(self.model.model, 'stride', [32])))
+        else:
+            raise ValueError(f"Unknown model type: {model_type}")
         
         # Create mapping of target class names to indices
         self.target_class_indices = self._get_target_class_indices()
         
-        logger.info(f"Model loaded successfully on {self.device}")
+        logger.info(f"Model loaded successfully on {self.device} ({model_type} backend)")
         logger.info(f"Target classes: {self.target_classes}")
         logger.info(f"Target class indices: {self.target_class_indices}")
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'LeftBehindObjectDetector':
+        """Build a detector from the object_detection config section"""
+        return cls(
+            model_path=config['model']['weights'],
+            confidence_threshold=config['model']['confidence_threshold'],
+            target_classes=config['target_classes'],
+            model_type=config['model'].get('type', 'yolov8'),
+            input_size=config['model'].get('input_size', [640, 640]),
+            scale_up=config['model'].get('scale_up', True)
+        )
     
     def _get_target_class_indices(self) -> List[int]:
         """Get indices of target classes from model class names"""
@@ -75,6 +115,114 @@ class LeftBehindObjectDetector:
                     indices.append(idx)
                     break
         return indices
+
+    @property
+    def resizable(self) -> bool:
+        """Whether input_size can change at runtime (fixed-shape ONNX exports cannot)"""
+        return self.backend is None or self.backend.dynamic
+
+    def set_input_size(self, input_size: Tuple[int, int]) -> bool:
+        """
+        Change the inference size for subsequent calls
+
+        Args:
+            input_size: New (height, width)
+
+        Returns:
+            False if the backend has a fixed input shape
+        """
+        if not self.resizable:
+            return False
+        self.input_size = tuple(int(side) for side in input_size)
+        if self.backend is not None:
+            self.backend.input_size = self.input_size
+        return True
+
+    def _input_size(self, frames: List[np.ndarray]) -> Tuple[int, int]:
+        """
+        Inference size for a list of frames
+
+        Without scale_up, frames that fit inside input_size keep their
+        scale: the size shrinks to the largest frame, rounded up to the stride.
+        """
+        if self.scale_up:
+            return self.input_size
+
+        height = max(frame.shape[0] for frame in frames)
+        width = max(frame.shape[1] for frame in frames)
+        ratio = min(1.0, self.input_size[0] / height, self.input_size[1] / width)
+        stride = self.stride
+        return (
+            min(self.input_size[0], int(np.ceil(height * ratio / stride)) * stride),
+            min(self.input_size[1], int(np.ceil(width * ratio / stride)) * stride)
+        )
+
+    def _predict(self, frames: List[np.ndarray]) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Run the selected backend on a list of frames
+
+        Returns:
+            Per frame: (boxes [x1, y1, x2, y2], confidences, class ids) arrays
+        """
+        input_size = self._input_size(frames)
+        if self.backend is not None:
+            return self.backend.predict(
+                frames, self.confidence_threshold, self.iou_threshold, input_size
+            )
+
+        results = self.model(
+            frames,
+            conf=self.confidence_threshold,
+            iou=self.iou_threshold,
+            imgsz=list(input_size),
+            verbose=False
+        )
+
+        outputs = []
+        for result in results:
+            if result.boxes is None:
+                outputs.append((np.zeros((0, 4)), np.zeros(0), np.zeros(0, dtype=int)))
+                continue
+            outputs.append((
+                result.boxes.xyxy.cpu().numpy(),  # x1, y1, x2, y2
+                result.boxes.conf.cpu().numpy(),
+                result.boxes.cls.cpu().numpy().astype(int)
+            ))
+        return outputs
+
+    def _to_detections(
+        self,
+        boxes: np.ndarray,
+        confidences: np.ndarray,
+        class_ids: np.ndarray,
+        filter_classes: bool,
+        include_unknown: bool
+    ) -> List[Dict]:
+        """Convert backend output arrays into detection dictionaries"""
+        detections = []
+
+        for box, conf, class_id in zip(boxes, confidences, class_ids):
+            is_target_class = class_id in self.target_class_indices
+
+            # Skip if filtering and not a target class and not including unknown
+            if filter_classes and not is_target_class and not include_unknown:
+                continue
+
+            # Determine class name
+            original_class_name = self.class_names[class_id]
+            class_name = original_class_name if is_target_class else "unknown"
+
+            detection = {
+                'bbox': box.tolist(),
+                'confidence': float(conf),
+                'class_id': int(class_id),
+                'class_name': class_name,
+                'original_class_name': original_class_name,  # Keep original for reference
+                'is_unknown': not is_target_class
+            }
+            detections.append(detection)
+
+        return detections
     
     def detect(
         self,
@@ -98,44 +246,8 @@ class LeftBehindObjectDetector:
                 - class_name: str
                 - is_unknown: bool (True if not in target_classes)
         """
-        # Run inference
-        results = self.model(
-            frame,
-            conf=self.confidence_threshold,
-            iou=self.iou_threshold,
-            verbose=False
-        )[0]
-
-        detections = []
-
-        # Process results
-        if results.boxes is not None:
-            boxes = results.boxes.xyxy.cpu().numpy()  # x1, y1, x2, y2
-            confidences = results.boxes.conf.cpu().numpy()
-            class_ids = results.boxes.cls.cpu().numpy().astype(int)
-
-            for box, conf, class_id in zip(boxes, confidences, class_ids):
-                is_target_class = class_id in self.target_class_indices
-
-                # Skip if filtering and not a target class and not including unknown
-                if filter_classes and not is_target_class and not include_unknown:
-                    continue
-
-                # Determine class name
-                original_class_name = self.class_names[class_id]
-                class_name = original_class_name if is_target_class else "unknown"
-
-                detection = {
-                    'bbox': box.tolist(),
-                    'confidence': float(conf),
-                    'class_id': int(class_id),
-                    'class_name': class_name,
-                    'original_class_name': original_class_name,  # Keep original for reference
-                    'is_unknown': not is_target_class
-                }
-                detections.append(detection)
-
-        return detections
+        boxes, confidences, class_ids = self._predict([frame])[0]
+        return self._to_detections(boxes, confidences, class_ids, filter_classes, include_unknown)
     
     def detect_batch(
         self,
@@ -154,48 +266,10 @@ class LeftBehindObjectDetector:
         Returns:
             List of detection lists for each frame
         """
-        # Run batch inference
-        results = self.model(
-            frames,
-            conf=self.confidence_threshold,
-            iou=self.iou_threshold,
-            verbose=False
-        )
-
-        all_detections = []
-
-        for result in results:
-            detections = []
-
-            if result.boxes is not None:
-                boxes = result.boxes.xyxy.cpu().numpy()
-                confidences = result.boxes.conf.cpu().numpy()
-                class_ids = result.boxes.cls.cpu().numpy().astype(int)
-
-                for box, conf, class_id in zip(boxes, confidences, class_ids):
-                    is_target_class = class_id in self.target_class_indices
-
-                    # Skip if filtering and not a target class and not including unknown
-                    if filter_classes and not is_target_class and not include_unknown:
-                        continue
-
-                    # Determine class name
-                    original_class_name = self.class_names[class_id]
-                    class_name = original_class_name if is_target_class else "unknown"
-
-                    detection = {
-                        'bbox': box.tolist(),
-                        'confidence': float(conf),
-                        'class_id': int(class_id),
-                        'class_name': class_name,
-                        'original_class_name': original_class_name,
-                        'is_unknown': not is_target_class
-                    }
-                    detections.append(detection)
-
-            all_detections.append(detections)
-
-        return all_detections
+        return [
+            self._to_detections(boxes, confidences, class_ids, filter_classes, include_unknown)
+            for boxes, confidences, class_ids in self._predict(frames)
+        ]
 
     def visualize_detections(
         self,
@@ -328,9 +402,15 @@ class LeftBehindObjectDetector:
             format: Export format ('onnx', 'torchscript', 'tflite', 'edgetpu')
             output_path: Output path for exported model
         """
+        if self.model is None:
+            raise RuntimeError("export_model requires the yolov8 (PyTorch) backend")
+
         logger.info(f"Exporting model to {format}")
 
-        self.model.export(format=format)
+        # Dynamic ONNX shapes let the ONNX backend batch frames and skip
+        # letterbox padding beyond the model stride
+        export_args = {'dynamic': True} if format == "onnx" else {}
+        self.model.export(format=format, imgsz=list(self.input_size), **export_args)
 
         logger.info(f"Model exported successfully")
 
@@ -0,0 +1,269 @@
+"""
+ONNX Runtime Detection Backend
+Runs an exported YOLOv8 ONNX model on CPU with NumPy pre- and postprocessing
+"""
+
+import ast
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    import onnxruntime as ort
+except ImportError:  # pragma: no cover - optional dependency
+    ort = None
+
+# Class offset used to run NMS for all classes in one pass
+MAX_WH = 7680
+
+
+def letterbox(
+    image: np.ndarray,
+    new_shape: Tuple[int, int] = (640, 640),
+    color: int = 114,
+    auto: bool = False,
+    stride: int = 32
+) -> Tuple[np.ndarray, Tuple[float, float], Tuple[int, int]]:
+    """
+    Resize keeping the aspect ratio and pad to ``new_shape`` (as ultralytics does)
+
+    Args:
+        image: Input image (H, W, C)
+        new_shape: Target (height, width)
+        color: Padding value
+        auto: Pad only up to a multiple of ``stride`` (minimum rectangle)
+            instead of the full ``new_shape``
+        stride: Model stride used with ``auto``
+
+    Returns:
+        Tuple of (padded image, (gain_y, gain_x), (pad_x, pad_y))
+    """
+    height, width = image.shape[:2]
+    ratio = min(new_shape[0] / height, new_shape[1] / width)
+    new_w, new_h = round(width * ratio), round(height * ratio)
+
+    if (width, height) != (new_w, new_h):
+        image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+
+    dw, dh = new_shape[1] - new_w, new_shape[0] - new_h
+    if auto:
+        dw, dh = dw % stride, dh % stride
+    dw, dh = dw / 2, dh / 2
+    top, bottom = round(dh - 0.1), round(dh + 0.1)
+    left, right = round(dw - 0.1), round(dw + 0.1)
+    image = cv2.copyMakeBorder(
+        image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(color,) * 3
+    )
+    return image, (new_h / height, new_w / width), (left, top)
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """
+    Greedy non-maximum suppression
+
+    IoU is computed between each kept box and the boxes still remaining,
+    so memory stays linear in the number of candidates.
+
+    Args:
+        boxes: (N, 4) boxes as [x1, y1, x2, y2]
+        scores: (N,) confidence scores
+        iou_threshold: Boxes overlapping a kept box by more than this are removed
+
+    Returns:
+        Indices of kept boxes, highest score first
+    """
+    order = np.argsort(-scores, kind='stable')
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+
+    keep = []
+    while len(order):
+        i, rest = order[0], order[1:]
+        keep.append(i)
+
+        x1 = np.maximum(boxes[i, 0], boxes[rest, 0])
+        y1 = np.maximum(boxes[i, 1], boxes[rest, 1])
+        x2 = np.minimum(boxes[i, 2], boxes[rest, 2])
+        y2 = np.minimum(boxes[i, 3], boxes[rest, 3])
+        intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+        union = areas[i] + areas[rest] - intersection
+        iou = np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+        order = rest[iou <= iou_threshold]
+
+    return np.array(keep, dtype=int)
+
+
+def postprocess(
+    output: np.ndarray,
+    conf_threshold: float,
+    iou_threshold: float,
+    max_det: int = 300,
+    max_nms: int = 30000
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Decode one image's raw YOLOv8 output and apply class-aware NMS
+
+    Args:
+        output: Raw head output of shape (4 + num_classes, num_anchors)
+        conf_threshold: Minimum class score
+        iou_threshold: NMS IoU threshold
+        max_det: Maximum detections kept
+        max_nms: Maximum candidates passed to NMS
+
+    Returns:
+        Tuple of (boxes (N, 4) xyxy in model input pixels, scores (N,), class ids (N,))
+    """
+    predictions = output.T  # (anchors, 4 + classes)
+    class_scores = predictions[:, 4:]
+    class_ids = class_scores.argmax(axis=1)
+    scores = class_scores[np.arange(len(class_ids)), class_ids]
+
+    candidates = scores > conf_threshold
+    if not candidates.any():
+        empty = np.zeros((0, 4), dtype=np.float32)
+        return empty, np.zeros(0, dtype=np.float32), np.zeros(0, dtype=int)
+
+    xywh = predictions[candidates, :4]
+    scores = scores[candidates]
+    class_ids = class_ids[candidates]
+
+    if len(scores) > max_nms:
+        top = np.argsort(-scores)[:max_nms]
+        xywh, scores, class_ids = xywh[top], scores[top], class_ids[top]
+
+    boxes = np.empty_like(xywh)
+    boxes[:, :2] = xywh[:, :2] - xywh[:, 2:] / 2
+    boxes[:, 2:] = xywh[:, :2] + xywh[:, 2:] / 2
+
+    # Offset boxes by class so one NMS pass never suppresses across classes
+    keep = nms(boxes + class_ids[:, None] * MAX_WH, scores, iou_threshold)[:max_det]
+    return boxes[keep], scores[keep], class_ids[keep]
+
+
+class OnnxYoloBackend:
+    """
+    YOLOv8 inference through ONNX Runtime
+
+    Produces the same (boxes, scores, class ids) per image as the
+    ultralytics path, so LeftBehindObjectDetector can use either.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        input_size: Tuple[int, int] = (640, 640),
+        num_threads: Optional[int] = None
+    ):
+        """
+        Initialize ONNX backend
+
+        Args:
+            model_path: Path to an ONNX model exported with export_model()
+            input_size: (height, width) used if the model has dynamic input
+            num_threads: Intra-op threads (None lets ONNX Runtime decide)
+        """
+        if ort is None:
+            raise ImportError("onnxruntime is required for the ONNX backend")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+
+        logger.info(f"Loading ONNX model from {model_path}")
+        self.session = ort.InferenceSession(
+            model_path, sess_options=options, providers=['CPUExecutionProvider']
+        )
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+
+        # Fixed-shape exports dictate the input size; dynamic ones use ours
+        # and, like ultralytics, only pad frames to a multiple of the stride
+        height, width = model_input.shape[2:4]
+        self.dynamic = not (isinstance(height, int) and isinstance(width, int))
+        self.input_size = tuple(input_size) if self.dynamic else (height, width)
+        batch = model_input.shape[0]
+        self.fixed_batch = batch if isinstance(batch, int) else None
+
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names: Dict[int, str] = (
+            ast.literal_eval(metadata['names']) if 'names' in metadata else {}
+        )
+        self.stride = int(metadata.get('stride', 32))
+
+    def preprocess(
+        self,
+        frames: List[np.ndarray],
+        input_size: Optional[Tuple[int, int]] = None
+    ) -> Tuple[List[np.ndarray], List[Tuple]]:
+        """
+        Letterbox BGR frames into NCHW float32 RGB tensors
+
+        Args:
+            frames: BGR frames
+            input_size: (height, width) for this call; only dynamic models
+                accept anything other than self.input_size
+
+        Returns:
+            Tuple of (one (1, 3, H, W) tensor per frame,
+                      per-frame (gain, pad) for mapping boxes back)
+        """
+        input_size = tuple(input_size) if input_size and self.dynamic else self.input_size
+        tensors, transforms = [], []
+        for frame in frames:
+            padded, gain, pad = letterbox(
+                frame, input_size, auto=self.dynamic, stride=self.stride
+            )
+            # HWC BGR uint8 -> CHW RGB float in [0, 1]
+            tensor = np.empty((1, 3) + padded.shape[:2], dtype=np.float32)
+            np.multiply(padded[..., ::-1].transpose(2, 0, 1), 1.0 / 255.0, out=tensor[0])
+            tensors.append(tensor)
+            transforms.append((gain, pad))
+        return tensors, transforms
+
+    def _run(self, tensors: List[np.ndarray]) -> List[np.ndarray]:
+        """Run the session, batching frames whenever shapes allow"""
+        same_shape = len({tensor.shape for tensor in tensors}) == 1
+        can_batch = self.fixed_batch is None or self.fixed_batch == len(tensors)
+        if same_shape and can_batch:
+            return list(self.session.run(None, {self.input_name: np.concatenate(tensors)})[0])
+        return [self.session.run(None, {self.input_name: tensor})[0][0] for tensor in tensors]
+
+    def predict(
+        self,
+        frames: List[np.ndarray],
+        conf_threshold: float,
+        iou_threshold: float,
+        input_size: Optional[Tuple[int, int]] = None
+    ) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Detect objects in a list of frames
+
+        Args:
+            frames: BGR frames
+            conf_threshold: Minimum class score
+            iou_threshold: NMS IoU threshold
+            input_size: Optional (height, width) overriding self.input_size
+
+        Returns:
+            Per frame: (boxes (N, 4) xyxy in frame pixels, scores (N,), class ids (N,))
+        """
+        tensors, transforms = self.preprocess(frames, input_size)
+        outputs = self._run(tensors)
+
+        results = []
+        for frame, output, ((gain_y, gain_x), (pad_x, pad_y)) in zip(frames, outputs, transforms):
+            boxes, scores, class_ids = postprocess(output, conf_threshold, iou_threshold)
+
+            # Undo letterboxing and clip to the frame
+            boxes[:, [0, 2]] = (boxes[:, [0, 2]] - pad_x) / gain_x
+            boxes[:, [1, 3]] = (boxes[:, [1, 3]] - pad_y) / gain_y
+            height, width = frame.shape[:2]
+            boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, width)
+            boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, height)
+
+            results.append((boxes, scores, class_ids))
+        return results
@@ -8,9 +8,12 @@ import torch.nn as nn
 import cv2
 import numpy as np
 from typing import List, Dict, Tuple, Optional
-from collections import deque
+import copy
 import logging
 
+from .clip_buffer import ClipBuffer, IMAGENET_MEAN, IMAGENET_STD
+from .threat_quantization import load_quantized
+
 logger = logging.getLogger(__name__)
 
 
@@ -26,7 +29,8 @@ class ThreatDetector:
         model_type: str = "slowfast",
         confidence_threshold: float = 0.7,
         clip_length: int = 32,
-        device: str = "cuda" if torch.cuda.is_available() else "cpu"
+        device: str = "cuda" if torch.cuda.is_available() else "cpu",
+        quantized_model_path: Optional[str] = None
     ):
         """
         Initialize threat detector
@@ -37,15 +41,22 @@ class ThreatDetector:
             confidence_threshold: Minimum confidence for threat detection
             clip_length: Number of frames to analyze together
             device: Device to run inference on
+            quantized_model_path: INT8 artifact from scripts/quantize_threat_model.py;
+                used instead of the FP32 model when given (CPU only)
         """
+        if quantized_model_path and device != "cpu":
+            logger.warning("Quantized threat models run on CPU only, ignoring device")
+            device = "cpu"
+
         self.model_path = model_path
+        self.quantized_model_path = quantized_model_path
         self.model_type = model_type
         self.confidence_threshold = confidence_threshold
         self.clip_length = clip_length
         self.device = device
         
-        # Frame buffer for temporal analysis
-        self.frame_buffer = deque(maxlen=clip_length)
+        # Preallocated (C, T, H, W) ring buffer for temporal analysis
+        self.frame_buffer = ClipBuffer(clip_length)
         
         # Threat classes
         self.threat_classes = [
@@ -61,18 +72,34 @@ class ThreatDetector:
         # Load model
         self.model = self._load_model()
         
-        logger.info(f"Threat detector initialized with {model_type} on {device}")
+        precision = "INT8" if quantized_model_path else "FP32"
+        logger.info(f"Threat detector initialized with {model_type} ({precision}) on {device}")
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'ThreatDetector':
+        """Build a detector from the threat_detection config section"""
+        return cls(
+            model_path=config['model']['weights'],
+            model_type=config['model']['type'],
+            confidence_threshold=config['model']['confidence_threshold'],
+            clip_length=config['model']['clip_length'],
+            quantized_model_path=config['model'].get('quantized_weights')
+        )
     
     def _load_model(self):
-        """Load the threat detection model"""
+        """Load the threat detection model (the INT8 artifact if configured)"""
         if self.model_type == "slowfast":
-            return self._load_slowfast_model()
+            model = self._load_slowfast_model()
         elif self.model_type == "x3d":
-            return self._load_x3d_model()
+            model = self._load_x3d_model()
         elif self.model_type == "i3d":
-            return self._load_i3d_model()
+            model = self._load_i3d_model()
         else:
             raise ValueError(f"Unknown model type: {self.model_type}")
+
+        if self.quantized_model_path:
+            model = load_quantized(model, self.quantized_model_path, self.model_type)
+        return model
     
     def _load_slowfast_model(self):
         """Load SlowFast model for action recognition"""
@@ -197,16 +224,13 @@ class ThreatDetector:
         frame = frame.astype(np.float32) / 255.0
 
         # Normalize with ImageNet stats
-        mean = np.array([0.485, 0.456, 0.406])
-        std = np.array([0.229, 0.224, 0.225])
-        frame = (frame - mean) / std
+        frame = (frame - IMAGENET_MEAN) / IMAGENET_STD
 
         return frame
 
     def add_frame(self, frame: np.ndarray):
-        """Add a frame to the buffer"""
-        preprocessed = self.preprocess_frame(frame)
-        self.frame_buffer.append(preprocessed)
+        """Add a frame to the buffer (preprocessed in place)"""
+        self.frame_buffer.append(frame)
 
     def detect(self, frame: Optional[np.ndarray] = None) -> Dict:
         """
@@ -240,14 +264,10 @@ class ThreatDetector:
             }
 
         try:
-            # Prepare input tensor
+            # Prepare input tensor without copying on CPU
             # Shape: (batch, channels, time, height, width)
-            frames = np.stack(list(self.frame_buffer), axis=0)  # (T, H, W, C)
-            frames = np.transpose(frames, (3, 0, 1, 2))  # (C, T, H, W)
-            frames = np.expand_dims(frames, axis=0)  # (1, C, T, H, W)
-
-            # Convert to tensor
-            frames_tensor = torch.from_numpy(frames).float().to(self.device)
+            clip = self.frame_buffer.clip()  # (C, T, H, W) view, oldest first
+            frames_tensor = torch.from_numpy(clip).unsqueeze(0).to(self.device)
 
             # Run inference
             with torch.no_grad():
@@ -318,6 +338,17 @@ class ThreatDetector:
         """Clear the frame buffer"""
         self.frame_buffer.clear()
 
+    def spawn_stream(self) -> 'ThreatDetector':
+        """
+        Create a detector for another video stream that shares this model
+
+        The returned detector has its own frame buffer, so clips from
+        different cameras never mix, but no extra model is loaded.
+        """
+        stream = copy.copy(self)
+        stream.frame_buffer = ClipBuffer(self.clip_length, self.frame_buffer.size)
+        return stream
+
     def visualize_result(
         self,
         frame: np.ndarray,
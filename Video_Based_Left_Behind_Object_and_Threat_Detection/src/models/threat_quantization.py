@@ -0,0 +1,188 @@
+"""
+Threat Model Quantization
+INT8 post-training quantization of the threat models for CPU inference
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import torch
+import torch.nn as nn
+import torch.ao.quantization as tq
+
+logger = logging.getLogger(__name__)
+
+QUANTIZATION_MODES = ('static', 'dynamic')
+
+# Layers followed by these are fused before static quantization
+_FUSABLE = (nn.Conv3d, nn.Conv2d, nn.Linear)
+_NORMS = (nn.BatchNorm3d, nn.BatchNorm2d)
+
+
+def default_backend() -> str:
+    """Quantized engine for this CPU (fbgemm on x86, qnnpack on ARM)"""
+    engines = torch.backends.quantized.supported_engines
+    return 'fbgemm' if 'fbgemm' in engines else 'qnnpack'
+
+
+def default_mode(model_type: str) -> str:
+    """
+    Best supported mode for a threat model type
+
+    Static quantization quantizes the 3D convolutions, which is where the
+    time goes, but needs a single-tensor input; SlowFast takes a list of
+    pathways, so it falls back to dynamic quantization of its linear layers.
+    """
+    return 'dynamic' if model_type == 'slowfast' else 'static'
+
+
+def _fusion_groups(model: nn.Module) -> List[List[str]]:
+    """Find conv/linear (+ batch norm) + ReLU runs inside Sequential blocks"""
+    groups = []
+    for name, module in model.named_modules():
+        if not isinstance(module, nn.Sequential):
+            continue
+        children = list(module.named_children())
+        i = 0
+        while i < len(children):
+            group = [children[i]]
+            if isinstance(children[i][1], _FUSABLE):
+                j = i + 1
+                if (j < len(children) and isinstance(children[j][1], _NORMS)
+                        and not isinstance(children[i][1], nn.Linear)):
+                    group.append(children[j])
+                    j += 1
+                if j < len(children) and isinstance(children[j][1], nn.ReLU):
+                    group.append(children[j])
+            if len(group) > 1:
+                prefix = f"{name}." if name else ""
+                groups.append([prefix + child_name for child_name, _ in group])
+            i += len(group)
+    return groups
+
+
+def _prepare_static(model: nn.Module, backend: str) -> nn.Module:
+    """Fuse layers and insert observers (input quantized, output dequantized)"""
+    torch.backends.quantized.engine = backend
+    model.eval()
+
+    groups = _fusion_groups(model)
+    if groups:
+        tq.fuse_modules(model, groups, inplace=True)
+
+    wrapped = tq.QuantWrapper(model)
+    wrapped.eval()
+    wrapped.qconfig = tq.get_default_qconfig(backend)
+    return tq.prepare(wrapped, inplace=False)
+
+
+def _quantize_dynamic(model: nn.Module, backend: str) -> nn.Module:
+    torch.backends.quantized.engine = backend
+    model.eval()
+    return tq.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+
+
+def quantize_model(
+    model: nn.Module,
+    mode: str = 'static',
+    calibration_clips: Optional[Iterable[torch.Tensor]] = None,
+    backend: Optional[str] = None
+) -> nn.Module:
+    """
+    Quantize an FP32 threat model to INT8
+
+    Args:
+        model: FP32 model in eval mode (modified in place by fusion)
+        mode: 'static' (weights and activations, needs calibration) or
+            'dynamic' (linear layer weights only)
+        calibration_clips: (N, C, T, H, W) batches representative of the
+            deployment data, used to calibrate activation ranges
+        backend: Quantized engine (defaults to default_backend())
+
+    Returns:
+        Quantized model (CPU only)
+    """
+    if mode not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization mode: {mode}")
+    backend = backend or default_backend()
+    model = model.cpu()
+
+    if mode == 'dynamic':
+        return _quantize_dynamic(model, backend)
+
+    if calibration_clips is None:
+        raise ValueError("Static quantization requires calibration clips")
+
+    prepared = _prepare_static(model, backend)
+    batches = 0
+    with torch.no_grad():
+        for clips in calibration_clips:
+            prepared(clips)
+            batches += 1
+    if batches == 0:
+        raise ValueError("No calibration clips were provided")
+    logger.info(f"Calibrated activation ranges on {batches} batch(es)")
+
+    return tq.convert(prepared, inplace=False)
+
+
+def save_quantized(model: nn.Module, path: str, mode: str, metadata: Optional[Dict] = None):
+    """
+    Save a quantized model as its own artifact
+
+    Args:
+        model: Model returned by quantize_model()
+        path: Output path (e.g. models/threat_detector_int8.pt)
+        mode: Quantization mode used
+        metadata: Extra fields stored with the weights (model type, clip length, ...)
+    """
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    checkpoint = dict(metadata or {})
+    checkpoint.update({
+        'model_state_dict': model.state_dict(),
+        'quantization': mode,
+        'backend': torch.backends.quantized.engine
+    })
+    torch.save(checkpoint, path)
+    logger.info(f"Saved {mode} INT8 model to {path}")
+
+
+def load_quantized(model: nn.Module, path: str, model_type: Optional[str] = None) -> nn.Module:
+    """
+    Rebuild a quantized model from an artifact written by save_quantized()
+
+    Args:
+        model: FP32 model with the same architecture (its weights are replaced)
+        path: Quantized artifact
+        model_type: Expected model type, checked against the artifact
+
+    Returns:
+        Quantized model in eval mode
+    """
+    checkpoint = torch.load(path, map_location='cpu')
+    saved_type = checkpoint.get('model_type')
+    if model_type and saved_type and saved_type != model_type:
+        raise ValueError(
+            f"Quantized model {path} was built for '{saved_type}', not '{model_type}'"
+        )
+
+    mode = checkpoint['quantization']
+    backend = checkpoint.get('backend') or default_backend()
+    model = model.cpu()
+
+    if mode == 'dynamic':
+        quantized = _quantize_dynamic(model, backend)
+    else:
+        # Same structure as after calibration; the scales come from the checkpoint
+        prepared = _prepare_static(model, backend)
+        with torch.no_grad():
+            for module in prepared.modules():
+                if isinstance(module, tq.ObserverBase):
+                    module(torch.zeros(1))
+        quantized = tq.convert(prepared, inplace=False)
+
+    quantized.load_state_dict(checkpoint['model_state_dict'])
+    quantized.eval()
+    logger.info(f"Loaded {mode} INT8 model from {path}")
+    return quantized
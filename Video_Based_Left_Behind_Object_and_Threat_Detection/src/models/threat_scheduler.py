@@ -0,0 +1,249 @@
+"""
+Threat Inference Scheduler
+Runs clip inference every N frames and carries the last result in between
+"""
+
+import time
+import logging
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def person_boxes(tracked_objects: List) -> List[List[float]]:
+    """
+    Boxes of tracked people (requires 'person' in object_detection.target_classes)
+
+    Args:
+        tracked_objects: TrackedObject instances from the object tracker
+
+    Returns:
+        [x1, y1, x2, y2] box per person
+    """
+    return [list(obj.bbox) for obj in tracked_objects if obj.class_name == 'person']
+
+
+def union_crop(frame: np.ndarray, boxes: List[List[float]], margin: float = 0.1) -> np.ndarray:
+    """
+    Crop a frame to the union of bounding boxes
+
+    Args:
+        frame: Input frame
+        boxes: [x1, y1, x2, y2] boxes (e.g. detected people)
+        margin: Extra border as a fraction of the union's width/height
+
+    Returns:
+        Cropped view of the frame (the full frame if boxes is empty)
+    """
+    if len(boxes) == 0:
+        return frame
+
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    x1, y1 = boxes[:, 0].min(), boxes[:, 1].min()
+    x2, y2 = boxes[:, 2].max(), boxes[:, 3].max()
+    pad_x, pad_y = (x2 - x1) * margin, (y2 - y1) * margin
+
+    height, width = frame.shape[:2]
+    x1, y1 = max(0, int(x1 - pad_x)), max(0, int(y1 - pad_y))
+    x2, y2 = min(width, int(np.ceil(x2 + pad_x))), min(height, int(np.ceil(y2 + pad_y)))
+    if x2 <= x1 or y2 <= y1:
+        return frame
+    return frame[y1:y2, x1:x2]
+
+
+class ThreatScheduler:
+    """
+    Strided wrapper around a ThreatDetector stream
+
+    Every frame is added to the clip buffer (which is cheap), but the model
+    only runs every ``stride`` frames; consecutive clips overlap by all but a
+    few frames, so the result in between is carried forward. With
+    ``adaptive`` enabled the stride shrinks towards ``min_stride`` as the
+    last threat score approaches ``escalate_score`` and grows back towards
+    ``max_stride`` while the scene looks normal.
+
+    With ``min_persons`` > 0 the scheduler is also a person-gated cascade:
+    frames where the object detector saw fewer people are neither buffered
+    nor analysed, and the clip restarts when people reappear.
+    """
+
+    def __init__(
+        self,
+        detector,
+        stride: int = 8,
+        adaptive: bool = False,
+        min_stride: int = 1,
+        max_stride: int = 16,
+        escalate_score: Optional[float] = None,
+        rate_window: float = 10.0,
+        min_persons: int = 0,
+        crop_to_persons: bool = False,
+        crop_margin: float = 0.1
+    ):
+        """
+        Initialize threat scheduler
+
+        Args:
+            detector: ThreatDetector (one per camera stream)
+            stride: Frames between inferences (initial stride when adaptive)
+            adaptive: Adapt the stride to the last threat score
+            min_stride: Smallest adaptive stride
+            max_stride: Largest adaptive stride
+            escalate_score: Threat score at which the stride reaches
+                min_stride (defaults to half the detector's threshold)
+            rate_window: Seconds over which inferences per second are measured
+            min_persons: People required before frames are analysed (0 disables gating)
+            crop_to_persons: Crop frames to the union of person boxes
+            crop_margin: Border around the person union, as a fraction of its size
+        """
+        self.detector = detector
+        self.adaptive = adaptive
+        self.min_stride = max(1, min_stride)
+        self.max_stride = max(self.min_stride, max_stride)
+        self.stride = max(1, stride)
+        self.escalate_score = (
+            escalate_score if escalate_score is not None
+            else detector.confidence_threshold / 2
+        )
+        self.rate_window = rate_window
+        self.min_persons = min_persons
+        self.crop_to_persons = crop_to_persons
+        self.crop_margin = crop_margin
+
+        self.last_result: Optional[Dict] = None
+        self.frames_since_inference = 0
+        self.frames_seen = 0
+        self.inferences = 0
+        self.frames_gated = 0
+        self._gated = False
+        self._inference_times: deque = deque(maxlen=1000)
+
+    @classmethod
+    def from_config(
+        cls,
+        detector,
+        scheduler_config: Dict,
+        gate_config: Optional[Dict] = None
+    ) -> 'ThreatScheduler':
+        """
+        Build a scheduler from the threat_detection config sections
+
+        Args:
+            detector: ThreatDetector stream to wrap
+            scheduler_config: threat_detection.scheduler settings
+            gate_config: threat_detection.person_gate settings
+
+        Missing keys use the constructor defaults.
+        """
+        gate_config = gate_config or {}
+        gate_enabled = gate_config.get('enabled', False)
+        return cls(
+            detector,
+            stride=scheduler_config.get('stride', 8),
+            adaptive=scheduler_config.get('adaptive', False),
+            min_stride=scheduler_config.get('min_stride', 1),
+            max_stride=scheduler_config.get('max_stride', 16),
+            escalate_score=scheduler_config.get('escalate_score'),
+            min_persons=gate_config.get('min_persons', 1) if gate_enabled else 0,
+            crop_to_persons=gate_enabled and gate_config.get('crop_to_persons', False),
+            crop_margin=gate_config.get('crop_margin', 0.1)
+        )
+
+    def _next_stride(self, result: Dict) -> int:
+        """Stride after an inference with the given result"""
+        if not self.adaptive:
+            return self.stride
+        if result.get('status') not in ('normal', 'detected'):
+            return self.min_stride
+
+        ratio = min(1.0, result['confidence'] / max(self.escalate_score, 1e-6))
+        return int(round(self.max_stride - ratio * (self.max_stride - self.min_stride)))
+
+    def _idle_result(self) -> Dict:
+        return {
+            'is_threat': False,
+            'threat_type': None,
+            'confidence': 0.0,
+            'all_scores': {},
+            'status': 'idle',
+            'fresh': False,
+            'frames_since_inference': self.frames_since_inference
+        }
+
+    def detect(
+        self,
+        frame: Optional[np.ndarray] = None,
+        person_boxes: Optional[List[List[float]]] = None
+    ) -> Dict:
+        """
+        Add a frame and return the current threat result
+
+        Args:
+            frame: New frame for the clip buffer
+            person_boxes: People detected in the frame; required for gating
+                and cropping (None analyses the frame unconditionally)
+
+        Returns:
+            ThreatDetector result plus ``fresh`` (True if the model ran on
+            this frame) and ``frames_since_inference``; status is 'idle'
+            for frames skipped by the person gate
+        """
+        if person_boxes is not None and len(person_boxes) < self.min_persons:
+            self.frames_seen += 1
+            self.frames_gated += 1
+            if not self._gated:
+                # Never join clips from before and after an empty scene
+                logger.debug(f"Threat analysis idle: {len(person_boxes)} person(s) in view")
+                self.reset()
+                self._gated = True
+            return self._idle_result()
+        self._gated = False
+
+        if frame is not None:
+            if self.crop_to_persons and person_boxes:
+                frame = union_crop(frame, person_boxes, self.crop_margin)
+            self.detector.add_frame(frame)
+        self.frames_seen += 1
+        self.frames_since_inference += 1
+
+        due = (
+            self.last_result is None
+            or self.last_result.get('status') in ('buffering', 'error')
+            or self.frames_since_inference >= self.stride
+        )
+
+        if due:
+            result = self.detector.detect()
+            self.frames_since_inference = 0
+            if result.get('status') != 'buffering':
+                self.inferences += 1
+                self._inference_times.append(time.monotonic())
+                self.stride = self._next_stride(result)
+            self.last_result = result
+            return dict(result, fresh=result.get('status') != 'buffering',
+                        frames_since_inference=0)
+
+        return dict(self.last_result, fresh=False,
+                    frames_since_inference=self.frames_since_inference)
+
+    def reset(self):
+        """Clear the clip buffer and the carried result"""
+        self.detector.reset_buffer()
+        self.last_result = None
+        self.frames_since_inference = 0
+
+    def stats(self) -> Dict:
+        """Inference rate for status reporting"""
+        now = time.monotonic()
+        recent = sum(1 for t in self._inference_times if now - t <= self.rate_window)
+        return {
+            'frames': self.frames_seen,
+            'inferences': self.inferences,
+            'inference_rate': self.inferences / max(1, self.frames_seen),
+            'inferences_per_second': recent / self.rate_window,
+            'stride': self.stride,
+            'frames_gated': self.frames_gated
+        }
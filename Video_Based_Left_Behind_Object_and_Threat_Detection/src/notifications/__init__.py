@@ -1,6 +1,8 @@
 """Notifications module"""
 
 from .alert_system import AlertSystem
+from .alert_dispatcher import AlertDispatcher, DeliveryNotConfigured
+from .smtp_pool import SMTPConnectionPool
+from .snapshots import Snapshot, SnapshotPipeline
 
-__all__ = ['AlertSystem']
-
+__all__ = ['AlertSystem', 'AlertDispatcher', 'DeliveryNotConfigured', 'SMTPConnectionPool', 'Snapshot', 'SnapshotPipeline']
@@ -0,0 +1,219 @@
+"""
+Alert Dispatcher
+Delivers alert notifications from a bounded queue on background threads
+"""
+
+import time
+import queue
+import logging
+import threading
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DeliveryNotConfigured(Exception):
+    """Raised by a send whose channel is not set up; retrying cannot help"""
+
+
+class AlertDispatcher:
+    """
+    Non-blocking delivery of alert notifications
+
+    ``submit`` puts a delivery (one channel send, e.g. one email or one
+    Telegram message) on a bounded queue and returns immediately, so a
+    slow mail server never stalls frame processing. Worker threads run the
+    deliveries; a delivery that fails (returns False or raises) is retried
+    with exponential backoff up to ``max_retries`` times, unless it raised
+    DeliveryNotConfigured, which fails it at once. When the queue
+    is full new deliveries are dropped and counted rather than blocking.
+    """
+
+    def __init__(
+        self,
+        num_workers: int = 2,
+        queue_size: int = 100,
+        max_retries: int = 3,
+        retry_delay: float = 2.0,
+        max_retry_delay: float = 60.0
+    ):
+        """
+        Initialize alert dispatcher
+
+        Args:
+            num_workers: Delivery threads
+            queue_size: Maximum number of pending deliveries
+            max_retries: Retries per delivery after the first attempt
+            retry_delay: Delay before the first retry (doubles per retry)
+            max_retry_delay: Upper bound for the retry delay
+        """
+        self.num_workers = num_workers
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+
+        # Counters
+        self.submitted = 0
+        self.delivered = 0
+        self.failed = 0
+        self.retries = 0
+        self.dropped = 0
+        self.max_queue_depth = 0
+        self.last_latency = 0.0
+        self.channels: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'AlertDispatcher':
+        """Build a dispatcher from the notifications.dispatch config section"""
+        return cls(
+            num_workers=config.get('workers', 2),
+            queue_size=config.get('queue_size', 100),
+            max_retries=config.get('max_retries', 3),
+            retry_delay=config.get('retry_delay', 2.0),
+            max_retry_delay=config.get('max_retry_delay', 60.0)
+        )
+
+    def start(self):
+        """Start the delivery threads"""
+        self._stop.clear()
+        for index in range(self.num_workers):
+            thread = threading.Thread(
+                target=self._run, name=f"alert-dispatch-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = 5.0):
+        """
+        Stop the delivery threads
+
+        Args:
+            timeout: Seconds to wait for pending deliveries (0 abandons them)
+        """
+        if timeout:
+            self.join(timeout)
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    @property
+    def idle(self) -> bool:
+        """True when nothing is queued or being delivered"""
+        return self._queue.unfinished_tasks == 0
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until all pending deliveries are finished
+
+        Returns:
+            True if the queue drained within the timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.idle:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _count(self, channel: str, key: str):
+        """Increment a total and per-channel counter ('delivered', 'failed', 'retries', 'dropped')"""
+        with self._lock:
+            setattr(self, key, getattr(self, key) + 1)
+            counters = self.channels.setdefault(
+                channel, {'delivered': 0, 'failed': 0, 'retries': 0, 'dropped': 0}
+            )
+            counters[key] += 1
+
+    def submit(self, channel: str, send: Callable[..., bool], *args) -> bool:
+        """
+        Queue a delivery without waiting for it
+
+        Args:
+            channel: Channel name for metrics and logs ('email', 'telegram', 'sms')
+            send: Callable performing the delivery, returning True on success
+            *args: Arguments for ``send``
+
+        Returns:
+            True if queued, False if the queue was full and it was dropped
+        """
+        try:
+            with self._lock:
+                self._queue.put_nowait((channel, send, args, time.monotonic()))
+                self.submitted += 1
+                self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        except queue.Full:
+            self._count(channel, 'dropped')
+            logger.error(f"Alert queue full, dropping {channel} delivery")
+            return False
+        return True
+
+    def _attempt(self, channel: str, send: Callable[..., bool], args) -> bool:
+        try:
+            return bool(send(*args))
+        except DeliveryNotConfigured:
+            raise
+        except Exception as e:
+            logger.error(f"{channel} delivery raised: {e}")
+            return False
+
+    def _deliver(self, channel: str, send: Callable[..., bool], args, queued_at: float):
+        delay = self.retry_delay
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                # Backing off only holds up this worker, not frame processing
+                if self._stop.wait(delay):
+                    break
+                delay = min(delay * 2, self.max_retry_delay)
+                self._count(channel, 'retries')
+                logger.warning(f"Retrying {channel} delivery (attempt {attempt + 1})")
+
+            try:
+                delivered = self._attempt(channel, send, args)
+            except DeliveryNotConfigured as e:
+                self._count(channel, 'failed')
+                logger.error(f"Dropping {channel} delivery: {e}")
+                return
+
+            if delivered:
+                self._count(channel, 'delivered')
+                self.last_latency = time.monotonic() - queued_at
+                return
+
+        self._count(channel, 'failed')
+        logger.error(f"Giving up on {channel} delivery after {self.max_retries + 1} attempts")
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                channel, send, args, queued_at = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            try:
+                self._deliver(channel, send, args, queued_at)
+            finally:
+                self._queue.task_done()
+
+    def stats(self) -> Dict:
+        """Queue depth and delivery counters for status reporting"""
+        with self._lock:
+            depth = self._queue.qsize()
+            return {
+                'queue_depth': depth,
+                'max_queue_depth': self.max_queue_depth,
+                'queue_size': self._queue.maxsize,
+                'in_flight': self._queue.unfinished_tasks - depth,
+                'submitted': self.submitted,
+                'delivered': self.delivered,
+                'failed': self.failed,
+                'retries': self.retries,
+                'dropped': self.dropped,
+                'last_latency_ms': self.last_latency * 1000,
+                'channels': {channel: dict(counts) for channel, counts in self.channels.items()}
+            }
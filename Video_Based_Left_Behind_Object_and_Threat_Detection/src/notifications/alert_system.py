@@ -3,22 +3,32 @@ Alert and Notification System
 Sends notifications for left-behind objects and threats
 """
 
-import smtplib
 import logging
+import threading
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.image import MIMEImage
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 import os
 from pathlib import Path
 
+from .alert_dispatcher import DeliveryNotConfigured
+from .smtp_pool import SMTPConnectionPool
+from .snapshots import Snapshot
+
 logger = logging.getLogger(__name__)
 
 
 class AlertSystem:
     """
     Manages all alert notifications for the security system
+
+    Channel clients are kept between alerts: SMTP connections come from a
+    pool, Telegram requests share one HTTP session and the Twilio client is
+    created once. With a ``dispatcher`` (AlertDispatcher) every channel
+    send is queued and delivered in the background, so the alert methods
+    return without waiting for the network.
     """
     
     def __init__(
@@ -27,7 +37,11 @@ class AlertSystem:
         smtp_port: int = 587,
         smtp_username: Optional[str] = None,
         smtp_password: Optional[str] = None,
-        from_email: Optional[str] = None
+        from_email: Optional[str] = None,
+        smtp_use_tls: bool = True,
+        smtp_pool_size: int = 2,
+        telegram_api_url: str = 'https://api.telegram.org',
+        dispatcher=None
     ):
         """
         Initialize alert system
@@ -38,22 +52,88 @@ class AlertSystem:
             smtp_username: SMTP username (optional for testing)
             smtp_password: SMTP password (optional for testing)
             from_email: Sender email address (optional for testing)
+            smtp_use_tls: Upgrade SMTP connections with STARTTLS
+            smtp_pool_size: Maximum number of open SMTP connections
+            telegram_api_url: Telegram Bot API base URL
+            dispatcher: AlertDispatcher for background delivery (None sends inline)
         """
         self.smtp_server = smtp_server
         self.smtp_port = smtp_port
         self.smtp_username = smtp_username
         self.smtp_password = smtp_password
         self.from_email = from_email
+        self.telegram_api_url = telegram_api_url.rstrip('/')
+        self.dispatcher = dispatcher
+
+        # Persistent channel clients
+        self.smtp_pool = None
+        if smtp_server and smtp_username and smtp_password:
+            self.smtp_pool = SMTPConnectionPool(
+                smtp_server, smtp_port, smtp_username, smtp_password,
+                size=smtp_pool_size, use_tls=smtp_use_tls
+            )
+        self._http_session = None
+        self._twilio_clients: Dict = {}
+        self._client_lock = threading.Lock()
 
         # Alert cooldown tracking
         self.last_alert_times: Dict[str, datetime] = {}
-        
+
+    @property
+    def http_session(self):
+        """Shared requests.Session for HTTP channels (created on first use)"""
+        with self._client_lock:
+            if self._http_session is None:
+                import requests
+                self._http_session = requests.Session()
+            return self._http_session
+
+    def _twilio_client(self, twilio_sid: str, twilio_token: str):
+        """Twilio client for an account, created once"""
+        with self._client_lock:
+            client = self._twilio_clients.get((twilio_sid, twilio_token))
+            if client is None:
+                from twilio.rest import Client
+                client = Client(twilio_sid, twilio_token)
+                self._twilio_clients[(twilio_sid, twilio_token)] = client
+            return client
+
+    def close(self):
+        """Stop background delivery and close channel connections"""
+        if self.dispatcher is not None:
+            self.dispatcher.stop()
+        if self.smtp_pool is not None:
+            self.smtp_pool.close()
+        if self._http_session is not None:
+            self._http_session.close()
+
+    def stats(self) -> Dict:
+        """Delivery queue and connection counters for status reporting"""
+        return {
+            'dispatcher': self.dispatcher.stats() if self.dispatcher is not None else None,
+            'smtp': self.smtp_pool.stats() if self.smtp_pool is not None else None
+        }
+
+    @staticmethod
+    def _attachment(
+        image_path: Optional[str] = None,
+        snapshot: Optional[Snapshot] = None
+    ) -> Optional[Tuple[bytes, str]]:
+        """Image bytes and file name of an alert, preferring the in-memory snapshot"""
+        if snapshot is not None:
+            return snapshot.jpeg, snapshot.filename
+        if image_path and os.path.exists(image_path):
+            with open(image_path, 'rb') as f:
+                return f.read(), os.path.basename(image_path)
+        return None
+
     def send_email(
         self,
         to_emails: List[str],
         subject: str,
         body: str,
-        image_path: Optional[str] = None
+        image_path: Optional[str] = None,
+        snapshot: Optional[Snapshot] = None
     ) -> bool:
         """
         Send email notification
@@ -63,14 +143,16 @@ class AlertSystem:
             subject: Email subject
             body: Email body (HTML supported)
             image_path: Optional path to image attachment
+            snapshot: Optional in-memory snapshot attached instead of image_path
 
         Returns:
             True if successful
+
+        Raises:
+            DeliveryNotConfigured: If SMTP is not configured
         """
-        # Check if SMTP is configured
-        if not self.smtp_server or not self.smtp_username or not self.smtp_password:
-            logger.warning("SMTP not configured, skipping email notification")
-            return False
+        if self.smtp_pool is None:
+            raise DeliveryNotConfigured("SMTP not configured")
 
         try:
             # Create message
@@ -83,17 +165,15 @@ class AlertSystem:
             msg.attach(MIMEText(body, 'html'))
             
             # Add image if provided
-            if image_path and os.path.exists(image_path):
-                with open(image_path, 'rb') as f:
-                    img = MIMEImage(f.read())
-                    img.add_header('Content-Disposition', 'attachment', 
-                                 filename=os.path.basename(image_path))
-                    msg.attach(img)
+            attachment = self._attachment(image_path, snapshot)
+            if attachment is not None:
+                image, filename = attachment
+                img = MIMEImage(image, 'jpeg')
+                img.add_header('Content-Disposition', 'attachment', filename=filename)
+                msg.attach(img)
             
-            # Send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_username, self.smtp_password)
+            # Send email over a pooled, already authenticated connection
+            with self.smtp_pool.connection() as server:
                 server.send_message(msg)
             
             logger.info(f"Email sent to {to_emails}: {subject}")
@@ -108,7 +188,8 @@ class AlertSystem:
         bot_token: str,
         chat_ids: List[str],
         message: str,
-        image_path: Optional[str] = None
+        image_path: Optional[str] = None,
+        snapshot: Optional[Snapshot] = None
     ) -> bool:
         """
         Send Telegram notification
@@ -118,26 +199,28 @@ class AlertSystem:
             chat_ids: List of chat IDs
             message: Message text
             image_path: Optional path to image
+            snapshot: Optional in-memory snapshot sent instead of image_path
             
         Returns:
             True if successful
         """
         try:
-            import requests
-            
+            session = self.http_session
+            attachment = self._attachment(image_path, snapshot)
+
             for chat_id in chat_ids:
-                if image_path and os.path.exists(image_path):
+                if attachment is not None:
                     # Send photo with caption
-                    url = f"https://api.telegram.org/bot{bot_token}/sendPhoto"
-                    with open(image_path, 'rb') as photo:
-                        files = {'photo': photo}
-                        data = {'chat_id': chat_id, 'caption': message}
-                        response = requests.post(url, files=files, data=data)
+                    image, filename = attachment
+                    url = f"{self.telegram_api_url}/bot{bot_token}/sendPhoto"
+                    files = {'photo': (filename, image, 'image/jpeg')}
+                    data = {'chat_id': chat_id, 'caption': message}
+                    response = session.post(url, files=files, data=data, timeout=30)
                 else:
                     # Send text message
-                    url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+                    url = f"{self.telegram_api_url}/bot{bot_token}/sendMessage"
                     data = {'chat_id': chat_id, 'text': message}
-                    response = requests.post(url, data=data)
+                    response = session.post(url, data=data, timeout=30)
                 
                 if response.status_code == 200:
                     logger.info(f"Telegram message sent to {chat_id}")
@@ -171,12 +254,16 @@ class AlertSystem:
             
         Returns:
             True if successful
+
+        Raises:
+            DeliveryNotConfigured: If the twilio package is not installed
         """
         try:
-            from twilio.rest import Client
-            
-            client = Client(twilio_sid, twilio_token)
-            
+            client = self._twilio_client(twilio_sid, twilio_token)
+        except ImportError:
+            raise DeliveryNotConfigured("twilio is not installed")
+
+        try:
             for to_number in to_numbers:
                 message_obj = client.messages.create(
                     body=message,
@@ -220,13 +307,73 @@ class AlertSystem:
         """Update last alert time for a key"""
         self.last_alert_times[alert_key] = datetime.now()
 
+    def _dispatch(self, channel: str, send, *args) -> bool:
+        """Queue a channel send on the dispatcher, or send it inline"""
+        if self.dispatcher is not None:
+            return self.dispatcher.submit(channel, send, *args)
+        try:
+            return send(*args)
+        except DeliveryNotConfigured as e:
+            logger.warning(f"Skipping {channel} notification: {e}")
+            return False
+
+    def _send_notifications(
+        self,
+        recipients: Dict,
+        subject: str,
+        body: str,
+        telegram_message: str,
+        sms_message: str,
+        image_path: Optional[str] = None,
+        snapshot: Optional[Snapshot] = None
+    ) -> bool:
+        """
+        Send an alert on every channel with recipients
+
+        Each Telegram chat and SMS number is a separate delivery, so a
+        retried delivery never repeats messages that already went out.
+
+        Returns:
+            True if every send succeeded (or was queued, with a dispatcher)
+        """
+        success = True
+
+        if 'email' in recipients and recipients['email'] and self.smtp_pool is not None:
+            success &= self._dispatch(
+                'email', self.send_email, recipients['email'], subject, body, image_path, snapshot
+            )
+
+        if 'telegram' in recipients and recipients['telegram']:
+            bot_token = os.getenv('TELEGRAM_BOT_TOKEN')
+            if bot_token:
+                for chat_id in recipients['telegram']:
+                    success &= self._dispatch(
+                        'telegram', self.send_telegram, bot_token, [chat_id],
+                        telegram_message, image_path, snapshot
+                    )
+
+        if 'sms' in recipients and recipients['sms']:
+            twilio_sid = os.getenv('TWILIO_ACCOUNT_SID')
+            twilio_token = os.getenv('TWILIO_AUTH_TOKEN')
+            from_number = os.getenv('TWILIO_PHONE_NUMBER')
+
+            if twilio_sid and twilio_token and from_number:
+                for to_number in recipients['sms']:
+                    success &= self._dispatch(
+                        'sms', self.send_sms, twilio_sid, twilio_token, from_number,
+                        [to_number], sms_message
+                    )
+
+        return success
+
     def send_left_behind_alert(
         self,
         object_info: Dict,
         camera_info: Dict,
         recipients: Dict,
         image_path: Optional[str] = None,
-        cooldown_minutes: int = 15
+        cooldown_minutes: int = 15,
+        snapshot: Optional[Snapshot] = None
     ) -> bool:
         """
         Send alert for left-behind object
@@ -237,11 +384,13 @@ class AlertSystem:
             recipients: Dict with 'email', 'telegram', 'sms' lists
             image_path: Path to snapshot image
             cooldown_minutes: Cooldown period
+            snapshot: In-memory snapshot attached instead of image_path
 
         Returns:
             True if alert sent successfully
         """
-        alert_key = f"left_behind_{object_info['track_id']}"
+        # Track IDs are per camera, so the camera is part of the key
+        alert_key = f"left_behind_{camera_info.get('id', '')}_{object_info['track_id']}"
 
         # Check cooldown
         if not self.check_cooldown(alert_key, cooldown_minutes):
@@ -283,39 +432,9 @@ Please send security staff to collect this item.
         sms_message = f"ALERT: {object_info['class_name']} left behind at {camera_info['name']}. Please collect."
 
         # Send notifications
-        success = True
-
-        if 'email' in recipients and recipients['email']:
-            success &= self.send_email(
-                recipients['email'],
-                subject,
-                body,
-                image_path
-            )
-
-        if 'telegram' in recipients and recipients['telegram']:
-            bot_token = os.getenv('TELEGRAM_BOT_TOKEN')
-            if bot_token:
-                success &= self.send_telegram(
-                    bot_token,
-                    recipients['telegram'],
-                    telegram_message,
-                    image_path
-                )
-
-        if 'sms' in recipients and recipients['sms']:
-            twilio_sid = os.getenv('TWILIO_ACCOUNT_SID')
-            twilio_token = os.getenv('TWILIO_AUTH_TOKEN')
-            from_number = os.getenv('TWILIO_PHONE_NUMBER')
-
-            if twilio_sid and twilio_token and from_number:
-                success &= self.send_sms(
-                    twilio_sid,
-                    twilio_token,
-                    from_number,
-                    recipients['sms'],
-                    sms_message
-                )
+        success = self._send_notifications(
+            recipients, subject, body, telegram_message, sms_message, image_path, snapshot
+        )
 
         if success:
             self.update_alert_time(alert_key)
@@ -328,7 +447,8 @@ Please send security staff to collect this item.
         camera_info: Dict,
         recipients: Dict,
         image_path: Optional[str] = None,
-        cooldown_minutes: int = 5
+        cooldown_minutes: int = 5,
+        snapshot: Optional[Snapshot] = None
     ) -> bool:
         """
         Send alert for detected threat
@@ -339,6 +459,7 @@ Please send security staff to collect this item.
             recipients: Dict with 'email', 'telegram', 'sms' lists
             image_path: Path to snapshot image
             cooldown_minutes: Cooldown period (shorter for threats)
+            snapshot: In-memory snapshot attached instead of image_path
 
         Returns:
             True if alert sent successfully
@@ -385,39 +506,9 @@ Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         sms_message = f"URGENT: {threat_info['threat_type']} detected at {camera_info['name']}. Respond immediately!"
 
         # Send notifications (all channels for threats)
-        success = True
-
-        if 'email' in recipients and recipients['email']:
-            success &= self.send_email(
-                recipients['email'],
-                subject,
-                body,
-                image_path
-            )
-
-        if 'telegram' in recipients and recipients['telegram']:
-            bot_token = os.getenv('TELEGRAM_BOT_TOKEN')
-            if bot_token:
-                success &= self.send_telegram(
-                    bot_token,
-                    recipients['telegram'],
-                    telegram_message,
-                    image_path
-                )
-
-        if 'sms' in recipients and recipients['sms']:
-            twilio_sid = os.getenv('TWILIO_ACCOUNT_SID')
-            twilio_token = os.getenv('TWILIO_AUTH_TOKEN')
-            from_number = os.getenv('TWILIO_PHONE_NUMBER')
-
-            if twilio_sid and twilio_token and from_number:
-                success &= self.send_sms(
-                    twilio_sid,
-                    twilio_token,
-                    from_number,
-                    recipients['sms'],
-                    sms_message
-                )
+        success = self._send_notifications(
+            recipients, subject, body, telegram_message, sms_message, image_path, snapshot
+        )
 
         if success:
             self.update_alert_time(alert_key)
@@ -0,0 +1,165 @@
+"""
+SMTP Connection Pool
+Keeps authenticated SMTP connections open between alerts
+"""
+
+import time
+import smtplib
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SMTPConnectionPool:
+    """
+    Authenticated SMTP connections shared by alert deliveries
+
+    Opening a connection costs a TCP handshake, STARTTLS and a login; the
+    pool does that once per connection and hands the connection to one
+    sender at a time. Idle connections are checked with NOOP before reuse
+    (servers drop them after a while) and replaced when they are dead.
+    """
+
+    def __init__(
+        self,
+        server: str,
+        port: int = 587,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        size: int = 2,
+        use_tls: bool = True,
+        timeout: float = 30.0,
+        max_idle: float = 300.0,
+        connection_factory: Callable[..., smtplib.SMTP] = smtplib.SMTP
+    ):
+        """
+        Initialize SMTP connection pool
+
+        Args:
+            server: SMTP server address
+            port: SMTP port
+            username: SMTP username (None skips login)
+            password: SMTP password
+            size: Maximum number of open connections
+            use_tls: Upgrade connections with STARTTLS
+            timeout: Socket timeout in seconds
+            max_idle: Close connections idle for longer than this (seconds)
+            connection_factory: Callable(server, port, timeout=...) opening a connection
+        """
+        self.server = server
+        self.port = port
+        self.username = username
+        self.password = password
+        self.size = size
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.connection_factory = connection_factory
+
+        # Idle (connection, last used) pairs, most recently used last
+        self._idle: List = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+        self.connections_opened = 0
+        self.connections_reused = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        connection = self.connection_factory(self.server, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                connection.starttls()
+            if self.username:
+                connection.login(self.username, self.password)
+        except Exception:
+            self._close(connection)
+            raise
+        self.connections_opened += 1
+        logger.info(f"Opened SMTP connection to {self.server}:{self.port}")
+        return connection
+
+    @staticmethod
+    def _close(connection: smtplib.SMTP):
+        try:
+            connection.quit()
+        except Exception:
+            connection.close()
+
+    @staticmethod
+    def _reset(connection: smtplib.SMTP) -> bool:
+        """Abort a rejected transaction so the connection can be reused"""
+        try:
+            return connection.rset()[0] == 250
+        except Exception:
+            return False
+
+    @staticmethod
+    def _is_alive(connection: smtplib.SMTP) -> bool:
+        try:
+            return connection.noop()[0] == 250
+        except Exception:
+            return False
+
+    def _checkout(self) -> smtplib.SMTP:
+        """Newest healthy idle connection, or a new one"""
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                connection, last_used = self._idle.pop()
+            if now - last_used <= self.max_idle and self._is_alive(connection):
+                self.connections_reused += 1
+                return connection
+            self._close(connection)
+        return self._connect()
+
+    @contextmanager
+    def connection(self) -> Iterator[smtplib.SMTP]:
+        """
+        Borrow a connection
+
+        The connection goes back to the pool when the block succeeds or the
+        server rejected a command (a 4xx/5xx reply leaves the session
+        usable); it is closed on any other error, since its state is then
+        unknown.
+        """
+        self._slots.acquire()
+        try:
+            connection = self._checkout()
+            try:
+                yield connection
+            except smtplib.SMTPResponseException:
+                if not self._reset(connection):
+                    self._close(connection)
+                    raise
+                with self._lock:
+                    self._idle.append((connection, time.monotonic()))
+                raise
+            except Exception:
+                self._close(connection)
+                raise
+            with self._lock:
+                self._idle.append((connection, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """Close all idle connections"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            self._close(connection)
+
+    def stats(self) -> Dict:
+        """Connection counters for status reporting"""
+        with self._lock:
+            idle = len(self._idle)
+        return {
+            'opened': self.connections_opened,
+            'reused': self.connections_reused,
+            'idle': idle
+        }
@@ -0,0 +1,205 @@
+"""
+Snapshot Pipeline
+Encodes alert snapshots once in memory and saves them on a background thread
+"""
+
+import time
+import queue
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class Snapshot:
+    """
+    An encoded alert snapshot
+
+    ``jpeg`` holds the encoded image that every alert channel attaches;
+    ``path`` is where the background writer saves it (None if not saved).
+    """
+
+    def __init__(self, jpeg: bytes, filename: str, path: Optional[str] = None):
+        """
+        Initialize snapshot
+
+        Args:
+            jpeg: JPEG-encoded image
+            filename: File name used for attachments
+            path: Storage path the snapshot is written to
+        """
+        self.jpeg = jpeg
+        self.filename = filename
+        self.path = path
+
+    def __len__(self) -> int:
+        return len(self.jpeg)
+
+
+class SnapshotPipeline:
+    """
+    In-memory snapshots for alerts
+
+    A frame is downscaled to at most ``max_width`` pixels wide and JPEG
+    encoded once; the same bytes are attached to the email, Telegram and
+    any other channel, so no channel reads the file back from disk. Saving
+    to ``snapshots_path`` happens on a writer thread and never delays
+    alerting. When the write queue is full, the file is skipped (the alert
+    still carries the image).
+    """
+
+    def __init__(
+        self,
+        snapshots_path: Optional[str] = None,
+        quality: int = 85,
+        max_width: Optional[int] = 1280,
+        queue_size: int = 32
+    ):
+        """
+        Initialize snapshot pipeline
+
+        Args:
+            snapshots_path: Directory snapshots are saved to (None keeps them in memory only)
+            quality: JPEG quality (0-100)
+            max_width: Downscale wider frames to this width (None keeps the full size)
+            queue_size: Snapshots waiting to be written before new ones are not saved
+        """
+        self.snapshots_path = Path(snapshots_path) if snapshots_path else None
+        self.quality = quality
+        self.max_width = max_width
+
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+
+        # Counters
+        self.snapshots_encoded = 0
+        self.snapshots_written = 0
+        self.snapshots_not_saved = 0
+        self.write_errors = 0
+        self.bytes_encoded = 0
+        self.encode_time = 0.0
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'SnapshotPipeline':
+        """Build a pipeline from the storage config section"""
+        snapshot_config = config.get('snapshots', {})
+        return cls(
+            snapshots_path=config.get('snapshots_path'),
+            quality=snapshot_config.get('jpeg_quality', 85),
+            max_width=snapshot_config.get('max_width', 1280),
+            queue_size=snapshot_config.get('queue_size', 32)
+        )
+
+    def start(self):
+        """Start the background writer"""
+        if self.snapshots_path is None or self._thread is not None:
+            return
+        self.snapshots_path.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="snapshot-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Write the pending snapshots and stop the writer"""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def flush(self):
+        """Wait until every queued snapshot is written"""
+        self._queue.join()
+
+    def encode(self, frame: np.ndarray) -> bytes:
+        """
+        Downscale and JPEG-encode a frame
+
+        Args:
+            frame: Annotated BGR frame
+
+        Returns:
+            JPEG bytes
+        """
+        height, width = frame.shape[:2]
+        if self.max_width and width > self.max_width:
+            size = (self.max_width, max(1, round(height * self.max_width / width)))
+            # INTER_AREA is several times slower at non-integer scales and
+            # gives no visible gain for a moderate downscale like this
+            frame = cv2.resize(frame, size, interpolation=cv2.INTER_LINEAR)
+
+        ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            raise ValueError("Could not encode snapshot")
+        return buffer.tobytes()
+
+    def capture(self, frame: np.ndarray, camera_id: str, kind: str) -> Snapshot:
+        """
+        Encode an alert snapshot and queue it for saving
+
+        Args:
+            frame: Annotated BGR frame
+            camera_id: Camera identifier (part of the file name)
+            kind: Alert kind (part of the file name, e.g. 'leftbehind', 'threat')
+
+        Returns:
+            Snapshot with the encoded image
+        """
+        start = time.perf_counter()
+        jpeg = self.encode(frame)
+        self.encode_time = time.perf_counter() - start
+        self.snapshots_encoded += 1
+        self.bytes_encoded += len(jpeg)
+
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        snapshot = Snapshot(jpeg, f"{camera_id}_{kind}_{timestamp}.jpg")
+
+        if self.snapshots_path is not None:
+            snapshot.path = str(self.snapshots_path / snapshot.filename)
+            if self._thread is None:
+                # No writer running (not started or stopped): save inline
+                self.snapshots_path.mkdir(parents=True, exist_ok=True)
+                self._write(snapshot)
+            else:
+                try:
+                    self._queue.put_nowait(snapshot)
+                except queue.Full:
+                    self.snapshots_not_saved += 1
+                    logger.warning(f"Snapshot writer busy, not saving {snapshot.filename}")
+        return snapshot
+
+    def _write(self, snapshot: Snapshot):
+        try:
+            with open(snapshot.path, 'wb') as f:
+                f.write(snapshot.jpeg)
+            self.snapshots_written += 1
+        except OSError as e:
+            self.write_errors += 1
+            logger.error(f"Failed to save snapshot {snapshot.path}: {e}")
+
+    def _run(self):
+        while True:
+            snapshot = self._queue.get()
+            try:
+                if snapshot is None:
+                    return
+                self._write(snapshot)
+            finally:
+                self._queue.task_done()
+
+    def stats(self) -> Dict:
+        """Snapshot counters for status reporting"""
+        return {
+            'encoded': self.snapshots_encoded,
+            'written': self.snapshots_written,
+            'not_saved': self.snapshots_not_saved,
+            'write_errors': self.write_errors,
+            'pending_writes': self._queue.qsize(),
+            'average_kib': self.bytes_encoded / max(1, self.snapshots_encoded) / 1024,
+            'encode_ms': self.encode_time * 1000
+        }
@@ -0,0 +1,18 @@
+"""Runtime module"""
+
+from .supervisor import CameraSupervisor, QueueAlertSink, camera_source, group_cameras
+from .inference_service import BatchInferenceService, RemoteDetector
+from .sessions import CameraSession, SessionRegistry
+from .stream_pull import EventBroker, StreamPullWorker, format_sse
+from .offline_analysis import analyze_segment, analyze_video, merge_segments, plan_segments
+from .metrics import MetricsRegistry, PipelineMetrics, pipeline_metrics, start_metrics_server
+from .load_governor import CpuMonitor, LoadGovernor, input_size_ladder
+
+__all__ = [
+    'CameraSupervisor', 'QueueAlertSink', 'camera_source', 'group_cameras',
+    'BatchInferenceService', 'RemoteDetector', 'CameraSession', 'SessionRegistry',
+    'EventBroker', 'StreamPullWorker', 'format_sse',
+    'analyze_segment', 'analyze_video', 'merge_segments', 'plan_segments',
+    'MetricsRegistry', 'PipelineMetrics', 'pipeline_metrics', 'start_metrics_server',
+    'CpuMonitor', 'LoadGovernor', 'input_size_ladder'
+]
@@ -0,0 +1,239 @@
+"""
+Batched Inference Service
+Collects frames from many camera workers and runs them through one detect_batch call
+"""
+
+import os
+import time
+import queue
+import logging
+import itertools
+import threading
+from collections import deque, Counter
+from typing import List, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class BatchInferenceService:
+    """
+    Micro-batching scheduler for the object detector
+
+    Requests arrive on ``request_queue`` as
+    ``(worker_index, request_id, camera_id, frame, submitted_at)`` tuples.
+    A batch is closed when it reaches ``max_batch_size`` frames or when the
+    oldest frame has waited ``max_wait_ms``; the whole batch goes through a
+    single ``detect_batch`` call and each worker receives
+    ``(request_id, detections)`` on its own response queue.
+    """
+
+    def __init__(
+        self,
+        detector,
+        request_queue,
+        response_queues: Dict[int, object],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+        stats_window: int = 1000,
+        metrics=None
+    ):
+        """
+        Initialize inference service
+
+        Args:
+            detector: Object with a ``detect_batch(frames)`` method
+            request_queue: Queue shared by all workers for detection requests
+            response_queues: Per-worker queues for detection results
+            max_batch_size: Maximum frames per detect_batch call
+            max_wait_ms: Maximum time the first frame of a batch may wait
+            stats_window: Number of recent samples kept for wait statistics
+            metrics: PipelineMetrics the batch sizes and queue waits are
+                also recorded in (optional)
+        """
+        self.detector = detector
+        self.request_queue = request_queue
+        self.response_queues = response_queues
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self.metrics = metrics
+
+        # Metrics
+        self.batch_size_counts: Counter = Counter()
+        self.queue_waits: deque = deque(maxlen=stats_window)
+        self.inference_times: deque = deque(maxlen=stats_window)
+        self.frames_processed = 0
+        self.batches_processed = 0
+        self.errors = 0
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the scheduler thread"""
+        self._thread = threading.Thread(
+            target=self._run, name="batch-inference", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the scheduler thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _collect_batch(self) -> List[tuple]:
+        """Block for the first request, then gather more until full or timed out"""
+        try:
+            batch = [self.request_queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.request_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                batch = self._collect_batch()
+            except (EOFError, OSError):
+                break
+            if batch:
+                self.process_batch(batch)
+
+    def process_batch(self, batch: List[tuple]):
+        """Run one batch through the detector and route results to workers"""
+        started = time.time()
+        frames = [request[3] for request in batch]
+
+        try:
+            t0 = time.perf_counter()
+            results = self.detector.detect_batch(frames)
+            inference_time = time.perf_counter() - t0
+        except Exception as e:
+            logger.error(f"Batch inference failed for {len(batch)} frame(s): {e}")
+            results = [[] for _ in batch]
+            inference_time = None
+            with self._lock:
+                self.errors += 1
+
+        for (worker_index, request_id, camera_id, _, _), detections in zip(batch, results):
+            response_queue = self.response_queues.get(worker_index)
+            if response_queue is None:
+                logger.warning(f"No response queue for worker {worker_index} ({camera_id})")
+                continue
+            response_queue.put((request_id, detections))
+
+        waits = [started - request[4] for request in batch]
+        with self._lock:
+            self.batch_size_counts[len(batch)] += 1
+            self.batches_processed += 1
+            self.frames_processed += len(batch)
+            self.queue_waits.extend(waits)
+            if inference_time is not None:
+                self.inference_times.append(inference_time)
+
+        if self.metrics is not None:
+            self.metrics.inference_batch_size.observe(len(batch))
+            for wait in waits:
+                self.metrics.inference_queue_wait.observe(wait)
+
+    def stats(self) -> Dict:
+        """Batch-size and queue-wait metrics"""
+        with self._lock:
+            waits = np.array(self.queue_waits) * 1000 if self.queue_waits else np.zeros(1)
+            infer = np.array(self.inference_times) * 1000 if self.inference_times else np.zeros(1)
+            return {
+                'batches': self.batches_processed,
+                'frames': self.frames_processed,
+                'errors': self.errors,
+                'mean_batch_size': self.frames_processed / max(1, self.batches_processed),
+                'batch_size_histogram': dict(sorted(self.batch_size_counts.items())),
+                'queue_wait_ms': {
+                    'mean': float(waits.mean()),
+                    'p50': float(np.percentile(waits, 50)),
+                    'p95': float(np.percentile(waits, 95)),
+                },
+                'inference_ms': {
+                    'mean': float(infer.mean()),
+                    'p95': float(np.percentile(infer, 95)),
+                },
+            }
+
+
+class RemoteDetector:
+    """
+    Detector stand-in for camera workers that uses a BatchInferenceService
+
+    Exposes the parts of the LeftBehindObjectDetector interface the camera
+    pipeline uses, without loading a model in the worker process.
+    """
+
+    def __init__(
+        self,
+        worker_index: int,
+        request_queue,
+        response_queue,
+        timeout: float = 10.0
+    ):
+        """
+        Initialize remote detector
+
+        Args:
+            worker_index: Index of the owning worker (selects the response queue)
+            request_queue: Shared request queue of the inference service
+            response_queue: This worker's response queue
+            timeout: Seconds to wait for detections before giving up
+        """
+        self.worker_index = worker_index
+        self.request_queue = request_queue
+        self.response_queue = response_queue
+        self.timeout = timeout
+        self._request_ids = itertools.count()
+
+    def detect(self, frame: np.ndarray, camera_id: Optional[str] = None) -> List[Dict]:
+        """Submit a frame to the batch service and wait for its detections"""
+        # The PID keeps IDs unique across worker restarts sharing a queue
+        request_id = (os.getpid(), next(self._request_ids))
+        self.request_queue.put(
+            (self.worker_index, request_id, camera_id, frame, time.time())
+        )
+
+        deadline = time.monotonic() + self.timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.error(f"Timed out waiting for detections (request {request_id})")
+                return []
+            try:
+                response_id, detections = self.response_queue.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            # Late answers to requests that already timed out are discarded
+            if response_id == request_id:
+                return detections
+
+    def get_object_area(self, bbox: List[float]) -> float:
+        """Calculate area of bounding box"""
+        x1, y1, x2, y2 = bbox
+        return (x2 - x1) * (y2 - y1)
+
+    def filter_by_size(self, detections: List[Dict], min_area: int = 1000) -> List[Dict]:
+        """Filter detections by minimum bounding box area"""
+        return [det for det in detections if self.get_object_area(det['bbox']) >= min_area]
+
+    def visualize_detections(self, frame: np.ndarray, detections: List[Dict], **kwargs) -> np.ndarray:
+        """Draw detections (delegates to LeftBehindObjectDetector's drawing code)"""
+        from src.models.object_detector import LeftBehindObjectDetector
+        return LeftBehindObjectDetector.visualize_detections(self, frame, detections, **kwargs)
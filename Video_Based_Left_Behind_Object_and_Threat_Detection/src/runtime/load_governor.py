@@ -0,0 +1,346 @@
+"""
+Load Governor
+Feedback control of analysis frame rate and detector input size from processing lag and CPU load
+"""
+
+import os
+import time
+import logging
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .metrics import PipelineMetrics, pipeline_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class CpuMonitor:
+    """
+    CPU utilisation of the machine (0-1) since the previous call
+
+    Uses psutil; where it is missing, falls back to the CPU time of this
+    process (which does not see other processes, e.g. other camera workers).
+    """
+
+    def __init__(self):
+        """Initialize CPU monitor"""
+        try:
+            import psutil
+            psutil.cpu_percent(None)  # The first call only sets the baseline
+            self._psutil = psutil
+        except ImportError:
+            logger.warning("psutil is not installed; the load governor only sees this process's CPU use")
+            self._psutil = None
+        self._cpus = os.cpu_count() or 1
+        self._last = (time.monotonic(), time.process_time())
+
+    def __call__(self) -> float:
+        if self._psutil is not None:
+            return self._psutil.cpu_percent(None) / 100.0
+
+        now = (time.monotonic(), time.process_time())
+        wall = now[0] - self._last[0]
+        busy = now[1] - self._last[1]
+        self._last = now
+        return min(1.0, busy / (wall * self._cpus)) if wall > 0 else 0.0
+
+
+def input_size_ladder(
+    base: Tuple[int, int],
+    min_side: int,
+    step: int = 64,
+    stride: int = 32
+) -> List[Tuple[int, int]]:
+    """
+    Detector input sizes from ``base`` down to ``min_side`` (longer side)
+
+    Each size keeps the aspect ratio of ``base`` and is a multiple of the stride.
+
+    Args:
+        base: Full-quality (height, width)
+        min_side: Smallest longer side to degrade to
+        step: Pixels the longer side shrinks per level
+        stride: Model stride the sides are rounded to
+
+    Returns:
+        Sizes as (height, width), best quality first
+    """
+    longest = max(base)
+    sizes = [tuple(base)]
+    side = longest - step
+    while side >= min_side:
+        size = tuple(max(stride, int(round(dim * side / longest / stride)) * stride) for dim in base)
+        if size != sizes[-1]:
+            sizes.append(size)
+        side -= step
+    return sizes
+
+
+class _CameraLoad:
+    """Sampling rate of one camera and the lag of frames processed since the last decision"""
+
+    def __init__(self, grabber, fps: float):
+        self.grabber = grabber
+        self.fps = fps
+        self.lag_sum = 0.0
+        self.frames = 0
+
+
+class LoadGovernor:
+    """
+    Degrades analysis quality under load instead of falling behind the cameras
+
+    Each processed frame reports its lag: how old the frame was when its
+    result was ready (capture queue wait plus processing). Every
+    ``interval`` seconds the mean lag of each camera is divided by the
+    camera's sampling interval; a load above ``high_load`` means the next
+    frame was already due before the last one was finished.
+
+    When a camera is overloaded, its analysis FPS is multiplied by
+    ``fps_step`` (down to ``min_fps``); when the CPU is saturated, every
+    camera slows down. Once all cameras are at ``min_fps`` and the load
+    persists, the object detector's input size steps down a level. After
+    ``recover_after`` consecutive calm intervals (all loads below
+    ``low_load`` and CPU below ``cpu_low``) quality comes back in reverse
+    order: input size first, then frame rate. The gap between the high and
+    low thresholds keeps the controller from oscillating.
+
+    Every change is logged, kept in ``decisions`` and counted in the metrics.
+
+    The threat clip model sees the same sampled frames, so a lower analysis
+    FPS stretches each clip in time (a 16-frame clip covers 16 s at 1 FPS),
+    beyond the motion speeds the model was trained on. Keep ``min_fps`` near
+    the rate the threat model expects where threat recall matters.
+    """
+
+    def __init__(
+        self,
+        object_detector=None,
+        min_fps: float = 1.0,
+        max_fps: float = 10.0,
+        fps_step: float = 0.75,
+        min_input_size: int = 320,
+        input_size_step: int = 64,
+        high_load: float = 1.0,
+        low_load: float = 0.5,
+        cpu_high: float = 0.9,
+        cpu_low: float = 0.6,
+        interval: float = 5.0,
+        recover_after: int = 3,
+        metrics: Optional[PipelineMetrics] = None,
+        cpu_monitor: Optional[Callable[[], float]] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize load governor
+
+        Args:
+            object_detector: Detector whose input size is governed (left
+                fixed if it has no ``set_input_size`` or cannot be resized)
+            min_fps: Lowest analysis FPS per camera
+            max_fps: Highest (and initial) analysis FPS per camera
+            fps_step: Factor applied to the FPS per step down (divided per step up)
+            min_input_size: Smallest longer side of the detector input
+            input_size_step: Pixels the input size changes per level
+            high_load: Lag / sampling interval above which a camera is overloaded
+            low_load: Lag / sampling interval below which a camera is calm
+            cpu_high: CPU utilisation (0-1) that counts as saturated
+            cpu_low: CPU utilisation (0-1) below which quality may recover
+            interval: Seconds between decisions
+            recover_after: Calm intervals required before each step up
+            metrics: Metrics the state and decisions are recorded in
+            cpu_monitor: Callable returning CPU utilisation (defaults to CpuMonitor)
+            clock: Monotonic time source in seconds
+        """
+        self.object_detector = object_detector
+        self.min_fps = min_fps
+        self.max_fps = max(min_fps, max_fps)
+        self.fps_step = fps_step
+        self.high_load = high_load
+        self.low_load = low_load
+        self.cpu_high = cpu_high
+        self.cpu_low = cpu_low
+        self.interval = interval
+        self.recover_after = recover_after
+        self.metrics = metrics or pipeline_metrics
+        self.cpu_monitor = cpu_monitor or CpuMonitor()
+        self.clock = clock
+
+        # Detector input sizes, best first (empty if the detector cannot be resized)
+        self.input_sizes: List[Tuple[int, int]] = []
+        self.size_level = 0
+        if getattr(object_detector, 'resizable', False):
+            self.input_sizes = input_size_ladder(
+                object_detector.input_size, min_input_size, input_size_step,
+                getattr(object_detector, 'stride', 32)
+            )
+            self.metrics.input_size.set(max(self.input_sizes[0]))
+        else:
+            logger.info("Detector input size is fixed; the load governor only adjusts frame rates")
+
+        self.cameras: Dict[str, _CameraLoad] = {}
+        self.decisions: deque = deque(maxlen=50)
+        self.last_cpu = 0.0
+        self._calm_intervals = 0
+        self._last_update: Optional[float] = None
+
+    @classmethod
+    def from_config(
+        cls,
+        config: Dict,
+        object_detector=None,
+        metrics: Optional[PipelineMetrics] = None,
+        default_max_fps: Optional[float] = None
+    ) -> 'LoadGovernor':
+        """Build a governor from the performance.load_governor config section"""
+        return cls(
+            object_detector=object_detector,
+            min_fps=config.get('min_fps', 1.0),
+            max_fps=config.get('max_fps') or default_max_fps or 10.0,
+            fps_step=config.get('fps_step', 0.75),
+            min_input_size=config.get('min_input_size', 320),
+            input_size_step=config.get('input_size_step', 64),
+            high_load=config.get('high_load', 1.0),
+            low_load=config.get('low_load', 0.5),
+            cpu_high=config.get('cpu_high', 0.9),
+            cpu_low=config.get('cpu_low', 0.6),
+            interval=config.get('interval', 5.0),
+            recover_after=config.get('recover_after', 3),
+            metrics=metrics
+        )
+
+    @property
+    def input_size(self) -> Optional[Tuple[int, int]]:
+        """Current detector input size (None if not governed)"""
+        return self.input_sizes[self.size_level] if self.input_sizes else None
+
+    def add_camera(self, camera_id: str, grabber):
+        """Govern a camera's frame grabber, starting at full frame rate"""
+        self.cameras[camera_id] = _CameraLoad(grabber, self.max_fps)
+        grabber.set_target_fps(self.max_fps)
+        self.metrics.analysis_fps.set(self.max_fps, camera_id=camera_id)
+
+    def remove_camera(self, camera_id: str):
+        """Stop governing a camera"""
+        self.cameras.pop(camera_id, None)
+
+    def record(self, camera_id: str, lag: float):
+        """
+        Report one processed frame
+
+        Args:
+            camera_id: Camera identifier
+            lag: Seconds from capture of the frame to its finished result
+        """
+        state = self.cameras.get(camera_id)
+        if state is not None:
+            state.lag_sum += lag
+            state.frames += 1
+
+    def update(self) -> List[Dict]:
+        """
+        Make a decision if ``interval`` has passed since the last one
+
+        Returns:
+            The changes made (empty if none)
+        """
+        now = self.clock()
+        if self._last_update is None:
+            self._last_update = now
+            return []
+        if now - self._last_update < self.interval:
+            return []
+        self._last_update = now
+
+        cpu = self.last_cpu = self.cpu_monitor()
+        self.metrics.cpu_utilization.set(cpu)
+
+        # Cameras without frames in this window give no lag signal
+        loads = {}
+        for camera_id, state in self.cameras.items():
+            if state.frames:
+                lag = state.lag_sum / state.frames
+                loads[camera_id] = lag * state.fps
+                self.metrics.processing_lag.set(lag, camera_id=camera_id)
+            state.lag_sum = 0.0
+            state.frames = 0
+
+        overloaded = [camera_id for camera_id, load in loads.items() if load > self.high_load]
+        decisions = []
+
+        if overloaded or cpu >= self.cpu_high:
+            self._calm_intervals = 0
+            reason = 'lag' if overloaded else 'cpu'
+            for camera_id in overloaded or list(self.cameras):
+                state = self.cameras[camera_id]
+                decisions.extend(self._set_fps(
+                    camera_id, max(self.min_fps, state.fps * self.fps_step), reason, loads.get(camera_id)
+                ))
+            # Frame rates are at their floor: trade resolution instead
+            if not decisions:
+                decisions.extend(self._set_size_level(self.size_level + 1, reason))
+
+        elif cpu <= self.cpu_low and all(load <= self.low_load for load in loads.values()):
+            self._calm_intervals += 1
+            if self._calm_intervals >= self.recover_after:
+                self._calm_intervals = 0
+                decisions.extend(self._set_size_level(self.size_level - 1, 'recovered'))
+                if not decisions:
+                    for camera_id, state in self.cameras.items():
+                        decisions.extend(self._set_fps(
+                            camera_id, min(self.max_fps, state.fps / self.fps_step),
+                            'recovered', loads.get(camera_id)
+                        ))
+        else:
+            self._calm_intervals = 0
+
+        for decision in decisions:
+            decision['cpu'] = cpu
+            self.decisions.append(decision)
+            self.metrics.governor_decisions.inc(action=decision['action'], reason=decision['reason'])
+        return decisions
+
+    def _set_fps(self, camera_id: str, fps: float, reason: str, load: Optional[float]) -> List[Dict]:
+        state = self.cameras[camera_id]
+        if abs(fps - state.fps) < 1e-6:
+            return []
+
+        previous, state.fps = state.fps, fps
+        state.grabber.set_target_fps(fps)
+        self.metrics.analysis_fps.set(fps, camera_id=camera_id)
+
+        action = 'fps_down' if fps < previous else 'fps_up'
+        logger.info(
+            f"Load governor: camera {camera_id} analysis rate {previous:.2f} -> {fps:.2f} FPS ({reason})"
+        )
+        return [{
+            'action': action, 'reason': reason, 'camera_id': camera_id,
+            'previous': previous, 'value': fps, 'load': load
+        }]
+
+    def _set_size_level(self, level: int, reason: str) -> List[Dict]:
+        if not self.input_sizes or not 0 <= level < len(self.input_sizes) or level == self.size_level:
+            return []
+
+        previous = self.input_sizes[self.size_level]
+        size = self.input_sizes[level]
+        if not self.object_detector.set_input_size(size):
+            return []
+        action = 'input_size_down' if level > self.size_level else 'input_size_up'
+        self.size_level = level
+        self.metrics.input_size.set(max(size))
+
+        logger.info(f"Load governor: detector input size {previous} -> {size} ({reason})")
+        return [{
+            'action': action, 'reason': reason, 'camera_id': None,
+            'previous': list(previous), 'value': list(size), 'load': None
+        }]
+
+    def stats(self) -> Dict:
+        """Current quality settings and recent decisions for status reporting"""
+        return {
+            'cpu': self.last_cpu,
+            'fps': {camera_id: state.fps for camera_id, state in self.cameras.items()},
+            'input_size': list(self.input_size) if self.input_size else None,
+            'decisions': list(self.decisions)[-5:]
+        }
@@ -0,0 +1,377 @@
+"""
+Pipeline Metrics
+Per-stage latency histograms, counters and gauges exported in the Prometheus text format
+"""
+
+import math
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds; covers a cheap tracker update up to a slow CPU clip inference
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class _Metric:
+    """Common label handling for all metric types"""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def remove(self, **labels):
+        """Drop one label combination (e.g. a camera that went away)"""
+        with self._lock:
+            self._values.pop(self._key(labels), None)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}"
+        ]
+        lines.extend(self.samples())
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    kind = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels):
+        """Add to the count"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set_total(self, value: float, **labels):
+        """Mirror a running total kept elsewhere (e.g. a grabber's drop count)"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = max(self._values.get(key, 0.0), float(value))
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """Value that goes up and down"""
+
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        """Set the current value"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+
+    kind = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        """Record one observation"""
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['counts'][index] += 1
+                    break
+            state['sum'] += value
+            state['count'] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the duration of a block in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state['count'] if state else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(
+                (key, list(state['counts']), state['sum'], state['count'])
+                for key, state in self._values.items()
+            )
+        lines = []
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Named metrics rendered together for a /metrics scrape
+
+    A small stand-in for prometheus_client (not a dependency of this
+    project); the output follows the Prometheus text exposition format.
+    Asking for an existing name returns the registered metric.
+    """
+
+    def __init__(self):
+        """Initialize metrics registry"""
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+
+class PipelineMetrics:
+    """
+    The video pipeline's metrics
+
+    ``stage_seconds`` times the pipeline stages per camera: ``decode``,
+    ``inference`` (object detection), ``tracking`` (tracker update and
+    left-behind check), ``threat_inference`` (frames where the clip model
+    ran) and ``alert`` (snapshot and notification hand-off).
+    Frame rates follow from ``rate()`` over the frame counter.
+    """
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        """
+        Initialize pipeline metrics
+
+        Args:
+            registry: Registry to add the metrics to (a new one by default)
+        """
+        self.registry = registry or MetricsRegistry()
+        self.stage_seconds = self.registry.histogram(
+            'video_stage_seconds', 'Processing time per pipeline stage', ('stage', 'camera_id')
+        )
+        self.frames = self.registry.counter(
+            'video_frames_processed_total', 'Frames run through the pipeline', ('camera_id',)
+        )
+        self.frames_dropped = self.registry.counter(
+            'video_frames_dropped_total', 'Frames discarded because processing fell behind', ('camera_id',)
+        )
+        self.alerts = self.registry.counter(
+            'video_alerts_total', 'Alerts raised', ('type', 'camera_id')
+        )
+        self.live_tracks = self.registry.gauge(
+            'video_live_tracks', 'Confirmed object tracks', ('camera_id',)
+        )
+        self.left_behind = self.registry.gauge(
+            'video_left_behind_objects', 'Objects currently left behind', ('camera_id',)
+        )
+        self.buffer_fill = self.registry.gauge(
+            'video_buffer_fill_ratio', 'Fill level of frame and clip buffers (0-1)', ('buffer', 'camera_id')
+        )
+
+        # Cross-camera batch inference in the supervising process
+        self.inference_batch_size = self.registry.histogram(
+            'video_inference_batch_size', 'Frames per batched detector call', (),
+            buckets=(1, 2, 4, 8, 16, 32, 64)
+        )
+        self.inference_queue_wait = self.registry.histogram(
+            'video_inference_queue_wait_seconds', 'Time a frame waited for its inference batch'
+        )
+
+        # Load governor state and decisions
+        self.processing_lag = self.registry.gauge(
+            'video_processing_lag_seconds', 'Mean age of a frame when its result is ready', ('camera_id',)
+        )
+        self.cpu_utilization = self.registry.gauge(
+            'video_cpu_utilization_ratio', 'Fraction of CPU capacity in use (0-1)'
+        )
+        self.analysis_fps = self.registry.gauge(
+            'video_analysis_fps', 'Frames per second sampled for analysis', ('camera_id',)
+        )
+        self.input_size = self.registry.gauge(
+            'video_detector_input_size_pixels', 'Longer side of the object detector input'
+        )
+        self.governor_decisions = self.registry.counter(
+            'video_governor_decisions_total', 'Quality changes made by the load governor', ('action', 'reason')
+        )
+
+    def time(self, stage: str, camera_id: str):
+        """Context manager timing one stage for one camera"""
+        return self.stage_seconds.time(stage=stage, camera_id=camera_id)
+
+    def observe_capture(self, camera_id: str, grabber):
+        """Record a LatestFrameGrabber's decode time, drops and buffer fill"""
+        if grabber.last_decode_time is not None:
+            self.stage_seconds.observe(grabber.last_decode_time, stage='decode', camera_id=camera_id)
+        self.frames_dropped.set_total(grabber.frames_dropped, camera_id=camera_id)
+        # read() has just emptied a live buffer, so use the fill it found
+        self.buffer_fill.set(grabber.fill_at_read, buffer='capture', camera_id=camera_id)
+
+    def observe_tracks(self, camera_id: str, tracked_objects: List, left_behind: List):
+        """Record the number of live and left-behind tracks"""
+        self.live_tracks.set(len(tracked_objects), camera_id=camera_id)
+        self.left_behind.set(len(left_behind), camera_id=camera_id)
+
+    def observe_threat_stream(self, camera_id: str, threat_stream):
+        """Record how full a threat scheduler's clip buffer is"""
+        buffer = threat_stream.detector.frame_buffer
+        self.buffer_fill.set(
+            len(buffer) / max(1, buffer.clip_length), buffer='threat_clip', camera_id=camera_id
+        )
+
+    def render(self) -> str:
+        return self.registry.render()
+
+
+# Process-wide metrics used by main.py and the video API
+pipeline_metrics = PipelineMetrics()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    metrics: PipelineMetrics = pipeline_metrics
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = self.metrics.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes every few seconds would flood the log
+
+
+def start_metrics_server(
+    port: int,
+    host: str = '0.0.0.0',
+    metrics: PipelineMetrics = pipeline_metrics
+) -> ThreadingHTTPServer:
+    """
+    Serve GET /metrics on a background thread (for processes without the Flask API)
+
+    Args:
+        port: TCP port (0 picks a free one)
+        host: Interface to bind
+        metrics: Metrics to serve
+
+    Returns:
+        The running server (call shutdown() to stop it)
+    """
+    handler = type('MetricsHandler', (_MetricsHandler,), {'metrics': metrics})
+    server = ThreadingHTTPServer((host, port), handler)
+    thread = threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True)
+    thread.start()
+    logger.info(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
@@ -0,0 +1,480 @@
+"""
+Offline Video Analysis
+Splits a recording into overlapping time segments, analyses them in a process pool and merges the results
+"""
+
+import os
+import time
+import logging
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from ..models.threat_scheduler import ThreatScheduler, person_boxes
+from ..tracking.matching import match_detections
+from ..tracking.object_tracker import ObjectTracker
+from ..video.frame_reader import FrameSampler, read_sampled
+from ..video.replay import ReplayClock
+
+logger = logging.getLogger(__name__)
+
+# Trackers run on a replay clock starting here; times are reported as video seconds
+VIDEO_EPOCH = datetime(2000, 1, 1)
+
+
+def video_duration(path: str) -> float:
+    """Length of a video file in seconds (from its frame count and rate)"""
+    cap = cv2.VideoCapture(str(path))
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video: {path}")
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        frames = cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0.0
+    finally:
+        cap.release()
+    if fps <= 0 or frames <= 0:
+        raise ValueError(f"Could not determine the duration of {path}")
+    return frames / fps
+
+
+def plan_segments(
+    duration: float,
+    segment_seconds: float,
+    overlap_seconds: float
+) -> List[Dict]:
+    """
+    Split a video into analysis segments
+
+    Each segment owns the interval [start, end). Its tracker and threat clip
+    buffer start ``overlap_seconds`` earlier (``warmup_start``) so tracks are
+    confirmed and stationary objects recognised by the time the segment
+    begins; nothing seen only in the warm-up is reported by the segment.
+
+    Args:
+        duration: Video length in seconds
+        segment_seconds: Length of each segment
+        overlap_seconds: Warm-up read before each segment's start
+
+    Returns:
+        Segment dicts with index, warmup_start, start and end (seconds)
+    """
+    segment_seconds = max(1.0, segment_seconds)
+    count = max(1, int(np.ceil(duration / segment_seconds)))
+    return [
+        {
+            'index': index,
+            'warmup_start': max(0.0, index * segment_seconds - overlap_seconds),
+            'start': index * segment_seconds,
+            'end': duration if index == count - 1 else (index + 1) * segment_seconds
+        }
+        for index in range(count)
+    ]
+
+
+def _seconds(timestamp: Optional[datetime]) -> Optional[float]:
+    return None if timestamp is None else (timestamp - VIDEO_EPOCH).total_seconds()
+
+
+def _record_tracks(records: Dict[int, Dict], tracked_objects: List, now: float):
+    """Update per-track summaries, including the intervals each track was stationary"""
+    for obj in tracked_objects:
+        record = records.get(obj.track_id)
+        if record is None:
+            record = records[obj.track_id] = {
+                'track_id': obj.track_id,
+                'class_id': obj.class_id,
+                'class_name': obj.class_name,
+                'first_seen': _seconds(obj.first_seen),
+                'first_bbox': obj.bbox,
+                'max_confidence': 0.0,
+                'stationary': []
+            }
+        record['last_seen'] = _seconds(obj.last_seen)
+        record['last_bbox'] = obj.bbox
+        record['max_confidence'] = max(record['max_confidence'], obj.confidence)
+
+        stationary_since = _seconds(obj.stationary_since)
+        if stationary_since is not None:
+            runs = record['stationary']
+            if runs and runs[-1][0] == stationary_since:
+                runs[-1][1] = now
+            else:
+                runs.append([stationary_since, now])
+
+
+def analyze_segment(
+    path: str,
+    segment: Dict,
+    detector,
+    tracking_config: Dict,
+    threat_stream: Optional[ThreatScheduler] = None,
+    target_fps: float = 5.0,
+    batch_size: int = 8,
+    min_object_size: int = 1000
+) -> Dict:
+    """
+    Detect, track and check for threats in one segment of a video
+
+    Frames are sampled at ``target_fps`` by PTS and detected in batches of
+    ``batch_size`` with ``detect_batch``. The tracker runs on a ReplayClock,
+    so its timing follows the video and not the wall clock.
+
+    Args:
+        path: Video file
+        segment: Segment from plan_segments
+        detector: LeftBehindObjectDetector (or compatible)
+        tracking_config: The tracking config section
+        threat_stream: Threat scheduler for the segment (None skips threat detection)
+        target_fps: Analysis frames per second
+        batch_size: Frames per detect_batch call
+        min_object_size: Minimum detection area in pixels
+
+    Returns:
+        Segment result with its tracks, threat detections and frame count
+    """
+    start_time = time.perf_counter()
+    cap = cv2.VideoCapture(str(path))
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video: {path}")
+    if segment['warmup_start'] > 0:
+        cap.set(cv2.CAP_PROP_POS_MSEC, segment['warmup_start'] * 1000.0)
+
+    clock = ReplayClock(VIDEO_EPOCH)
+    tracker = ObjectTracker(
+        iou_threshold=tracking_config.get('iou_threshold', 0.3),
+        max_age=tracking_config.get('max_age', 30),
+        min_hits=tracking_config.get('min_hits', 3),
+        clock=clock
+    )
+    sampler = FrameSampler(target_fps=target_fps)
+    records: Dict[int, Dict] = {}
+    threats: List[Dict] = []
+    frames = 0
+
+    try:
+        finished = False
+        while not finished:
+            batch: List[Tuple[np.ndarray, float]] = []
+            while len(batch) < batch_size:
+                ret, frame, pts = read_sampled(cap, sampler, use_stream_timestamps=True)
+                if not ret or pts >= segment['end']:
+                    finished = True
+                    break
+                batch.append((frame, pts))
+            if not batch:
+                break
+
+            for (frame, pts), detections in zip(
+                batch, detector.detect_batch([frame for frame, _ in batch])
+            ):
+                clock.advance(pts)
+                frames += 1
+                detections = detector.filter_by_size(detections, min_object_size)
+                tracked_objects = tracker.update(detections)
+                _record_tracks(records, tracked_objects, pts)
+
+                if threat_stream is None:
+                    continue
+                result = threat_stream.detect(frame, person_boxes=person_boxes(tracked_objects))
+                # Threats in the warm-up belong to the previous segment
+                if result['is_threat'] and result['fresh'] and pts >= segment['start']:
+                    threats.append({
+                        'time': pts,
+                        'threat_type': result['threat_type'],
+                        'confidence': float(result['confidence'])
+                    })
+    finally:
+        cap.release()
+
+    # Tracks that ended during the warm-up are reported by the previous segment
+    tracks = [
+        record for record in records.values()
+        if record['last_seen'] >= segment['start']
+    ]
+    return dict(
+        segment,
+        frames=frames,
+        tracks=tracks,
+        threats=threats,
+        processing_seconds=time.perf_counter() - start_time
+    )
+
+
+def _join_stationary(runs: List[List[float]]) -> List[List[float]]:
+    """Merge overlapping stationary intervals (a track seen by two segments)"""
+    joined: List[List[float]] = []
+    for start, end in sorted(runs):
+        if joined and start <= joined[-1][1]:
+            joined[-1][1] = max(joined[-1][1], end)
+        else:
+            joined.append([start, end])
+    return joined
+
+
+def _stitch_tracks(results: List[Dict], iou_threshold: float) -> List[Dict]:
+    """
+    Join tracks that continue across segment boundaries
+
+    A track of a segment that was already present during its warm-up is
+    matched (same class, IoU of its first box with the earlier track's last
+    box) to a track of the previous segment that was still alive then.
+    """
+    merged: List[Dict] = []
+    previous: List[Dict] = []
+
+    for result in results:
+        # Earlier tracks still present when this segment's warm-up began
+        candidates = [track for track in previous if track['last_seen'] >= result['warmup_start']]
+        carried = [track for track in result['tracks'] if track['first_seen'] < result['start']]
+
+        matches = []
+        if candidates and carried:
+            matches, _, _ = match_detections(
+                np.array([track['first_bbox'] for track in carried], dtype=np.float64),
+                np.array([track['class_id'] for track in carried], dtype=np.int64),
+                np.array([track['last_bbox'] for track in candidates], dtype=np.float64),
+                np.array([track['class_id'] for track in candidates], dtype=np.int64),
+                iou_threshold
+            )
+        continued = {id(carried[i]): candidates[j] for i, j in matches}
+
+        current = []
+        for track in result['tracks']:
+            earlier = continued.get(id(track))
+            if earlier is None:
+                earlier = dict(track, stationary=list(track['stationary']), segments=[])
+                merged.append(earlier)
+            else:
+                earlier['first_seen'] = min(earlier['first_seen'], track['first_seen'])
+                earlier['last_seen'] = max(earlier['last_seen'], track['last_seen'])
+                earlier['last_bbox'] = track['last_bbox']
+                earlier['max_confidence'] = max(earlier['max_confidence'], track['max_confidence'])
+                earlier['stationary'] = _join_stationary(earlier['stationary'] + track['stationary'])
+            earlier['segments'].append(result['index'])
+            current.append(earlier)
+
+        previous = current
+
+    return merged
+
+
+def _group_threats(threats: List[Dict], gap_seconds: float) -> List[Dict]:
+    """Combine consecutive detections of the same threat into one event"""
+    events: List[Dict] = []
+    for threat in sorted(threats, key=lambda t: t['time']):
+        last = events[-1] if events else None
+        if (last is not None and last['threat_type'] == threat['threat_type']
+                and threat['time'] - last['end'] <= gap_seconds):
+            last['end'] = threat['time']
+            last['confidence'] = max(last['confidence'], threat['confidence'])
+            last['detections'] += 1
+        else:
+            events.append({
+                'event': 'threat',
+                'time': threat['time'],
+                'end': threat['time'],
+                'threat_type': threat['threat_type'],
+                'confidence': threat['confidence'],
+                'detections': 1
+            })
+    return events
+
+
+def merge_segments(
+    results: List[Dict],
+    left_behind_minutes: float,
+    iou_threshold: float = 0.3,
+    threat_gap_seconds: float = 10.0,
+    start_time: Optional[datetime] = None
+) -> Dict:
+    """
+    Merge per-segment results into one report
+
+    Tracks are stitched across segment boundaries, so an object that stays
+    put for longer than a segment is still one track. Left-behind events are
+    derived from the stitched stationary intervals with the same rule as the
+    live tracker: a non-person object stationary for ``left_behind_minutes``.
+
+    Args:
+        results: analyze_segment results (any order)
+        left_behind_minutes: object_detection.left_behind_threshold
+        iou_threshold: Minimum IoU to join tracks across a boundary
+        threat_gap_seconds: Threat detections closer than this form one event
+        start_time: Wall-clock time of the first frame (adds timestamps to events)
+
+    Returns:
+        Report with tracks, events (sorted by time) and frame counts
+    """
+    results = sorted(results, key=lambda r: r['index'])
+    tracks = _stitch_tracks(results, iou_threshold)
+    threshold = left_behind_minutes * 60.0
+
+    events: List[Dict] = []
+    for track_id, track in enumerate(tracks, start=1):
+        track['track_id'] = track_id
+        track['left_behind_since'] = None
+        if track['class_name'].lower() == 'person':
+            continue  # NEVER mark persons as left-behind objects
+        for start, end in track['stationary']:
+            if end - start < threshold:
+                continue
+            if track['left_behind_since'] is None:
+                track['left_behind_since'] = start + threshold
+            events.append({
+                'event': 'left_behind',
+                'time': start + threshold,
+                'track_id': track_id,
+                'class_name': track['class_name'],
+                'confidence': track['max_confidence'],
+                'stationary_since': start,
+                'stationary_until': end,
+                'bbox': track['last_bbox']
+            })
+
+    events.extend(_group_threats(
+        [threat for result in results for threat in result['threats']], threat_gap_seconds
+    ))
+    events.sort(key=lambda event: event['time'])
+
+    if start_time is not None:
+        for event in events:
+            event['timestamp'] = (start_time + timedelta(seconds=event['time'])).isoformat()
+
+    return {
+        'segments': len(results),
+        'frames': sum(result['frames'] for result in results),
+        'tracks': [
+            {
+                'track_id': track['track_id'],
+                'class_name': track['class_name'],
+                'first_seen': track['first_seen'],
+                'last_seen': track['last_seen'],
+                'max_confidence': track['max_confidence'],
+                'bbox': track['last_bbox'],
+                'stationary': track['stationary'],
+                'left_behind_since': track['left_behind_since'],
+                'segments': track['segments']
+            }
+            for track in tracks
+        ],
+        'events': events
+    }
+
+
+# Models loaded once per pool process
+_worker: Dict = {}
+
+
+def _init_worker(config: Dict, detect_threats: bool, torch_threads: int):
+    """Pool initializer: load the models for this process"""
+    import torch
+    from ..models.object_detector import LeftBehindObjectDetector
+    from ..models.threat_detector import ThreatDetector
+
+    # Parallelism comes from the processes; one BLAS pool per core avoids oversubscription
+    torch.set_num_threads(torch_threads)
+    _worker['config'] = config
+    _worker['detector'] = LeftBehindObjectDetector.from_config(config['object_detection'])
+    _worker['threat_detector'] = (
+        ThreatDetector.from_config(config['threat_detection']) if detect_threats else None
+    )
+
+
+def _analyze_segment_task(path: str, segment: Dict, settings: Dict) -> Dict:
+    config = _worker['config']
+    threat_stream = None
+    if _worker['threat_detector'] is not None:
+        threat_stream = ThreatScheduler.from_config(
+            _worker['threat_detector'].spawn_stream(),
+            config['threat_detection'].get('scheduler', {}),
+            config['threat_detection'].get('person_gate', {})
+        )
+    return analyze_segment(
+        path,
+        segment,
+        _worker['detector'],
+        config['tracking'],
+        threat_stream=threat_stream,
+        target_fps=settings['target_fps'],
+        batch_size=settings['batch_size'],
+        min_object_size=config['object_detection']['min_object_size']
+    )
+
+
+def analyze_video(
+    path: str,
+    config: Dict,
+    workers: Optional[int] = None,
+    segment_seconds: float = 600.0,
+    overlap_seconds: float = 30.0,
+    target_fps: float = 5.0,
+    batch_size: int = 8,
+    detect_threats: bool = True,
+    start_time: Optional[datetime] = None
+) -> Dict:
+    """
+    Analyse a video file in parallel and return the merged report
+
+    Segments are distributed over a pool of worker processes, each loading
+    the models once, so throughput grows with the number of cores.
+
+    Args:
+        path: Video file
+        config: Loaded configuration
+        workers: Worker processes (defaults to the number of CPUs)
+        segment_seconds: Length of each segment
+        overlap_seconds: Warm-up read before each segment
+        target_fps: Analysis frames per second
+        batch_size: Frames per detect_batch call
+        detect_threats: Also run threat detection
+        start_time: Wall-clock time of the first frame
+
+    Returns:
+        Report from merge_segments, plus video and timing information
+    """
+    start = time.perf_counter()
+    duration = video_duration(path)
+    segments = plan_segments(duration, segment_seconds, overlap_seconds)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(segments)))
+    torch_threads = max(1, (os.cpu_count() or 1) // workers)
+    settings = {'target_fps': target_fps, 'batch_size': batch_size}
+
+    logger.info(
+        f"Analysing {path} ({duration:.0f} s) in {len(segments)} segments "
+        f"with {workers} workers"
+    )
+    results = []
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=mp.get_context('spawn'),
+        initializer=_init_worker,
+        initargs=(config, detect_threats, torch_threads)
+    ) as pool:
+        futures = [pool.submit(_analyze_segment_task, str(path), segment, settings) for segment in segments]
+        for future in futures:
+            result = future.result()
+            logger.info(
+                f"Segment {result['index'] + 1}/{len(segments)}: {result['frames']} frames "
+                f"in {result['processing_seconds']:.1f} s"
+            )
+            results.append(result)
+
+    report = merge_segments(
+        results,
+        left_behind_minutes=config['object_detection']['left_behind_threshold'],
+        iou_threshold=config['tracking'].get('iou_threshold', 0.3),
+        start_time=start_time
+    )
+    elapsed = time.perf_counter() - start
+    report.update({
+        'video': str(path),
+        'duration': duration,
+        'workers': workers,
+        'processing_seconds': elapsed,
+        'speedup': duration / elapsed if elapsed > 0 else 0.0
+    })
+    return report
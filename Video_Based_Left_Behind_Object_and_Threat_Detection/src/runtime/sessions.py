@@ -0,0 +1,194 @@
+"""
+Camera Session Registry
+Per-camera tracker and threat state for the video API, safe under a threaded server
+"""
+
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CameraSession:
+    """
+    State of one camera posting frames to the API
+
+    Holds the camera's own tracker and threat stream, so frames from
+    different cameras never share tracks or clips. ``lock`` serializes
+    that camera's frames.
+    """
+
+    def __init__(self, camera_id: str, tracker, threat_stream=None, zones=None):
+        """
+        Initialize camera session
+
+        Args:
+            camera_id: Camera identifier
+            tracker: ObjectTracker for this camera
+            threat_stream: ThreatScheduler for this camera (None if disabled)
+            zones: DetectionZones for this camera (None analyses the full frame)
+        """
+        self.camera_id = camera_id
+        self.tracker = tracker
+        self.threat_stream = threat_stream
+        self.zones = zones
+
+        self.lock = threading.Lock()
+        self.last_seen = 0.0
+        self.frames = 0
+
+    def stats(self, now: float) -> Dict:
+        """Per-camera counters for status reporting"""
+        # Called without ``lock``: read one column instead of walking the store
+        return {
+            'frames': self.frames,
+            'idle_seconds': round(now - self.last_seen, 1),
+            'tracked_objects': int(self.tracker.store.active.sum()),
+            'threat_inference': (
+                self.threat_stream.stats() if self.threat_stream is not None else None
+            )
+        }
+
+
+class SessionRegistry:
+    """
+    Camera sessions keyed by camera_id
+
+    Sessions are created on a camera's first frame and evicted after
+    ``idle_timeout`` seconds without frames (or, when ``max_sessions`` is
+    reached, the least recently seen idle camera goes first). The registry
+    lock only guards the dictionary; each session has its own lock, so
+    different cameras are processed concurrently while frames of one
+    camera are applied in turn.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[str], CameraSession],
+        idle_timeout: float = 600.0,
+        max_sessions: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize session registry
+
+        Args:
+            factory: Builds a new CameraSession for a camera_id
+            idle_timeout: Seconds without frames before a session is evicted
+            max_sessions: Maximum concurrent sessions (None for no limit)
+            clock: Time source (monotonic seconds)
+        """
+        self.factory = factory
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.clock = clock
+
+        self._sessions: Dict[str, CameraSession] = {}
+        self._lock = threading.Lock()
+        self.sessions_created = 0
+        self.sessions_evicted = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def __contains__(self, camera_id: str) -> bool:
+        with self._lock:
+            return camera_id in self._sessions
+
+    def _evict(self, camera_id: str, reason: str) -> bool:
+        """Drop a session unless a request is using it (registry lock held)"""
+        session = self._sessions[camera_id]
+        if not session.lock.acquire(blocking=False):
+            return False
+        try:
+            del self._sessions[camera_id]
+        finally:
+            session.lock.release()
+        self.sessions_evicted += 1
+        logger.info(f"Evicted session for camera {camera_id} ({reason})")
+        return True
+
+    def _evict_idle(self, now: float) -> int:
+        """Evict sessions idle for longer than idle_timeout (registry lock held)"""
+        idle = [
+            camera_id for camera_id, session in self._sessions.items()
+            if now - session.last_seen > self.idle_timeout
+        ]
+        return sum(self._evict(camera_id, 'idle') for camera_id in idle)
+
+    def evict_idle(self) -> int:
+        """
+        Remove sessions idle for longer than idle_timeout
+
+        Returns:
+            Number of sessions evicted
+        """
+        with self._lock:
+            return self._evict_idle(self.clock())
+
+    def _get_or_create(self, camera_id: str) -> CameraSession:
+        now = self.clock()
+        with self._lock:
+            session = self._sessions.get(camera_id)
+            if session is None:
+                # New cameras are rare, so this is when idle ones are cleaned up
+                self._evict_idle(now)
+
+                if self.max_sessions and len(self._sessions) >= self.max_sessions:
+                    oldest = sorted(self._sessions, key=lambda c: self._sessions[c].last_seen)
+                    if not any(self._evict(other_id, 'registry full') for other_id in oldest):
+                        raise RuntimeError(f"All {self.max_sessions} camera sessions are busy")
+
+                session = self.factory(camera_id)
+                self._sessions[camera_id] = session
+                self.sessions_created += 1
+                logger.info(f"Created session for camera {camera_id}")
+
+            session.last_seen = now
+            return session
+
+    @contextmanager
+    def session(self, camera_id: str) -> Iterator[CameraSession]:
+        """
+        Use a camera's session, creating it if needed
+
+        The session's lock is held inside the ``with`` block, so concurrent
+        requests for the same camera are applied one at a time.
+        """
+        while True:
+            session = self._get_or_create(camera_id)
+            session.lock.acquire()
+            # A session evicted between lookup and locking is stale; retry
+            with self._lock:
+                current = self._sessions.get(camera_id) is session
+            if current:
+                break
+            session.lock.release()
+
+        try:
+            yield session
+            session.frames += 1
+            session.last_seen = self.clock()
+        finally:
+            session.lock.release()
+
+    def get(self, camera_id: str) -> Optional[CameraSession]:
+        """Existing session for a camera, without creating or locking it"""
+        with self._lock:
+            return self._sessions.get(camera_id)
+
+    def stats(self) -> Dict:
+        """Registry and per-camera counters"""
+        with self._lock:
+            sessions = dict(self._sessions)
+        now = self.clock()
+        return {
+            'active': len(sessions),
+            'created': self.sessions_created,
+            'evicted': self.sessions_evicted,
+            'cameras': {camera_id: session.stats(now) for camera_id, session in sessions.items()}
+        }
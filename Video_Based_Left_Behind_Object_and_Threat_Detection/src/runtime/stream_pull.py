@@ -0,0 +1,268 @@
+"""
+Stream Pull Workers
+Background workers that read camera streams inside the video API and publish results as events
+"""
+
+import json
+import time
+import queue
+import logging
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+def format_sse(event: Dict) -> str:
+    """Serialize an event as a Server-Sent Events message"""
+    return (
+        f"id: {event['id']}\n"
+        f"event: {event['event']}\n"
+        f"data: {json.dumps(event['data'])}\n\n"
+    )
+
+
+class EventBroker:
+    """
+    Fan-out of camera events to Server-Sent Events subscribers
+
+    Every subscriber gets its own bounded queue. A subscriber that falls
+    behind loses its oldest events rather than slowing down the worker
+    that publishes them.
+    """
+
+    def __init__(self, queue_size: int = 64):
+        """
+        Initialize event broker
+
+        Args:
+            queue_size: Events buffered per subscriber
+        """
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, List[queue.Queue]] = {}
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self.events_published = 0
+        self.events_dropped = 0
+
+    def subscribe(self, camera_id: str) -> queue.Queue:
+        """Register a subscriber for one camera's events"""
+        subscriber = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(camera_id, []).append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, camera_id: str, subscriber: queue.Queue):
+        """Remove a subscriber"""
+        with self._lock:
+            subscribers = self._subscribers.get(camera_id, [])
+            if subscriber in subscribers:
+                subscribers.remove(subscriber)
+            if not subscribers:
+                self._subscribers.pop(camera_id, None)
+
+    def subscriber_count(self, camera_id: str) -> int:
+        """Number of open subscriptions for a camera"""
+        with self._lock:
+            return len(self._subscribers.get(camera_id, []))
+
+    def publish(self, camera_id: str, event: str, data: Dict) -> int:
+        """
+        Send an event to every subscriber of a camera
+
+        Args:
+            camera_id: Camera the event belongs to
+            event: Event name ('result', 'left_behind', 'threat', 'status')
+            data: JSON-serializable payload
+
+        Returns:
+            Number of subscribers the event was queued for
+        """
+        with self._lock:
+            message = {'id': self._next_id, 'event': event, 'data': data}
+            self._next_id += 1
+            self.events_published += 1
+
+            subscribers = self._subscribers.get(camera_id, [])
+            for subscriber in subscribers:
+                while True:
+                    try:
+                        subscriber.put_nowait(message)
+                        break
+                    except queue.Full:
+                        # Slow client: drop its oldest event
+                        try:
+                            subscriber.get_nowait()
+                            self.events_dropped += 1
+                        except queue.Empty:
+                            pass
+            return len(subscribers)
+
+    def stream(
+        self,
+        camera_id: str,
+        keepalive: float = 15.0,
+        stop: Optional[threading.Event] = None
+    ) -> Iterator[str]:
+        """
+        Yield one camera's events as SSE messages until the client disconnects
+
+        A comment line is sent every ``keepalive`` seconds without events,
+        so proxies keep the connection open and dead clients are noticed.
+        """
+        subscriber = self.subscribe(camera_id)
+        try:
+            yield ": connected\n\n"
+            while stop is None or not stop.is_set():
+                try:
+                    yield format_sse(subscriber.get(timeout=keepalive))
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+        finally:
+            self.unsubscribe(camera_id, subscriber)
+
+    def stats(self) -> Dict:
+        """Publishing counters for status reporting"""
+        with self._lock:
+            return {
+                'published': self.events_published,
+                'dropped': self.events_dropped,
+                'subscribers': {
+                    camera_id: len(subscribers)
+                    for camera_id, subscribers in self._subscribers.items()
+                }
+            }
+
+
+class StreamPullWorker:
+    """
+    Reads one camera stream in the API process and publishes its results
+
+    Frames come from a LatestFrameGrabber, so a slow model always works on
+    the newest frame. Each frame is passed to ``process`` (which runs
+    detection, tracking and threat inference for the camera) and the result
+    is published as a ``result`` event. A ``left_behind`` event is published
+    once per track when it first becomes left behind, and a ``threat``
+    event whenever a fresh threat inference detects a threat.
+    """
+
+    def __init__(
+        self,
+        camera_id: str,
+        grabber,
+        process: Callable[[str, object], Dict],
+        broker: EventBroker,
+        read_timeout: float = 1.0,
+        metrics=None
+    ):
+        """
+        Initialize stream pull worker
+
+        Args:
+            camera_id: Camera identifier
+            grabber: LatestFrameGrabber for the camera's stream
+            process: Callable(camera_id, frame) returning a process-frame result
+            broker: EventBroker the events are published on
+            read_timeout: Seconds to wait for a frame before checking for stop
+            metrics: PipelineMetrics for capture and alert metrics (optional)
+        """
+        self.camera_id = camera_id
+        self.grabber = grabber
+        self.process = process
+        self.broker = broker
+        self.read_timeout = read_timeout
+        self.metrics = metrics
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._announced: Set[int] = set()
+
+        self.frames_processed = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self.processing_time = 0.0
+
+    def start(self):
+        """Start capturing and processing in the background"""
+        self.grabber.start()
+        self._thread = threading.Thread(
+            target=self._run, name=f"stream-pull-{self.camera_id}", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Pulling stream for camera {self.camera_id} from {self.grabber.source}")
+
+    def stop(self, timeout: float = 2.0):
+        """Stop the worker and release the stream"""
+        self._stop.set()
+        self.grabber.stop(timeout)
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while not self._stop.is_set():
+            ret, frame = self.grabber.read(timeout=self.read_timeout)
+            if not ret:
+                if self.grabber.is_finished:
+                    logger.info(f"Stream for camera {self.camera_id} ended")
+                    self.broker.publish(self.camera_id, 'status', {
+                        'camera_id': self.camera_id, 'status': 'ended'
+                    })
+                    break
+                continue
+            if self.metrics is not None:
+                self.metrics.observe_capture(self.camera_id, self.grabber)
+
+            start = time.perf_counter()
+            try:
+                result = self.process(self.camera_id, frame)
+            except Exception as e:
+                self.errors += 1
+                self.last_error = str(e)
+                logger.error(f"Processing stream frame for camera {self.camera_id} failed: {e}")
+                continue
+            self.processing_time = time.perf_counter() - start
+            self.frames_processed += 1
+            self.publish_result(result)
+
+    def publish_result(self, result: Dict):
+        """Publish a process-frame result and the events derived from it"""
+        result = dict(result, frame_index=self.frames_processed, timestamp=time.time())
+        self.broker.publish(self.camera_id, 'result', result)
+
+        detections = result.get('objects', {}).get('detections', [])
+        present = {det['track_id'] for det in detections}
+        for det in detections:
+            if det['is_left_behind'] and det['track_id'] not in self._announced:
+                self._announced.add(det['track_id'])
+                if self.metrics is not None:
+                    self.metrics.alerts.inc(type='left_behind', camera_id=self.camera_id)
+                self.broker.publish(self.camera_id, 'left_behind', dict(
+                    det, camera_id=self.camera_id, timestamp=result['timestamp']
+                ))
+        # Forget tracks that are gone so the set stays small
+        self._announced &= present
+
+        threats = result.get('threats', {})
+        if threats.get('is_threat') and threats.get('fresh'):
+            if self.metrics is not None:
+                self.metrics.alerts.inc(type='threat', camera_id=self.camera_id)
+            self.broker.publish(self.camera_id, 'threat', dict(
+                threats, camera_id=self.camera_id, timestamp=result['timestamp']
+            ))
+
+    def stats(self) -> Dict:
+        """Worker and capture counters for status reporting"""
+        return {
+            'running': self.is_running,
+            'source': str(self.grabber.source),
+            'frames_processed': self.frames_processed,
+            'errors': self.errors,
+            'last_error': self.last_error,
+            'processing_ms': self.processing_time * 1000,
+            'subscribers': self.broker.subscriber_count(self.camera_id),
+            'capture': self.grabber.stats()
+        }
@@ -0,0 +1,395 @@
+"""
+Multi-Camera Runtime
+Runs one worker process per camera group and aggregates their results and alerts
+"""
+
+import time
+import queue
+import logging
+import threading
+import multiprocessing as mp
+from datetime import datetime
+from typing import List, Dict, Optional, Callable, Any
+
+from .inference_service import BatchInferenceService, RemoteDetector
+from .metrics import pipeline_metrics, start_metrics_server
+
+logger = logging.getLogger(__name__)
+
+# Message kinds sent from workers to the aggregator
+MSG_RESULT = 'result'
+MSG_ALERT = 'alert'
+MSG_ERROR = 'error'
+
+# Alert type label in video_alerts_total per forwarded AlertSystem method
+ALERT_TYPES = {'send_left_behind_alert': 'left_behind', 'send_threat_alert': 'threat'}
+
+
+def camera_source(camera: Dict) -> Any:
+    """
+    Determine the video source for a camera configuration
+
+    Args:
+        camera: Camera entry from config.yaml
+
+    Returns:
+        Stream URL, or 0 for the default webcam
+    """
+    if 'stream_url' in camera:
+        return camera['stream_url']
+    elif 'ip' in camera:
+        return f"http://{camera['ip']}/stream"
+    return 0  # Default to webcam
+
+
+def group_cameras(cameras: List[Dict], num_workers: int) -> List[List[Dict]]:
+    """
+    Split cameras into at most ``num_workers`` round-robin groups
+
+    Args:
+        cameras: Camera configurations
+        num_workers: Maximum number of worker processes
+
+    Returns:
+        Non-empty camera groups, one per worker
+    """
+    num_groups = max(1, min(num_workers, len(cameras)))
+    groups = [cameras[i::num_groups] for i in range(num_groups)]
+    return [group for group in groups if group]
+
+
+class QueueAlertSink:
+    """
+    Stand-in for AlertSystem inside worker processes
+
+    Forwards alert requests to the central aggregator, which owns the real
+    AlertSystem (and therefore the cooldown state for all cameras).
+    """
+
+    def __init__(self, result_queue, worker_index: int):
+        self.result_queue = result_queue
+        self.worker_index = worker_index
+
+    def _forward(self, method: str, kwargs: Dict) -> bool:
+        try:
+            self.result_queue.put((MSG_ALERT, self.worker_index, method, kwargs), timeout=5)
+            return True
+        except queue.Full:
+            logger.error(f"Result queue full, dropping {method}")
+            return False
+
+    def send_left_behind_alert(self, **kwargs) -> bool:
+        return self._forward('send_left_behind_alert', kwargs)
+
+    def send_threat_alert(self, **kwargs) -> bool:
+        return self._forward('send_threat_alert', kwargs)
+
+
+def camera_worker(
+    worker_index: int,
+    system_factory: Callable,
+    config_path: str,
+    cameras: List[Dict],
+    result_queue,
+    stop_event,
+    inference_queues: Optional[tuple] = None
+):
+    """
+    Worker process entry point: processes a group of cameras
+
+    Each worker builds its own system (models, per-camera trackers and
+    threat buffers) and reports results and alerts over ``result_queue``.
+    When ``inference_queues`` (request queue, response queue) is given,
+    object detection goes through the shared batch inference service
+    instead of a model loaded in this worker.
+    """
+    camera_ids = [camera['id'] for camera in cameras]
+    logger.info(f"Worker {worker_index} starting for cameras {camera_ids}")
+
+    try:
+        factory_kwargs = {'alert_system': QueueAlertSink(result_queue, worker_index)}
+        if inference_queues is not None:
+            request_queue, response_queue = inference_queues
+            factory_kwargs['object_detector'] = RemoteDetector(
+                worker_index, request_queue, response_queue
+            )
+
+        system = system_factory(config_path, **factory_kwargs)
+
+        # Each worker serves its own cameras' metrics on the next ports up
+        metrics_config = getattr(system, 'config', {}).get('performance', {}).get('metrics', {})
+        if metrics_config.get('enabled', False):
+            start_metrics_server(
+                metrics_config.get('port', 9108) + 1 + worker_index,
+                metrics_config.get('host', '0.0.0.0')
+            )
+
+        def publish(camera_id: str, summary: Dict):
+            try:
+                result_queue.put_nowait((MSG_RESULT, worker_index, camera_id, summary))
+            except queue.Full:
+                pass  # Results are periodic snapshots; dropping one is harmless
+
+        system.process_cameras(
+            {camera['id']: camera_source(camera) for camera in cameras},
+            stop_event=stop_event,
+            result_callback=publish
+        )
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        logger.exception(f"Worker {worker_index} crashed")
+        try:
+            result_queue.put((MSG_ERROR, worker_index, None, str(e)), timeout=1)
+        except Exception:
+            pass
+        raise
+
+    logger.info(f"Worker {worker_index} stopped")
+
+
+class CameraSupervisor:
+    """
+    Starts, monitors and restarts camera worker processes
+
+    Results and alerts from all workers arrive on one queue and are handled
+    by an aggregator thread in the supervising process.
+    """
+
+    def __init__(
+        self,
+        config_path: str,
+        cameras: List[Dict],
+        system_factory: Callable,
+        alert_system=None,
+        num_workers: int = 4,
+        max_restart_delay: float = 60.0,
+        queue_size: int = 1000,
+        detector=None,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+        stats_interval: float = 60.0
+    ):
+        """
+        Initialize supervisor
+
+        Args:
+            config_path: Path to configuration file (loaded by each worker)
+            cameras: Enabled camera configurations
+            system_factory: Picklable callable building the per-worker system,
+                called as ``system_factory(config_path, alert_system=...)``
+                (plus ``object_detector=...`` when ``detector`` is given)
+            alert_system: AlertSystem used to deliver alerts from all workers
+            num_workers: Maximum number of worker processes
+            max_restart_delay: Upper bound for the restart backoff in seconds
+            queue_size: Capacity of the worker result queue
+            detector: If given, workers send frames to a BatchInferenceService
+                running this detector instead of loading their own model
+            max_batch_size: Maximum frames per batched detector call
+            max_wait_ms: Maximum time a frame waits for its batch to fill
+            stats_interval: Seconds between batch inference statistics log lines
+        """
+        self.config_path = config_path
+        self.system_factory = system_factory
+        self.alert_system = alert_system
+        self.max_restart_delay = max_restart_delay
+        self.stats_interval = stats_interval
+
+        self.groups = group_cameras(cameras, num_workers)
+
+        self.ctx = mp.get_context('spawn')
+        self.result_queue = self.ctx.Queue(maxsize=queue_size)
+        self.stop_event = self.ctx.Event()
+
+        # Optional cross-camera micro-batching of object detection
+        self.inference_service: Optional[BatchInferenceService] = None
+        if detector is not None:
+            self.inference_service = BatchInferenceService(
+                detector,
+                request_queue=self.ctx.Queue(maxsize=queue_size),
+                response_queues={i: self.ctx.Queue() for i in range(len(self.groups))},
+                max_batch_size=max_batch_size,
+                max_wait_ms=max_wait_ms,
+                metrics=pipeline_metrics
+            )
+
+        self.processes: Dict[int, Any] = {}
+        self.restart_counts: Dict[int, int] = {i: 0 for i in range(len(self.groups))}
+        self.next_start_time: Dict[int, float] = {}
+        self.started_at: Dict[int, float] = {}
+
+        # Aggregated state
+        self.latest_results: Dict[str, Dict] = {}
+        self.alerts_forwarded = 0
+        self._lock = threading.Lock()
+        self._aggregator: Optional[threading.Thread] = None
+
+    def _start_worker(self, worker_index: int):
+        """Start (or restart) one worker process"""
+        inference_queues = None
+        if self.inference_service is not None:
+            inference_queues = (
+                self.inference_service.request_queue,
+                self.inference_service.response_queues[worker_index]
+            )
+
+        process = self.ctx.Process(
+            target=camera_worker,
+            args=(
+                worker_index,
+                self.system_factory,
+                self.config_path,
+                self.groups[worker_index],
+                self.result_queue,
+                self.stop_event,
+                inference_queues
+            ),
+            name=f"camera-worker-{worker_index}",
+            daemon=True
+        )
+        process.start()
+        self.processes[worker_index] = process
+        self.started_at[worker_index] = time.monotonic()
+
+    def start(self):
+        """Start all workers and the aggregator thread"""
+        logger.info(f"Starting {len(self.groups)} camera worker(s)")
+        if self.inference_service is not None:
+            self.inference_service.start()
+        for worker_index in range(len(self.groups)):
+            self._start_worker(worker_index)
+
+        self._aggregator = threading.Thread(
+            target=self._aggregate, name="camera-aggregator", daemon=True
+        )
+        self._aggregator.start()
+
+    def _aggregate(self):
+        """Consume worker messages until stopped"""
+        while not self.stop_event.is_set() or not self.result_queue.empty():
+            try:
+                message = self.result_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+            self.handle_message(message)
+
+    def handle_message(self, message):
+        """Handle one message from a worker"""
+        kind, worker_index, key, payload = message
+
+        if kind == MSG_RESULT:
+            with self._lock:
+                self.latest_results[key] = dict(payload, worker=worker_index)
+
+        elif kind == MSG_ALERT:
+            if self.alert_system is None:
+                logger.warning(f"No alert system configured, dropping {key}")
+                return
+            try:
+                sent = getattr(self.alert_system, key)(**payload)
+                with self._lock:
+                    self.alerts_forwarded += 1
+                if sent:
+                    pipeline_metrics.alerts.inc(
+                        type=ALERT_TYPES.get(key, key),
+                        camera_id=payload.get('camera_info', {}).get('id', '')
+                    )
+            except Exception as e:
+                logger.error(f"Failed to deliver alert from worker {worker_index}: {e}")
+
+        elif kind == MSG_ERROR:
+            logger.error(f"Worker {worker_index} reported error: {payload}")
+
+    def check_workers(self):
+        """Restart workers that exited unexpectedly, with exponential backoff"""
+        if self.stop_event.is_set():
+            return
+
+        now = time.monotonic()
+        for worker_index, process in list(self.processes.items()):
+            if process.is_alive():
+                continue
+
+            if worker_index not in self.next_start_time:
+                # Reset the backoff if the worker had been healthy for a while
+                if now - self.started_at.get(worker_index, now) > self.max_restart_delay:
+                    self.restart_counts[worker_index] = 0
+
+                delay = min(2.0 ** self.restart_counts[worker_index], self.max_restart_delay)
+                self.next_start_time[worker_index] = now + delay
+                logger.warning(
+                    f"Worker {worker_index} exited with code {process.exitcode}, "
+                    f"restarting in {delay:.0f}s"
+                )
+
+            if now >= self.next_start_time[worker_index]:
+                del self.next_start_time[worker_index]
+                self.restart_counts[worker_index] += 1
+                self._start_worker(worker_index)
+
+    def run(self, poll_interval: float = 1.0):
+        """Start workers and supervise them until interrupted"""
+        self.start()
+        next_stats = time.monotonic() + self.stats_interval
+        try:
+            while not self.stop_event.is_set():
+                self.check_workers()
+                if self.inference_service is not None and time.monotonic() >= next_stats:
+                    next_stats = time.monotonic() + self.stats_interval
+                    self.log_inference_stats()
+                time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            logger.info("Processing interrupted by user")
+        finally:
+            self.stop()
+
+    def log_inference_stats(self):
+        """Log batch sizes and queue waits of the batch inference service"""
+        stats = self.inference_service.stats()
+        logger.info(
+            f"Batch inference: {stats['frames']} frames in {stats['batches']} batches "
+            f"(mean size {stats['mean_batch_size']:.1f}, histogram {stats['batch_size_histogram']}), "
+            f"queue wait p50 {stats['queue_wait_ms']['p50']:.1f} ms / p95 {stats['queue_wait_ms']['p95']:.1f} ms, "
+            f"inference mean {stats['inference_ms']['mean']:.1f} ms, {stats['errors']} errors"
+        )
+
+    def stop(self, timeout: float = 10.0):
+        """Signal workers to stop and wait for them"""
+        self.stop_event.set()
+
+        for worker_index, process in self.processes.items():
+            process.join(timeout)
+            if process.is_alive():
+                logger.warning(f"Worker {worker_index} did not stop, terminating")
+                process.terminate()
+                process.join(1)
+
+        if self._aggregator is not None:
+            self._aggregator.join(timeout)
+
+        if self.inference_service is not None:
+            self.inference_service.stop()
+
+    def status(self) -> Dict:
+        """Snapshot of worker and camera state"""
+        with self._lock:
+            return {
+                'workers': [
+                    {
+                        'index': worker_index,
+                        'cameras': [camera['id'] for camera in self.groups[worker_index]],
+                        'alive': process.is_alive(),
+                        'restarts': self.restart_counts[worker_index]
+                    }
+                    for worker_index, process in self.processes.items()
+                ],
+                'cameras': dict(self.latest_results),
+                'alerts_forwarded': self.alerts_forwarded,
+                'inference': (
+                    self.inference_service.stats()
+                    if self.inference_service is not None else None
+                ),
+                'timestamp': datetime.now().isoformat()
+            }
@@ -1,6 +1,6 @@
 """Tracking module"""
 
 from .object_tracker import ObjectTracker, TrackedObject
+from .track_store import TrackStore
 
-__all__ = ['ObjectTracker', 'TrackedObject']
-
+__all__ = ['ObjectTracker', 'TrackedObject', 'TrackStore']
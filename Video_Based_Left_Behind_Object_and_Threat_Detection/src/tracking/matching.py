@@ -0,0 +1,168 @@
+"""
+Detection-to-Track Matching
+Vectorized IoU computation and optimal assignment for the object tracker
+"""
+
+import numpy as np
+from typing import List, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Above this many detection x track pairs, solve per-class blocks separately
+DENSE_MATCH_LIMIT = 40000
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:  # pragma: no cover - scipy is listed in requirements.txt
+    linear_sum_assignment = None
+    logger.warning("scipy not available, falling back to greedy matching")
+
+
+def iou_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """
+    Calculate pairwise Intersection over Union between two sets of boxes
+
+    Args:
+        boxes_a: Array of shape (N, 4) with [x1, y1, x2, y2] rows
+        boxes_b: Array of shape (M, 4) with [x1, y1, x2, y2] rows
+
+    Returns:
+        Array of shape (N, M) with IoU values
+    """
+    boxes_a = np.asarray(boxes_a, dtype=np.float64).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float64).reshape(-1, 4)
+
+    if len(boxes_a) == 0 or len(boxes_b) == 0:
+        return np.zeros((len(boxes_a), len(boxes_b)), dtype=np.float64)
+
+    a = boxes_a[:, None, :]
+    b = boxes_b[None, :, :]
+
+    # Intersection
+    inter_w = np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0])
+    inter_h = np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1])
+    intersection = np.clip(inter_w, 0, None) * np.clip(inter_h, 0, None)
+
+    # Union
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - intersection
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        iou = np.where(union > 0, intersection / union, 0.0)
+
+    return iou
+
+
+def _greedy_assignment(scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Greedy highest-score-first assignment (fallback when scipy is missing)"""
+    rows, cols = [], []
+    if scores.size == 0:
+        return np.array(rows, dtype=int), np.array(cols, dtype=int)
+
+    order = np.argsort(-scores, axis=None)
+    used_rows, used_cols = set(), set()
+    for flat_idx in order:
+        row, col = divmod(int(flat_idx), scores.shape[1])
+        if scores[row, col] <= 0:
+            break
+        if row in used_rows or col in used_cols:
+            continue
+        used_rows.add(row)
+        used_cols.add(col)
+        rows.append(row)
+        cols.append(col)
+
+    return np.array(rows, dtype=int), np.array(cols, dtype=int)
+
+
+def _solve(scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Maximum-IoU assignment, keeping only pairs with a positive score"""
+    if linear_sum_assignment is not None:
+        rows, cols = linear_sum_assignment(scores, maximize=True)
+    else:
+        rows, cols = _greedy_assignment(scores)
+
+    # Drop assignments that were forced onto invalid pairs
+    valid = scores[rows, cols] > 0
+    return rows[valid], cols[valid]
+
+
+def _format_matches(
+    rows: np.ndarray,
+    cols: np.ndarray,
+    num_dets: int,
+    num_tracks: int
+) -> Tuple[List[Tuple[int, int]], List[int], List[int]]:
+    """Convert assignment arrays into match pairs and unmatched index lists"""
+    matches = list(zip(rows.tolist(), cols.tolist()))
+    unmatched_dets = sorted(set(range(num_dets)) - set(rows.tolist()))
+    unmatched_tracks = sorted(set(range(num_tracks)) - set(cols.tolist()))
+    return matches, unmatched_dets, unmatched_tracks
+
+
+def match_detections(
+    det_boxes: np.ndarray,
+    det_classes: np.ndarray,
+    track_boxes: np.ndarray,
+    track_classes: np.ndarray,
+    iou_threshold: float = 0.3
+) -> Tuple[List[Tuple[int, int]], List[int], List[int]]:
+    """
+    Match detections to tracks by maximizing total IoU within each class
+
+    Args:
+        det_boxes: Detection boxes, shape (D, 4)
+        det_classes: Detection class IDs, shape (D,)
+        track_boxes: Track boxes, shape (T, 4)
+        track_classes: Track class IDs, shape (T,)
+        iou_threshold: Minimum IoU for a valid match
+
+    Returns:
+        Tuple of (matches as (det_idx, track_idx) pairs,
+                  unmatched detection indices, unmatched track indices)
+    """
+    num_dets = len(det_boxes)
+    num_tracks = len(track_boxes)
+
+    if num_dets == 0 or num_tracks == 0:
+        return [], list(range(num_dets)), list(range(num_tracks))
+
+    det_boxes = np.asarray(det_boxes, dtype=np.float64).reshape(-1, 4)
+    track_boxes = np.asarray(track_boxes, dtype=np.float64).reshape(-1, 4)
+    det_classes = np.asarray(det_classes)
+    track_classes = np.asarray(track_classes)
+
+    # Small problems: one dense class-masked matrix is cheapest
+    if num_dets * num_tracks <= DENSE_MATCH_LIMIT:
+        same_class = det_classes[:, None] == track_classes[None, :]
+        iou = iou_matrix(det_boxes, track_boxes)
+        scores = np.where(same_class & (iou >= iou_threshold), iou, 0.0)
+        rows, cols = _solve(scores)
+        return _format_matches(rows, cols, num_dets, num_tracks)
+
+    # Large problems: only same-class pairs can match, so the cost matrix is
+    # block diagonal - solve each class block on its own
+    all_rows, all_cols = [], []
+    for class_id in np.intersect1d(det_classes, track_classes):
+        det_idx = np.flatnonzero(det_classes == class_id)
+        track_idx = np.flatnonzero(track_classes == class_id)
+
+        iou = iou_matrix(det_boxes[det_idx], track_boxes[track_idx])
+        scores = np.where(iou >= iou_threshold, iou, 0.0)
+
+        # Skip rows/columns with no valid candidate at all
+        live_rows = np.flatnonzero(scores.any(axis=1))
+        live_cols = np.flatnonzero(scores.any(axis=0))
+        if len(live_rows) == 0:
+            continue
+
+        rows, cols = _solve(scores[np.ix_(live_rows, live_cols)])
+        all_rows.append(det_idx[live_rows[rows]])
+        all_cols.append(track_idx[live_cols[cols]])
+
+    rows = np.concatenate(all_rows) if all_rows else np.array([], dtype=int)
+    cols = np.concatenate(all_cols) if all_cols else np.array([], dtype=int)
+
+    return _format_matches(rows, cols, num_dets, num_tracks)
@@ -4,16 +4,47 @@ Tracks detected objects over time to determine if they are left behind
 """
 
 import numpy as np
-from typing import List, Dict, Optional, Tuple
-from datetime import datetime, timedelta
-from collections import defaultdict
+from typing import Callable, List, Dict, Optional, Tuple
+from datetime import datetime
 import logging
 
+from .matching import match_detections
+from .track_store import TrackStore
+
 logger = logging.getLogger(__name__)
 
 
+def _column(name: str, cast):
+    """Property reading/writing one TrackStore column for this object's slot"""
+    def getter(self):
+        return cast(getattr(self._store, name)[self._slot])
+
+    def setter(self, value):
+        getattr(self._store, name)[self._slot] = value
+
+    return property(getter, setter)
+
+
+def _time_column(name: str):
+    """Property converting a TrackStore time column to/from datetime"""
+    def getter(self):
+        return self._store.to_datetime(getattr(self._store, name)[self._slot])
+
+    def setter(self, value: Optional[datetime]):
+        seconds = np.nan if value is None else self._store.to_seconds(value)
+        getattr(self._store, name)[self._slot] = seconds
+
+    return property(getter, setter)
+
+
 class TrackedObject:
-    """Represents a tracked object with temporal information"""
+    """
+    Represents a tracked object with temporal information
+
+    A thin view over one slot of a TrackStore. Objects returned by
+    ObjectTracker share the tracker's store; constructing a TrackedObject
+    directly gives it a private single-track store.
+    """
     
     def __init__(
         self,
@@ -24,29 +55,66 @@ class TrackedObject:
         confidence: float,
         timestamp: datetime
     ):
-        self.track_id = track_id
-        self.bbox = bbox
-        self.class_id = class_id
-        self.class_name = class_name
-        self.confidence = confidence
-        
-        # Temporal information
-        self.first_seen = timestamp
-        self.last_seen = timestamp
-        self.last_update = timestamp
-        
-        # Tracking state
-        self.is_stationary = False
-        self.stationary_since = None
-        self.is_left_behind = False
-        self.left_behind_since = None
-        
-        # Movement tracking
-        self.position_history = [self._get_center(bbox)]
-        self.max_history_length = 100
-        
-        # Alert state
-        self.alert_sent = False
+        self._store = TrackStore(capacity=1)
+        self._slot = self._store.add(
+            track_id, bbox, class_id, class_name, confidence, timestamp
+        )
+        self._store._views[self._slot] = self
+
+    @classmethod
+    def _from_store(cls, store: TrackStore, slot: int) -> 'TrackedObject':
+        """Create a view over an existing store slot"""
+        obj = cls.__new__(cls)
+        obj._store = store
+        obj._slot = slot
+        return obj
+
+    def _detach(self):
+        """Move this object's state into a private store (track was removed)"""
+        self._store, self._slot = self._store.copy_slot(self._slot)
+        self._store._views[self._slot] = self
+
+    track_id = _column('track_id', int)
+    class_id = _column('class_id', int)
+    confidence = _column('confidence', float)
+
+    # Temporal information
+    first_seen = _time_column('first_seen')
+    last_seen = _time_column('last_seen')
+    last_update = _time_column('last_seen')
+
+    # Tracking state
+    is_stationary = _column('is_stationary', bool)
+    stationary_since = _time_column('stationary_since')
+    is_left_behind = _column('is_left_behind', bool)
+    left_behind_since = _time_column('left_behind_since')
+
+    # Alert state
+    alert_sent = _column('alert_sent', bool)
+
+    @property
+    def class_name(self) -> str:
+        return self._store.class_name[self._slot]
+
+    @property
+    def bbox(self) -> List[float]:
+        return self._store.bbox[self._slot].tolist()
+
+    @bbox.setter
+    def bbox(self, value: List[float]):
+        self._store.bbox[self._slot] = value
+
+    @property
+    def max_history_length(self) -> int:
+        return self._store.history_length
+
+    @property
+    def position_history(self) -> List[Tuple[float, float]]:
+        """Recent centre positions, oldest first"""
+        store, slot = self._store, self._slot
+        count = int(store.pos_count[slot])
+        idx = (store.pos_head[slot] - count + np.arange(count)) % store.history_length
+        return [tuple(p) for p in store.positions[slot, idx].tolist()]
         
     def _get_center(self, bbox: List[float]) -> Tuple[float, float]:
         """Get center point of bounding box"""
@@ -60,18 +128,12 @@ class TrackedObject:
         timestamp: datetime
     ):
         """Update tracked object with new detection"""
-        self.bbox = bbox
-        self.confidence = confidence
-        self.last_seen = timestamp
-        self.last_update = timestamp
-        
-        # Update position history
-        center = self._get_center(bbox)
-        self.position_history.append(center)
-        
-        # Limit history length
-        if len(self.position_history) > self.max_history_length:
-            self.position_history.pop(0)
+        self._store.update_detections(
+            np.array([self._slot]),
+            np.asarray(bbox, dtype=np.float64).reshape(1, 4),
+            np.array([confidence]),
+            timestamp
+        )
     
     def get_movement_distance(self, window: int = 10) -> float:
         """
@@ -83,19 +145,7 @@ class TrackedObject:
         Returns:
             Total distance moved
         """
-        if len(self.position_history) < 2:
-            return 0.0
-        
-        recent_positions = self.position_history[-window:]
-        total_distance = 0.0
-        
-        for i in range(1, len(recent_positions)):
-            x1, y1 = recent_positions[i-1]
-            x2, y2 = recent_positions[i]
-            distance = np.sqrt((x2 - x1)**2 + (y2 - y1)**2)
-            total_distance += distance
-        
-        return total_distance
+        return float(self._store.movement_distance(np.array([self._slot]), window)[0])
     
     def is_moving(self, threshold: float = 10.0, window: int = 10) -> bool:
         """
@@ -117,22 +167,9 @@ class TrackedObject:
         movement_threshold: float = 10.0
     ):
         """Update whether object is stationary"""
-        is_moving = self.is_moving(threshold=movement_threshold)
-        
-        if not is_moving:
-            if not self.is_stationary:
-                # Just became stationary
-                self.is_stationary = True
-                self.stationary_since = current_time
-                logger.debug(f"Object {self.track_id} ({self.class_name}) became stationary")
-        else:
-            # Object is moving
-            if self.is_stationary:
-                logger.debug(f"Object {self.track_id} ({self.class_name}) started moving again")
-            self.is_stationary = False
-            self.stationary_since = None
-            self.is_left_behind = False
-            self.left_behind_since = None
+        self._store.update_stationary(
+            np.array([self._slot]), current_time, movement_threshold
+        )
     
     def check_left_behind(
         self,
@@ -149,27 +186,9 @@ class TrackedObject:
         Returns:
             True if object is left behind
         """
-        # NEVER mark persons as left-behind objects
-        if self.class_name.lower() == 'person':
-            return False
-
-        if not self.is_stationary or self.stationary_since is None:
-            return False
-
-        time_stationary = current_time - self.stationary_since
-        threshold = timedelta(minutes=threshold_minutes)
-
-        if time_stationary >= threshold:
-            if not self.is_left_behind:
-                self.is_left_behind = True
-                self.left_behind_since = current_time
-                logger.info(
-                    f"Object {self.track_id} ({self.class_name}) "
-                    f"detected as left behind after {threshold_minutes} minutes"
-                )
-            return True
-
-        return False
+        return bool(self._store.check_left_behind(
+            np.array([self._slot]), current_time, threshold_minutes
+        )[0])
     
     @property
     def time_stationary(self) -> float:
@@ -182,11 +201,13 @@ class TrackedObject:
         if not self.is_stationary or self.stationary_since is None:
             return 0.0
 
-        time_diff = datetime.now() - self.stationary_since
+        time_diff = self._store.clock() - self.stationary_since
         return time_diff.total_seconds()
 
     def get_info(self) -> Dict:
         """Get object information as dictionary"""
+        stationary_since = self.stationary_since
+        left_behind_since = self.left_behind_since
         return {
             'track_id': self.track_id,
             'class_name': self.class_name,
@@ -196,10 +217,10 @@ class TrackedObject:
             'first_seen': self.first_seen.isoformat(),
             'last_seen': self.last_seen.isoformat(),
             'is_stationary': self.is_stationary,
-            'stationary_since': self.stationary_since.isoformat() if self.stationary_since else None,
+            'stationary_since': stationary_since.isoformat() if stationary_since else None,
             'time_stationary': self.time_stationary,
             'is_left_behind': self.is_left_behind,
-            'left_behind_since': self.left_behind_since.isoformat() if self.left_behind_since else None,
+            'left_behind_since': left_behind_since.isoformat() if left_behind_since else None,
             'alert_sent': self.alert_sent
         }
 
@@ -207,6 +228,9 @@ class TrackedObject:
 class ObjectTracker:
     """
     Manages tracking of multiple objects using simple IoU-based tracking
+
+    Track state lives in a struct-of-arrays TrackStore, so matching, aging,
+    pruning and stationary checks run over all tracks at once.
     """
 
     def __init__(
@@ -215,7 +239,8 @@ class ObjectTracker:
         max_age: int = 30,
         min_hits: int = 3,
         movement_threshold: float = 10.0,
-        left_behind_threshold_minutes: int = 60
+        left_behind_threshold_minutes: int = 60,
+        clock: Optional[Callable[[], datetime]] = None
     ):
         """
         Initialize object tracker
@@ -226,6 +251,8 @@ class ObjectTracker:
             min_hits: Minimum detections before track is confirmed
             movement_threshold: Pixel threshold for movement detection
             left_behind_threshold_minutes: Minutes before object is considered left behind
+            clock: Time source for default timestamps (defaults to the wall
+                clock; a ReplayClock replays recorded video by its frame PTS)
         """
         self.iou_threshold = iou_threshold
         self.max_age = max_age
@@ -233,15 +260,30 @@ class ObjectTracker:
         self.movement_threshold = movement_threshold
         self.left_behind_threshold_minutes = left_behind_threshold_minutes
 
-        self.tracks: Dict[int, TrackedObject] = {}
+        self.clock = clock or datetime.now
+        self.store = TrackStore(clock=self.clock)
         self.next_track_id = 1
         self.frame_count = 0
 
-        # Track ages (frames since last detection)
-        self.track_ages: Dict[int, int] = defaultdict(int)
+    @property
+    def tracks(self) -> Dict[int, TrackedObject]:
+        """Live tracks keyed by track ID"""
+        return {
+            int(self.store.track_id[slot]): self.store.view(slot)
+            for slot in self.store.active_slots()
+        }
+
+    @property
+    def track_ages(self) -> Dict[int, int]:
+        """Frames since last detection, keyed by track ID"""
+        slots = self.store.active_slots()
+        return dict(zip(self.store.track_id[slots].tolist(), self.store.age[slots].tolist()))
 
-        # Track hit counts (number of detections)
-        self.track_hits: Dict[int, int] = defaultdict(int)
+    @property
+    def track_hits(self) -> Dict[int, int]:
+        """Number of detections, keyed by track ID"""
+        slots = self.store.active_slots()
+        return dict(zip(self.store.track_id[slots].tolist(), self.store.hits[slots].tolist()))
 
     def _calculate_iou(self, bbox1: List[float], bbox2: List[float]) -> float:
         """Calculate Intersection over Union between two bounding boxes"""
@@ -279,97 +321,72 @@ class ObjectTracker:
 
         Args:
             detections: List of detections from object detector
-            timestamp: Current timestamp (defaults to now)
+            timestamp: Current timestamp (defaults to the tracker's clock)
 
         Returns:
             List of active tracked objects
         """
         if timestamp is None:
-            timestamp = datetime.now()
+            timestamp = self.clock()
 
         self.frame_count += 1
-
-        # Match detections to existing tracks
-        matched_tracks = set()
-        matched_detections = set()
-
-        # Calculate IoU matrix
-        for det_idx, detection in enumerate(detections):
-            best_iou = 0.0
-            best_track_id = None
-
-            for track_id, track in self.tracks.items():
-                # Only match same class
-                if track.class_id != detection['class_id']:
-                    continue
-
-                iou = self._calculate_iou(detection['bbox'], track.bbox)
-
-                if iou > best_iou and iou >= self.iou_threshold:
-                    best_iou = iou
-                    best_track_id = track_id
-
-            # Update matched track
-            if best_track_id is not None:
-                self.tracks[best_track_id].update(
-                    detection['bbox'],
-                    detection['confidence'],
-                    timestamp
-                )
-                matched_tracks.add(best_track_id)
-                matched_detections.add(det_idx)
-
-                # Reset age and increment hits
-                self.track_ages[best_track_id] = 0
-                self.track_hits[best_track_id] += 1
+        store = self.store
+
+        det_boxes = np.array([det['bbox'] for det in detections], dtype=np.float64).reshape(-1, 4)
+        det_classes = np.array([det['class_id'] for det in detections], dtype=np.int64)
+        det_confidences = np.array([det['confidence'] for det in detections], dtype=np.float64)
+
+        # Match detections to existing tracks (one IoU matrix, optimal assignment)
+        slots = store.active_slots()
+        matches, unmatched_detections, _ = match_detections(
+            det_boxes,
+            det_classes,
+            store.bbox[slots],
+            store.class_id[slots],
+            self.iou_threshold
+        )
+
+        # Update matched tracks
+        matched_slots = np.array([], dtype=np.int64)
+        if matches:
+            det_idx, track_idx = np.array(matches, dtype=np.int64).T
+            matched_slots = slots[track_idx]
+            store.update_detections(
+                matched_slots, det_boxes[det_idx], det_confidences[det_idx], timestamp
+            )
+            store.hits[matched_slots] += 1
 
         # Create new tracks for unmatched detections
-        for det_idx, detection in enumerate(detections):
-            if det_idx not in matched_detections:
-                track_id = self.next_track_id
-                self.next_track_id += 1
-
-                new_track = TrackedObject(
-                    track_id=track_id,
-                    bbox=detection['bbox'],
-                    class_id=detection['class_id'],
-                    class_name=detection['class_name'],
-                    confidence=detection['confidence'],
-                    timestamp=timestamp
-                )
-
-                self.tracks[track_id] = new_track
-                self.track_ages[track_id] = 0
-                self.track_hits[track_id] = 1
-
-        # Increment age for unmatched tracks
-        for track_id in list(self.tracks.keys()):
-            if track_id not in matched_tracks:
-                self.track_ages[track_id] += 1
+        for det_idx in unmatched_detections:
+            detection = detections[det_idx]
+            store.add(
+                track_id=self.next_track_id,
+                bbox=det_boxes[det_idx],
+                class_id=detection['class_id'],
+                class_name=detection['class_name'],
+                confidence=detection['confidence'],
+                timestamp=timestamp
+            )
+            self.next_track_id += 1
+
+        # Increment age for unmatched tracks, reset it for matched ones
+        store.age[store.active] += 1
+        store.age[matched_slots] = 0
 
         # Remove old tracks
-        tracks_to_remove = []
-        for track_id, age in self.track_ages.items():
-            if age > self.max_age:
-                tracks_to_remove.append(track_id)
-
-        for track_id in tracks_to_remove:
-            logger.debug(f"Removing track {track_id} (age: {self.track_ages[track_id]})")
-            del self.tracks[track_id]
-            del self.track_ages[track_id]
-            del self.track_hits[track_id]
+        slots = store.active_slots()
+        stale = slots[store.age[slots] > self.max_age]
+        for slot in stale.tolist():
+            logger.debug(f"Removing track {store.track_id[slot]} (age: {store.age[slot]})")
+        store.remove(stale)
 
         # Update stationary status for all tracks
-        for track in self.tracks.values():
-            track.update_stationary_status(timestamp, self.movement_threshold)
+        slots = store.active_slots()
+        store.update_stationary(slots, timestamp, self.movement_threshold)
 
         # Return confirmed tracks only
-        confirmed_tracks = [
-            track for track_id, track in self.tracks.items()
-            if self.track_hits[track_id] >= self.min_hits
-        ]
-
-        return confirmed_tracks
+        confirmed = slots[store.hits[slots] >= self.min_hits]
+        return [store.view(slot) for slot in confirmed.tolist()]
 
     def get_left_behind_objects(
         self,
@@ -379,31 +396,24 @@ class ObjectTracker:
         Get list of objects that have been left behind
 
         Args:
-            current_time: Current timestamp (defaults to now)
+            current_time: Current timestamp (defaults to the tracker's clock)
 
         Returns:
             List of left-behind objects
         """
         if current_time is None:
-            current_time = datetime.now()
-
-        left_behind = []
-
-        for track_id, track in self.tracks.items():
-            # Only check confirmed tracks
-            if self.track_hits[track_id] < self.min_hits:
-                continue
+            current_time = self.clock()
 
-            if track.check_left_behind(current_time, self.left_behind_threshold_minutes):
-                left_behind.append(track)
+        # Only tracks whose deadline passed are visited; confirmed tracks only
+        slots = self.store.expire_left_behind(
+            current_time, self.left_behind_threshold_minutes, self.min_hits
+        )
 
-        return left_behind
+        return [self.store.view(slot) for slot in slots.tolist()]
 
     def reset(self):
         """Reset tracker state"""
-        self.tracks.clear()
-        self.track_ages.clear()
-        self.track_hits.clear()
+        self.store.clear()
         self.next_track_id = 1
         self.frame_count = 0
 
@@ -0,0 +1,484 @@
+"""
+Array-backed Track Store
+Struct-of-arrays storage so per-frame tracker work is vectorized over all tracks
+"""
+
+import heapq
+import numpy as np
+from typing import Callable, List, Dict, Optional, Set, Tuple
+from datetime import datetime, timedelta
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TrackStore:
+    """
+    Holds the state of all tracks in parallel NumPy arrays
+
+    Each track occupies one slot. Timestamps are stored as float seconds
+    relative to ``epoch`` (NaN means "not set"), and the recent centre
+    positions of each track live in a fixed-size circular buffer next to
+    the distance of each step. A running sum over the last
+    ``movement_window`` positions makes the per-frame movement check O(1)
+    per track.
+
+    Stationary non-person tracks are also kept in a min-heap ordered by
+    ``stationary_since`` (and so by the time they become left behind, for
+    any threshold). ``expire_left_behind`` only pops the tracks whose
+    deadline has passed, so the per-frame left-behind check costs time
+    proportional to state changes rather than to the number of tracks.
+    Entries of tracks that moved or were removed are discarded lazily when
+    they reach the top of the heap; when stale entries pile up (tracks
+    toggling between moving and stationary), the heap is rebuilt from the
+    live stationary tracks.
+    """
+
+    # Smallest heap size at which stale deadline entries are compacted
+    MIN_HEAP_LIMIT = 64
+
+    def __init__(
+        self,
+        capacity: int = 64,
+        history_length: int = 100,
+        movement_window: int = 10,
+        clock: Optional[Callable[[], datetime]] = None
+    ):
+        """
+        Initialize track store
+
+        Args:
+            capacity: Initial number of slots (grows automatically)
+            history_length: Number of centre positions kept per track
+            movement_window: Positions covered by the running movement sum
+            clock: Current time for durations like time_stationary
+                (defaults to the wall clock; a ReplayClock for recorded video)
+        """
+        self.capacity = max(1, capacity)
+        self.history_length = history_length
+        self.movement_window = max(1, min(movement_window, history_length))
+        self.clock = clock or datetime.now
+        self.epoch: Optional[datetime] = None
+
+        self._allocate(self.capacity)
+
+        # Python-side per-slot data
+        self.class_name: List[Optional[str]] = [None] * self.capacity
+        self._views: Dict[int, object] = {}
+        self._free_slots: List[int] = list(range(self.capacity - 1, -1, -1))
+
+        # Left-behind deadline index: (stationary_since, slot, track_id) entries
+        self._stationary_heap: List[Tuple[float, int, int]] = []
+        self._heap_limit = self.MIN_HEAP_LIMIT  # Heap size that triggers a rebuild
+        self._left_behind: Set[int] = set()
+
+    def _allocate(self, capacity: int):
+        """Allocate all column arrays for the given capacity"""
+        self.active = np.zeros(capacity, dtype=bool)
+        self.track_id = np.zeros(capacity, dtype=np.int64)
+        self.bbox = np.zeros((capacity, 4), dtype=np.float64)
+        self.class_id = np.zeros(capacity, dtype=np.int64)
+        self.is_person = np.zeros(capacity, dtype=bool)
+        self.confidence = np.zeros(capacity, dtype=np.float64)
+
+        # Tracker bookkeeping
+        self.hits = np.zeros(capacity, dtype=np.int64)
+        self.age = np.zeros(capacity, dtype=np.int64)
+
+        # Temporal information (seconds since epoch, NaN = unset)
+        self.first_seen = np.full(capacity, np.nan)
+        self.last_seen = np.full(capacity, np.nan)
+        self.stationary_since = np.full(capacity, np.nan)
+        self.left_behind_since = np.full(capacity, np.nan)
+
+        # Tracking and alert state
+        self.is_stationary = np.zeros(capacity, dtype=bool)
+        self.is_left_behind = np.zeros(capacity, dtype=bool)
+        self.alert_sent = np.zeros(capacity, dtype=bool)
+
+        # Circular buffer of centre positions, and of the distance moved to
+        # reach each position from the previous one
+        self.positions = np.zeros((capacity, self.history_length, 2), dtype=np.float64)
+        self.steps = np.zeros((capacity, self.history_length), dtype=np.float64)
+        self.pos_head = np.zeros(capacity, dtype=np.int64)  # next write index
+        self.pos_count = np.zeros(capacity, dtype=np.int64)
+
+        # Distance moved over the last `movement_window` positions
+        self.window_sum = np.zeros(capacity, dtype=np.float64)
+
+    def _grow(self):
+        """Double the capacity, preserving existing slots"""
+        old_capacity = self.capacity
+        new_capacity = old_capacity * 2
+        old_columns = {name: getattr(self, name) for name in self._column_names()}
+
+        self._allocate(new_capacity)
+        for name, values in old_columns.items():
+            getattr(self, name)[:old_capacity] = values
+
+        self.class_name.extend([None] * (new_capacity - old_capacity))
+        self._free_slots = list(range(new_capacity - 1, old_capacity - 1, -1)) + self._free_slots
+        self.capacity = new_capacity
+
+    @staticmethod
+    def _column_names() -> List[str]:
+        return [
+            'active', 'track_id', 'bbox', 'class_id', 'is_person', 'confidence',
+            'hits', 'age', 'first_seen', 'last_seen', 'stationary_since',
+            'left_behind_since', 'is_stationary', 'is_left_behind', 'alert_sent',
+            'positions', 'steps', 'pos_head', 'pos_count', 'window_sum'
+        ]
+
+    # ------------------------------------------------------------------
+    # Time conversion
+    # ------------------------------------------------------------------
+
+    def to_seconds(self, timestamp: datetime) -> float:
+        """Convert a datetime to store-relative seconds"""
+        if self.epoch is None:
+            self.epoch = timestamp
+        return (timestamp - self.epoch).total_seconds()
+
+    def to_datetime(self, seconds: float) -> Optional[datetime]:
+        """Convert store-relative seconds back to a datetime"""
+        if np.isnan(seconds) or self.epoch is None:
+            return None
+        return self.epoch + timedelta(seconds=float(seconds))
+
+    # ------------------------------------------------------------------
+    # Slot management
+    # ------------------------------------------------------------------
+
+    def add(
+        self,
+        track_id: int,
+        bbox: List[float],
+        class_id: int,
+        class_name: str,
+        confidence: float,
+        timestamp: datetime
+    ) -> int:
+        """
+        Add a new track
+
+        Returns:
+            Slot index of the new track
+        """
+        if not self._free_slots:
+            self._grow()
+        slot = self._free_slots.pop()
+        now = self.to_seconds(timestamp)
+
+        self.active[slot] = True
+        self.track_id[slot] = track_id
+        self.bbox[slot] = bbox
+        self.class_id[slot] = class_id
+        self.class_name[slot] = class_name
+        self.is_person[slot] = class_name.lower() == 'person'
+        self.confidence[slot] = confidence
+
+        self.hits[slot] = 1
+        self.age[slot] = 0
+
+        self.first_seen[slot] = now
+        self.last_seen[slot] = now
+        self.stationary_since[slot] = np.nan
+        self.left_behind_since[slot] = np.nan
+
+        self.is_stationary[slot] = False
+        self.is_left_behind[slot] = False
+        self.alert_sent[slot] = False
+
+        self.steps[slot] = 0.0
+        self.pos_head[slot] = 0
+        self.pos_count[slot] = 0
+        self.window_sum[slot] = 0.0
+        self._push_positions(np.array([slot]), self.bbox[[slot]])
+
+        return slot
+
+    def remove(self, slots: np.ndarray):
+        """Remove tracks, detaching any views still held by callers"""
+        for slot in np.asarray(slots, dtype=np.int64).tolist():
+            view = self._views.pop(slot, None)
+            if view is not None:
+                view._detach()
+            self.active[slot] = False
+            self.class_name[slot] = None
+            self._left_behind.discard(slot)
+            self._free_slots.append(slot)
+
+    def clear(self):
+        """Remove all tracks"""
+        self.remove(self.active_slots())
+        self._stationary_heap = []
+        self._heap_limit = self.MIN_HEAP_LIMIT
+        self.epoch = None
+
+    def active_slots(self) -> np.ndarray:
+        """Slots of all live tracks, ordered by track ID"""
+        slots = np.flatnonzero(self.active)
+        return slots[np.argsort(self.track_id[slots], kind='stable')]
+
+    def view(self, slot: int):
+        """Get the (cached) TrackedObject view for a slot"""
+        view = self._views.get(slot)
+        if view is None:
+            from .object_tracker import TrackedObject
+            view = TrackedObject._from_store(self, slot)
+            self._views[slot] = view
+        return view
+
+    def copy_slot(self, slot: int) -> Tuple['TrackStore', int]:
+        """Copy one slot into a new single-track store"""
+        store = TrackStore(
+            capacity=1,
+            history_length=self.history_length,
+            movement_window=self.movement_window,
+            clock=self.clock
+        )
+        store.epoch = self.epoch
+        new_slot = store._free_slots.pop()
+        for name in self._column_names():
+            getattr(store, name)[new_slot] = getattr(self, name)[slot]
+        store.class_name[new_slot] = self.class_name[slot]
+        return store, new_slot
+
+    # ------------------------------------------------------------------
+    # Vectorized updates
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def centers(bboxes: np.ndarray) -> np.ndarray:
+        """Centre points of (N, 4) boxes"""
+        bboxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+        return np.stack(
+            [(bboxes[:, 0] + bboxes[:, 2]) / 2, (bboxes[:, 1] + bboxes[:, 3]) / 2],
+            axis=1
+        )
+
+    def _push_positions(self, slots: np.ndarray, bboxes: np.ndarray):
+        """
+        Append the centres of the given boxes to each slot's position ring
+
+        The running window sum gains the newest step and loses the step
+        that just fell out of the movement window.
+        """
+        size = self.history_length
+        heads = self.pos_head[slots]
+        centers = self.centers(bboxes)
+
+        # Distance from the previous position (0 for a track's first position)
+        previous = self.positions[slots, (heads - 1) % size]
+        step = np.sqrt(np.sum((centers - previous) ** 2, axis=1))
+        step = np.where(self.pos_count[slots] > 0, step, 0.0)
+
+        # Window of W positions spans W - 1 steps; expire the oldest of them
+        expired = self.steps[slots, (heads - (self.movement_window - 1)) % size]
+        if self.movement_window < 2:
+            step = np.zeros_like(step)
+            expired = np.zeros_like(expired)
+
+        self.positions[slots, heads] = centers
+        self.steps[slots, heads] = step
+        self.window_sum[slots] += step - expired
+        self.pos_head[slots] = (heads + 1) % size
+        self.pos_count[slots] = np.minimum(self.pos_count[slots] + 1, size)
+
+        # Re-sum exactly once per trip around the ring to shed rounding drift
+        wrapped = slots[self.pos_head[slots] == 0]
+        if len(wrapped):
+            self.window_sum[wrapped] = self._sum_recent_steps(wrapped, self.movement_window)
+
+    def _sum_recent_steps(self, slots: np.ndarray, window: int) -> np.ndarray:
+        """Sum the steps between the last ``window`` positions of each slot"""
+        if window < 2:
+            return np.zeros(len(slots))
+        # Unwritten step entries are zero, so no validity mask is needed
+        offsets = np.arange(1, window)
+        idx = (self.pos_head[slots][:, None] - offsets[None, :]) % self.history_length
+        return self.steps[slots[:, None], idx].sum(axis=1)
+
+    def update_detections(
+        self,
+        slots: np.ndarray,
+        bboxes: np.ndarray,
+        confidences: np.ndarray,
+        timestamp: datetime
+    ):
+        """Apply new detections (box, confidence, position history) to tracks"""
+        slots = np.asarray(slots, dtype=np.int64)
+        if len(slots) == 0:
+            return
+        self.bbox[slots] = bboxes
+        self.confidence[slots] = confidences
+        self.last_seen[slots] = self.to_seconds(timestamp)
+        self._push_positions(slots, bboxes)
+
+    def movement_distance(self, slots: np.ndarray, window: int = 10) -> np.ndarray:
+        """
+        Total distance moved over the last ``window`` positions of each track
+
+        Args:
+            slots: Slots to compute movement for
+            window: Number of recent positions to consider
+
+        Returns:
+            Array of distances, one per slot
+        """
+        slots = np.asarray(slots, dtype=np.int64)
+        window = max(1, min(window, self.history_length))
+        if len(slots) == 0:
+            return np.zeros(len(slots))
+
+        # The configured window is maintained incrementally
+        if window == self.movement_window:
+            return self.window_sum[slots].copy()
+
+        return self._sum_recent_steps(slots, window)
+
+    def update_stationary(
+        self,
+        slots: np.ndarray,
+        timestamp: datetime,
+        movement_threshold: float = 10.0,
+        window: int = 10
+    ):
+        """Update stationary state of the given tracks in one pass"""
+        slots = np.asarray(slots, dtype=np.int64)
+        if len(slots) == 0:
+            return
+        now = self.to_seconds(timestamp)
+        moving = self.movement_distance(slots, window) > movement_threshold
+        was_stationary = self.is_stationary[slots]
+
+        # Just became stationary
+        became_stationary = slots[~moving & ~was_stationary]
+        self.is_stationary[became_stationary] = True
+        self.stationary_since[became_stationary] = now
+        # NEVER mark persons as left-behind objects, so they get no deadline
+        for slot in became_stationary[~self.is_person[became_stationary]].tolist():
+            heapq.heappush(self._stationary_heap, (now, slot, int(self.track_id[slot])))
+        if len(self._stationary_heap) > self._heap_limit:
+            self._rebuild_heap()
+
+        # Object is moving (its heap entry goes stale and is dropped lazily)
+        moving_slots = slots[moving]
+        self.is_stationary[moving_slots] = False
+        self.stationary_since[moving_slots] = np.nan
+        for slot in moving_slots[self.is_left_behind[moving_slots]].tolist():
+            self._left_behind.discard(slot)
+        self.is_left_behind[moving_slots] = False
+        self.left_behind_since[moving_slots] = np.nan
+
+        if logger.isEnabledFor(logging.DEBUG):
+            for slot in became_stationary.tolist():
+                logger.debug(
+                    f"Object {self.track_id[slot]} ({self.class_name[slot]}) became stationary"
+                )
+            for slot in slots[moving & was_stationary].tolist():
+                logger.debug(
+                    f"Object {self.track_id[slot]} ({self.class_name[slot]}) started moving again"
+                )
+
+    def _rebuild_heap(self):
+        """Replace the deadline heap with one entry per live stationary track"""
+        slots = np.flatnonzero(
+            self.active & self.is_stationary & ~self.is_person & ~self.is_left_behind
+        )
+        heap = [
+            (float(since), slot, int(track_id))
+            for since, slot, track_id in zip(
+                self.stationary_since[slots].tolist(), slots.tolist(), self.track_id[slots].tolist()
+            )
+        ]
+        heapq.heapify(heap)
+        self._stationary_heap = heap
+        # Rebuild again once stale entries outnumber live ones two to one
+        self._heap_limit = max(self.MIN_HEAP_LIMIT, 3 * len(heap))
+
+    def check_left_behind(
+        self,
+        slots: np.ndarray,
+        current_time: datetime,
+        threshold_minutes: int = 60
+    ) -> np.ndarray:
+        """
+        Mark and return which of the given tracks are left behind
+
+        Returns:
+            Boolean mask aligned with ``slots``
+        """
+        slots = np.asarray(slots, dtype=np.int64)
+        if len(slots) == 0 or self.epoch is None:
+            return np.zeros(len(slots), dtype=bool)
+        now = self.to_seconds(current_time)
+
+        # NEVER mark persons as left-behind objects
+        eligible = self.is_stationary[slots] & ~self.is_person[slots]
+        with np.errstate(invalid='ignore'):
+            elapsed = now - self.stationary_since[slots]
+            left_behind = eligible & (elapsed >= threshold_minutes * 60)
+
+        self._mark_left_behind(slots[left_behind & ~self.is_left_behind[slots]], now,
+                               threshold_minutes)
+        return left_behind
+
+    def _mark_left_behind(self, slots: np.ndarray, now: float, threshold_minutes: int):
+        self.is_left_behind[slots] = True
+        self.left_behind_since[slots] = now
+        for slot in slots.tolist():
+            self._left_behind.add(slot)
+            logger.info(
+                f"Object {self.track_id[slot]} ({self.class_name[slot]}) "
+                f"detected as left behind after {threshold_minutes} minutes"
+            )
+
+    def expire_left_behind(
+        self,
+        current_time: datetime,
+        threshold_minutes: int = 60,
+        min_hits: int = 1
+    ) -> np.ndarray:
+        """
+        Mark tracks whose left-behind deadline has passed, using the deadline heap
+
+        Only heap entries with ``stationary_since + threshold <= now`` are
+        visited. Tracks that reached the deadline before being confirmed
+        (fewer than ``min_hits`` detections) stay in the heap and are
+        checked again on the next call.
+
+        Args:
+            current_time: Current timestamp
+            threshold_minutes: Minutes of being stationary to consider left behind
+            min_hits: Detections a track needs before it can be left behind
+
+        Returns:
+            Slots of all left-behind tracks, ordered by track ID
+        """
+        if self.epoch is not None:
+            cutoff = self.to_seconds(current_time) - threshold_minutes * 60
+            heap = self._stationary_heap
+            unconfirmed = []
+            newly = []
+            while heap and heap[0][0] <= cutoff:
+                entry = heapq.heappop(heap)
+                since, slot, track_id = entry
+                # Stale: the track was removed, started moving, or moved and stopped again
+                if (not self.active[slot] or self.track_id[slot] != track_id
+                        or not self.is_stationary[slot] or self.stationary_since[slot] != since):
+                    continue
+                if self.hits[slot] < min_hits:
+                    unconfirmed.append(entry)
+                elif not self.is_left_behind[slot]:
+                    newly.append(slot)
+            for entry in unconfirmed:
+                heapq.heappush(heap, entry)
+            if newly:
+                self._mark_left_behind(
+                    np.array(newly, dtype=np.int64), self.to_seconds(current_time),
+                    threshold_minutes
+                )
+
+        slots = np.fromiter(self._left_behind, dtype=np.int64, count=len(self._left_behind))
+        return slots[np.argsort(self.track_id[slots], kind='stable')]
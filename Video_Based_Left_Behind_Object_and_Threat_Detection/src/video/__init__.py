@@ -0,0 +1,12 @@
+"""Video input module"""
+
+from .frame_grabber import LatestFrameGrabber, is_live_source, open_capture
+from .frame_reader import FrameSampler, read_sampled
+from .motion_gate import MotionGate
+from .replay import EventTimeline, ReplayClock, replay_frames
+
+__all__ = [
+    'LatestFrameGrabber', 'is_live_source', 'open_capture',
+    'FrameSampler', 'read_sampled', 'MotionGate',
+    'EventTimeline', 'ReplayClock', 'replay_frames'
+]
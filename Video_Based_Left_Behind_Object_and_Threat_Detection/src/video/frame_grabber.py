@@ -0,0 +1,309 @@
+"""
+Latest-Frame Grabber
+Reads a video source on a background thread so inference always sees the freshest frame
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import deque
+from typing import Dict, Optional, Tuple, Callable, Any
+
+import cv2
+import numpy as np
+
+from .frame_reader import FrameSampler, read_sampled
+
+logger = logging.getLogger(__name__)
+
+
+def is_live_source(source: Any) -> bool:
+    """
+    Decide whether a source is a live stream or a finite video file
+
+    Args:
+        source: Camera index, stream URL or file path
+
+    Returns:
+        False for existing local files, True otherwise
+    """
+    return not (isinstance(source, str) and os.path.isfile(source))
+
+
+def open_capture(source: Any, timeout: float = 5.0):
+    """
+    Open a cv2.VideoCapture, with open/read timeouts for network streams
+
+    Args:
+        source: Camera index, stream URL or file path
+        timeout: Open and read timeout in seconds for network streams
+
+    Returns:
+        cv2.VideoCapture instance (check ``isOpened()``)
+    """
+    if isinstance(source, str) and '://' in source:
+        timeout_ms = int(timeout * 1000)
+        return cv2.VideoCapture(source, cv2.CAP_ANY, [
+            cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, timeout_ms,
+            cv2.CAP_PROP_READ_TIMEOUT_MSEC, timeout_ms
+        ])
+    return cv2.VideoCapture(source)
+
+
+class LatestFrameGrabber:
+    """
+    Background capture thread with a bounded, drop-oldest frame buffer
+
+    Live sources never block the reader: when the consumer is slower than the
+    stream, the oldest buffered frame is discarded and counted as dropped, so
+    ``read()`` returns the newest frame instead of one that queued up inside
+    FFmpeg. A stalled or closed live stream is reopened with exponential
+    backoff. Video files are read without dropping and end at end-of-file.
+
+    Frame sampling (``frame_skip`` / ``target_fps``) happens on the capture
+    thread, so frames that will not be analysed are never decoded.
+    """
+
+    def __init__(
+        self,
+        source: Any,
+        camera_id: str = "",
+        buffer_size: int = 1,
+        read_timeout: float = 5.0,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+        live: Optional[bool] = None,
+        capture_factory: Optional[Callable[[Any], Any]] = None,
+        frame_skip: int = 1,
+        target_fps: Optional[float] = None,
+        decode_skipped: bool = False
+    ):
+        """
+        Initialize frame grabber
+
+        Args:
+            source: Camera index, stream URL or file path
+            camera_id: Camera identifier used in logs
+            buffer_size: Maximum number of buffered frames
+            read_timeout: Seconds without a frame before a live stream is
+                considered stalled and reopened
+            reconnect_delay: Initial delay between reconnect attempts
+            max_reconnect_delay: Upper bound for the reconnect backoff
+            live: Override live-stream detection (defaults to is_live_source)
+            capture_factory: Callable opening the source (defaults to open_capture)
+            frame_skip: Analyse every Nth frame
+            target_fps: Analyse frames at this rate by timestamp instead
+            decode_skipped: Decode skipped frames too (disables grab/retrieve)
+        """
+        self.source = source
+        self.camera_id = camera_id
+        self.read_timeout = read_timeout
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.live = is_live_source(source) if live is None else live
+        self.capture_factory = capture_factory or (
+            lambda src: open_capture(src, read_timeout)
+        )
+        self.sampler = FrameSampler(frame_skip, target_fps)
+        self.decode_skipped = decode_skipped
+
+        # Buffered (frame, capture_time, stream_timestamp) entries, newest last
+        self._buffer: deque = deque(maxlen=max(1, buffer_size))
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._cap = None
+
+        # Counters
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.frames_delivered = 0
+        self.reconnects = 0
+        self.connected = False
+        self.finished = False
+        self.last_capture_time: Optional[float] = None
+        self.capture_lag = 0.0
+        self.last_timestamp: Optional[float] = None
+        self.last_decode_time: Optional[float] = None  # Seconds to read the delivered frame
+        self.fill_at_read = 0.0  # Buffer fill just before the last read() took frames out
+
+    def start(self) -> bool:
+        """
+        Open the source and start the capture thread
+
+        Returns:
+            True if the source opened (live sources keep retrying regardless)
+        """
+        self._cap = self.capture_factory(self.source)
+        self.connected = self._cap is not None and self._cap.isOpened()
+        if not self.connected:
+            logger.error(f"Failed to open video source for {self.camera_id}: {self.source}")
+            if not self.live:
+                self.finished = True
+                return False
+            self._release()  # The capture thread keeps retrying
+
+        self._thread = threading.Thread(
+            target=self._run, name=f"grabber-{self.camera_id}", daemon=True
+        )
+        self._thread.start()
+        return self.connected
+
+    def stop(self, timeout: float = 2.0):
+        """Stop the capture thread and release the source"""
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._release()
+
+    def _release(self):
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+        self.connected = False
+
+    def _reconnect(self) -> bool:
+        """Reopen a live source with exponential backoff until it works or we stop"""
+        self._release()
+        delay = self.reconnect_delay
+        while not self._stop.is_set():
+            logger.warning(f"Reconnecting camera {self.camera_id} in {delay:.1f}s")
+            if self._stop.wait(delay):
+                break
+            self.reconnects += 1
+            cap = self.capture_factory(self.source)
+            if cap is not None and cap.isOpened():
+                self._cap = cap
+                self.connected = True
+                logger.info(f"Camera {self.camera_id} reconnected")
+                return True
+            if cap is not None:
+                cap.release()
+            delay = min(delay * 2, self.max_reconnect_delay)
+        return False
+
+    def _run(self):
+        last_frame_at = time.monotonic()
+        while not self._stop.is_set():
+            if self._cap is None and not self._reconnect():
+                break
+
+            read_start = time.perf_counter()
+            ret, frame, timestamp = read_sampled(
+                self._cap,
+                self.sampler,
+                use_stream_timestamps=not self.live,
+                decode_skipped=self.decode_skipped
+            )
+            decode_time = time.perf_counter() - read_start
+            now = time.monotonic()
+
+            if not ret:
+                if not self.live:
+                    break  # End of file
+                if now - last_frame_at >= self.read_timeout:
+                    logger.warning(
+                        f"Camera {self.camera_id} stalled for {now - last_frame_at:.1f}s"
+                    )
+                    self._release()
+                    last_frame_at = time.monotonic()
+                else:
+                    self._stop.wait(0.01)
+                continue
+
+            last_frame_at = now
+            self._push(frame, now, timestamp, decode_time)
+
+        with self._cond:
+            self.finished = True
+            self._cond.notify_all()
+
+    def _push(self, frame: np.ndarray, capture_time: float, timestamp: float, decode_time: float = 0.0):
+        """Add a frame, dropping the oldest for live sources when full"""
+        with self._cond:
+            if not self.live:
+                # Files: apply backpressure instead of discarding frames
+                while len(self._buffer) == self._buffer.maxlen and not self._stop.is_set():
+                    self._cond.wait(0.1)
+            elif len(self._buffer) == self._buffer.maxlen:
+                self.frames_dropped += 1
+
+            self._buffer.append((frame, capture_time, timestamp, decode_time))
+            self.frames_captured += 1
+            self.last_capture_time = capture_time
+            self._cond.notify_all()
+
+    def read(self, timeout: Optional[float] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Return the newest unread frame
+
+        Args:
+            timeout: Seconds to wait for a frame (None waits indefinitely,
+                0 returns immediately)
+
+        Returns:
+            (True, frame), or (False, None) if no frame arrived in time or
+            the source has ended
+        """
+        with self._cond:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while not self._buffer:
+                if self.finished or self._stop.is_set():
+                    return False, None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False, None
+                self._cond.wait(remaining)
+
+            self.fill_at_read = len(self._buffer) / self._buffer.maxlen
+            if self.live:
+                # Skip straight to the freshest frame
+                frame, capture_time, timestamp, decode_time = self._buffer[-1]
+                self.frames_dropped += len(self._buffer) - 1
+                self._buffer.clear()
+            else:
+                frame, capture_time, timestamp, decode_time = self._buffer.popleft()
+
+            self.frames_delivered += 1
+            self.last_timestamp = timestamp
+            self.last_decode_time = decode_time
+            self.capture_lag = time.monotonic() - capture_time
+            self._cond.notify_all()
+            return True, frame
+
+    def set_target_fps(self, target_fps: Optional[float]):
+        """Change the analysis rate of a running grabber (applies from the next frame)"""
+        self.sampler.set_target_fps(target_fps)
+
+    @property
+    def target_fps(self) -> Optional[float]:
+        return self.sampler.target_fps
+
+    @property
+    def buffer_fill(self) -> float:
+        """Fraction of the frame buffer in use"""
+        with self._cond:
+            return len(self._buffer) / self._buffer.maxlen
+
+    @property
+    def is_finished(self) -> bool:
+        """True once the source has ended and all buffered frames were read"""
+        with self._cond:
+            return self.finished and not self._buffer
+
+    def stats(self) -> Dict:
+        """Capture counters for status reporting"""
+        with self._cond:
+            return {
+                'connected': self.connected,
+                'frames_captured': self.frames_captured,
+                'frames_not_decoded': 0 if self.decode_skipped else self.sampler.frames_skipped,
+                'frames_delivered': self.frames_delivered,
+                'frames_dropped': self.frames_dropped,
+                'reconnects': self.reconnects,
+                'capture_lag_ms': self.capture_lag * 1000,
+                'decode_ms': (self.last_decode_time or 0.0) * 1000
+            }
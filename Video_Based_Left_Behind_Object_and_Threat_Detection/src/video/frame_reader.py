@@ -0,0 +1,132 @@
+"""
+Decode-Skipping Frame Reader
+Grabs every frame but only decodes the ones selected for analysis
+"""
+
+import time
+import logging
+import threading
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class FrameSampler:
+    """
+    Chooses which frames of a stream are analysed
+
+    Either every ``frame_skip``-th frame is kept, or, when ``target_fps`` is
+    set, frames are kept by timestamp so the analysis rate stays close to
+    ``target_fps`` regardless of the camera's frame rate.
+    """
+
+    def __init__(self, frame_skip: int = 1, target_fps: Optional[float] = None):
+        """
+        Initialize frame sampler
+
+        Args:
+            frame_skip: Keep every Nth frame (ignored when target_fps is set)
+            target_fps: Analysis frames per second to sample by timestamp
+        """
+        self.frame_skip = max(1, int(frame_skip))
+        self.target_fps = target_fps
+        self.interval = 1.0 / target_fps if target_fps else None
+
+        self.frames_seen = 0
+        self.frames_sampled = 0
+        self._next_due: Optional[float] = None
+        # The rate may be changed from another thread while frames are sampled
+        self._lock = threading.Lock()
+
+    def should_sample(self, timestamp: float) -> bool:
+        """
+        Count a frame and decide whether it should be decoded and analysed
+
+        Args:
+            timestamp: Frame time in seconds (stream PTS or wall clock)
+
+        Returns:
+            True if the frame is selected
+        """
+        with self._lock:
+            self.frames_seen += 1
+
+            if self.interval is None:
+                keep = self.frames_seen % self.frame_skip == 0
+            elif self._next_due is None or timestamp >= self._next_due - 1e-6:
+                # Step the schedule forward; resync if we fell more than a frame behind
+                if self._next_due is None or timestamp - self._next_due >= self.interval:
+                    self._next_due = timestamp + self.interval
+                else:
+                    self._next_due += self.interval
+                keep = True
+            else:
+                keep = False
+
+            if keep:
+                self.frames_sampled += 1
+            return keep
+
+    def set_target_fps(self, target_fps: Optional[float]):
+        """Change the sampling rate; the next frame due is rescheduled from the last one kept"""
+        with self._lock:
+            interval = 1.0 / target_fps if target_fps else None
+            if self._next_due is not None and self.interval is not None and interval is not None:
+                self._next_due += interval - self.interval
+            else:
+                self._next_due = None
+            self.target_fps = target_fps
+            self.interval = interval
+
+    @property
+    def frames_skipped(self) -> int:
+        return self.frames_seen - self.frames_sampled
+
+
+def read_sampled(
+    cap,
+    sampler: FrameSampler,
+    use_stream_timestamps: bool = False,
+    decode_skipped: bool = False
+) -> Tuple[bool, Optional[np.ndarray], Optional[float]]:
+    """
+    Read the next frame selected by the sampler
+
+    Skipped frames are only ``grab()``-ed (demuxed, not decoded); the selected
+    frame is decoded with ``retrieve()``.
+
+    Args:
+        cap: cv2.VideoCapture (or compatible object)
+        sampler: Frame sampler deciding which frames to keep
+        use_stream_timestamps: Use the stream position (CAP_PROP_POS_MSEC)
+            as timestamp instead of the wall clock, e.g. for video files
+        decode_skipped: Decode every frame with ``read()`` (the previous
+            behaviour, for backends where grab/retrieve is unreliable)
+
+    Returns:
+        (ret, frame, timestamp); ret is False once the source fails or ends
+    """
+    while True:
+        if decode_skipped:
+            ret, frame = cap.read()
+        else:
+            ret, frame = cap.grab(), None
+        if not ret:
+            return False, None, None
+
+        if use_stream_timestamps:
+            timestamp = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        else:
+            timestamp = time.monotonic()
+
+        if not sampler.should_sample(timestamp):
+            continue
+
+        if not decode_skipped:
+            ret, frame = cap.retrieve()
+            if not ret:
+                return False, None, None
+        return True, frame, timestamp
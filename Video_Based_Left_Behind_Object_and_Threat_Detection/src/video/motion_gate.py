@@ -0,0 +1,156 @@
+"""
+Motion Gate
+Cheap change detection on downscaled grayscale frames to skip redundant object detection
+"""
+
+import logging
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+GATE_METHODS = ('diff', 'mog2')
+
+
+class MotionGate:
+    """
+    Decides whether a frame differs enough from the scene to need detection
+
+    Frames are shrunk to ``width`` pixels wide, converted to grayscale and
+    blurred. With ``method='diff'`` a frame is compared to the frame of the
+    last full detection, so slow changes (an object put down over several
+    frames) still accumulate until they trigger. With ``method='mog2'`` an
+    OpenCV MOG2 background model flags foreground pixels instead, which is
+    more tolerant of flicker and sensor noise.
+
+    A detection is forced every ``force_every`` frames regardless, so
+    tracks and left-behind timers are refreshed from real detections even
+    in a completely static scene.
+    """
+
+    def __init__(
+        self,
+        method: str = 'diff',
+        width: int = 160,
+        pixel_threshold: int = 25,
+        min_changed_ratio: float = 0.002,
+        force_every: int = 30,
+        blur_size: int = 5
+    ):
+        """
+        Initialize motion gate
+
+        Args:
+            method: 'diff' (difference to the last detected frame) or 'mog2'
+            width: Width of the downscaled analysis frame
+            pixel_threshold: Gray-level difference that marks a pixel as changed ('diff')
+            min_changed_ratio: Fraction of changed pixels that triggers detection
+            force_every: Run detection at least every N frames (0 disables)
+            blur_size: Gaussian blur kernel size applied before comparing (odd, 0 disables)
+        """
+        if method not in GATE_METHODS:
+            raise ValueError(f"Unknown motion gate method: {method}")
+
+        self.method = method
+        self.width = width
+        self.pixel_threshold = pixel_threshold
+        self.min_changed_ratio = min_changed_ratio
+        self.force_every = force_every
+        self.blur_size = blur_size
+
+        self._reference: Optional[np.ndarray] = None
+        self._subtractor = (
+            cv2.createBackgroundSubtractorMOG2(detectShadows=False)
+            if method == 'mog2' else None
+        )
+        self.frames_since_detection = 0
+        self.last_changed_ratio = 0.0
+
+        self.frames_seen = 0
+        self.frames_skipped = 0
+        self.frames_forced = 0
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'MotionGate':
+        """Build a gate from the performance.motion_gate config section"""
+        return cls(
+            method=config.get('method', 'diff'),
+            width=config.get('width', 160),
+            pixel_threshold=config.get('pixel_threshold', 25),
+            min_changed_ratio=config.get('min_changed_ratio', 0.002),
+            force_every=config.get('force_every', 30),
+            blur_size=config.get('blur_size', 5)
+        )
+
+    def _small_gray(self, frame: np.ndarray) -> np.ndarray:
+        """Downscaled, blurred grayscale version of a frame"""
+        height, width = frame.shape[:2]
+        scale = min(1.0, self.width / width)
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+        if self.blur_size > 1:
+            gray = cv2.GaussianBlur(gray, (self.blur_size, self.blur_size), 0)
+        return gray
+
+    def _changed_ratio(self, gray: np.ndarray) -> float:
+        """Fraction of pixels that changed"""
+        if self.method == 'mog2':
+            mask = self._subtractor.apply(gray)
+            return float(np.count_nonzero(mask)) / mask.size
+
+        if self._reference is None or self._reference.shape != gray.shape:
+            return 1.0
+        diff = cv2.absdiff(gray, self._reference)
+        return float(np.count_nonzero(diff > self.pixel_threshold)) / diff.size
+
+    def check(self, frame: np.ndarray) -> bool:
+        """
+        Decide whether object detection should run on a frame
+
+        Args:
+            frame: Input frame (BGR)
+
+        Returns:
+            True to run detection, False to reuse the previous detections
+        """
+        self.frames_seen += 1
+        gray = self._small_gray(frame)
+        self.last_changed_ratio = self._changed_ratio(gray)
+
+        changed = self._reference is None or self.last_changed_ratio >= self.min_changed_ratio
+        forced = (
+            not changed
+            and self.force_every > 0
+            and self.frames_since_detection + 1 >= self.force_every
+        )
+
+        if changed or forced:
+            self._reference = gray
+            self.frames_since_detection = 0
+            if forced:
+                self.frames_forced += 1
+            return True
+
+        self.frames_since_detection += 1
+        self.frames_skipped += 1
+        return False
+
+    def reset(self):
+        """Forget the reference frame (the next frame always runs detection)"""
+        self._reference = None
+        self.frames_since_detection = 0
+        if self._subtractor is not None:
+            self._subtractor = cv2.createBackgroundSubtractorMOG2(detectShadows=False)
+
+    def stats(self) -> Dict:
+        """Skip counters for status reporting"""
+        return {
+            'frames': self.frames_seen,
+            'skipped': self.frames_skipped,
+            'forced': self.frames_forced,
+            'skip_ratio': self.frames_skipped / max(1, self.frames_seen),
+            'changed_ratio': self.last_changed_ratio
+        }
@@ -0,0 +1 @@
+# Video Threat Detection Tests
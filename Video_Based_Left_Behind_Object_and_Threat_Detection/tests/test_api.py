@@ -0,0 +1,251 @@
+"""
+Unit Tests for the Video API
+"""
+import sys
+import os
+import io
+import base64
+import tempfile
+import unittest
+from unittest import mock
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as video_app
+from src.runtime.sessions import CameraSession, SessionRegistry
+from src.tracking.object_tracker import ObjectTracker
+
+
+class FakeDetector:
+    """Object detector stand-in returning one backpack per frame"""
+
+    def __init__(self):
+        self.shapes = []
+
+    def detect(self, frame):
+        self.shapes.append(frame.shape)
+        return [{'bbox': [10, 10, 50, 50], 'confidence': 0.9,
+                 'class_id': 24, 'class_name': 'backpack'}]
+
+    def filter_by_size(self, detections, min_area=0):
+        return detections
+
+
+def encode_frame(height=48, width=64):
+    """JPEG bytes of a random frame"""
+    frame = np.random.default_rng(0).integers(0, 256, (height, width, 3), dtype=np.uint8)
+    return cv2.imencode('.jpg', frame)[1].tobytes()
+
+
+class APITestCase(unittest.TestCase):
+    """Flask app with stand-in models"""
+
+    def setUp(self):
+        self.detector = FakeDetector()
+        self.sessions = SessionRegistry(
+            lambda camera_id: CameraSession(camera_id, ObjectTracker(min_hits=1), zones=None)
+        )
+        patches = {
+            'initialize_models': lambda: True,
+            'config': {'object_detection': {'min_object_size': 0}},
+            'object_detector': self.detector,
+            'sessions': self.sessions,
+            'threat_detector': None
+        }
+        for name, value in patches.items():
+            patcher = mock.patch.object(video_app, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = video_app.create_app().test_client()
+
+
+class TestJpegIngestion(APITestCase):
+    """Test raw JPEG endpoints against the base64 JSON ones"""
+
+    def test_jpeg_body_with_header_metadata(self):
+        """Test an image/jpeg body is decoded and camera headers are echoed"""
+        response = self.client.post(
+            '/api/video/jpeg/detect-objects', data=encode_frame(),
+            content_type='image/jpeg',
+            headers={'X-Camera-Id': 'CAM_001', 'X-Frame-Index': '7'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.get_json()
+        self.assertEqual(payload['metadata'], {'camera_id': 'CAM_001', 'frame_index': '7'})
+        self.assertEqual(payload['total_objects'], 1)
+        self.assertEqual(self.detector.shapes, [(48, 64, 3)])
+
+    def test_multipart_upload_with_query_metadata(self):
+        """Test a multipart upload with camera metadata in the query string"""
+        response = self.client.post(
+            '/api/video/jpeg/process-frame?camera_id=CAM_002',
+            data={'frame': (io.BytesIO(encode_frame()), 'frame.jpg')},
+            content_type='multipart/form-data'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.get_json()
+        self.assertEqual(payload['metadata'], {'camera_id': 'CAM_002'})
+        self.assertEqual(payload['threats']['status'], 'disabled')
+
+    def test_jpeg_and_base64_give_the_same_result(self):
+        """Test both transports produce identical detections"""
+        jpeg = encode_frame()
+
+        raw = self.client.post('/api/video/jpeg/detect-objects', data=jpeg,
+                               content_type='image/jpeg').get_json()
+        encoded = self.client.post('/api/video/detect-objects',
+                                   json={'frame': base64.b64encode(jpeg).decode()}).get_json()
+
+        self.assertEqual(raw['detections'][0]['bbox'], encoded['detections'][0]['bbox'])
+        self.assertEqual(self.detector.shapes[0], self.detector.shapes[1])
+
+    def test_bad_uploads_are_rejected(self):
+        """Test empty, corrupt and unsupported uploads get a 400"""
+        cases = [
+            (b'', 'image/jpeg'),
+            (b'not a jpeg', 'image/jpeg'),
+            (encode_frame(), 'text/plain')
+        ]
+        for body, content_type in cases:
+            response = self.client.post('/api/video/jpeg/detect-objects', data=body,
+                                        content_type=content_type)
+            with self.subTest(content_type=content_type, size=len(body)):
+                self.assertEqual(response.status_code, 400)
+                self.assertFalse(response.get_json()['success'])
+
+        self.assertEqual(self.detector.shapes, [])
+
+
+class TestMetricsEndpoint(APITestCase):
+    """Test the Prometheus scrape endpoint"""
+
+    def test_stage_timings_after_a_frame(self):
+        """Test /metrics reports decode, inference and tracking for a processed frame"""
+        self.client.post('/api/video/jpeg/process-frame?camera_id=CAM_METRICS',
+                         data=encode_frame(), content_type='image/jpeg')
+
+        response = self.client.get('/metrics')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain'))
+        body = response.get_data(as_text=True)
+        for stage in ('decode', 'inference', 'tracking'):
+            self.assertIn(f'video_stage_seconds_count{{stage="{stage}",camera_id="CAM_METRICS"}} 1', body)
+        self.assertIn('video_frames_processed_total{camera_id="CAM_METRICS"} 1', body)
+        self.assertIn('video_live_tracks{camera_id="CAM_METRICS"} 1', body)
+
+
+class TestCameraSessions(APITestCase):
+    """Test per-camera state in the API"""
+
+    def post(self, camera_id=None):
+        body = {'frame': base64.b64encode(encode_frame()).decode()}
+        if camera_id:
+            body['camera_id'] = camera_id
+        return self.client.post('/api/video/process-frame', json=body).get_json()
+
+    def test_cameras_get_separate_trackers(self):
+        """Test frames from two cameras never share tracks"""
+        first = self.post('CAM_001')
+        second = self.post('CAM_002')
+        again = self.post('CAM_001')
+
+        self.assertEqual(first['camera_id'], 'CAM_001')
+        self.assertEqual(second['camera_id'], 'CAM_002')
+        self.assertEqual(first['objects']['detections'][0]['track_id'], 1)
+        self.assertEqual(second['objects']['detections'][0]['track_id'], 1)
+        self.assertEqual(again['objects']['total_objects'], 1)
+        self.assertEqual(len(self.sessions), 2)
+
+    def test_jpeg_header_and_default_camera(self):
+        """Test the X-Camera-Id header selects the session, with a shared default"""
+        self.client.post('/api/video/jpeg/detect-objects', data=encode_frame(),
+                         content_type='image/jpeg', headers={'X-Camera-Id': 'CAM_009'})
+        payload = self.post()
+
+        self.assertEqual(payload['camera_id'], video_app.DEFAULT_CAMERA_ID)
+        self.assertIn('CAM_009', self.sessions)
+        status = self.client.get('/api/video/status').get_json()
+        self.assertEqual(status['sessions']['active'], 2)
+        self.assertEqual(status['sessions']['cameras']['CAM_009']['frames'], 1)
+        self.assertEqual(status['sessions']['cameras']['CAM_009']['tracked_objects'], 1)
+
+
+
+class TestStreamPull(APITestCase):
+    """Test the API pulling a camera stream and publishing over SSE"""
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        video = os.path.join(directory.name, 'camera.avi')
+        writer = cv2.VideoWriter(video, cv2.VideoWriter_fourcc(*'MJPG'), 10, (64, 48))
+        for i in range(5):
+            writer.write(np.full((48, 64, 3), i * 10, dtype=np.uint8))
+        writer.release()
+
+        video_app.config.update({
+            'performance': {'stream_pull': {'keepalive': 0.05}},
+            'cameras': [
+                {'id': 'CAM_001', 'stream_url': video, 'enabled': True},
+                {'id': 'CAM_002', 'stream_url': video, 'enabled': False}
+            ]
+        })
+        workers = mock.patch.object(video_app, 'stream_workers', {})
+        workers.start()
+        self.addCleanup(workers.stop)
+        self.addCleanup(video_app.stop_stream_workers)
+
+    def test_pulled_frames_are_published_per_camera(self):
+        """Test results of a pulled stream arrive on the camera's SSE endpoint"""
+        response = self.client.get('/api/video/streams/CAM_001/events', buffered=False)
+        self.assertEqual(response.status_code, 404)
+
+        # Subscribe before the worker starts so no frame is missed
+        subscriber = video_app.event_broker.subscribe('CAM_001')
+        self.addCleanup(video_app.event_broker.unsubscribe, 'CAM_001', subscriber)
+        self.assertEqual(video_app.start_stream_workers(), 1)
+        response = self.client.get('/api/video/streams/CAM_001/events', buffered=False)
+        self.assertEqual(response.mimetype, 'text/event-stream')
+
+        events = []
+        while len(events) < 6:
+            event = subscriber.get(timeout=5)
+            events.append((event['event'], event['data']))
+        results = [data for name, data in events if name == 'result']
+        self.assertEqual(len(results), 5)
+        self.assertEqual(results[0]['camera_id'], 'CAM_001')
+        self.assertEqual(results[0]['objects']['detections'][0]['track_id'], 1)
+        self.assertEqual(events[-1], ('status', {'camera_id': 'CAM_001', 'status': 'ended'}))
+        self.assertEqual(len(self.detector.shapes), 5)
+
+        streams = self.client.get('/api/video/streams').get_json()
+        self.assertEqual(list(streams['workers']), ['CAM_001'])
+        self.assertEqual(streams['workers']['CAM_001']['frames_processed'], 5)
+        self.assertEqual(self.sessions.get('CAM_001').frames, 5)
+        response.close()
+
+    def test_sse_endpoint_streams_published_events(self):
+        """Test the SSE endpoint relays events published for its camera"""
+        video_app.stream_workers['CAM_001'] = mock.Mock()
+
+        response = self.client.get('/api/video/streams/CAM_001/events', buffered=False)
+        chunks = iter(response.response)
+        self.assertEqual(next(chunks), b': connected\n\n')
+        video_app.event_broker.publish('CAM_001', 'left_behind', {'track_id': 3})
+        video_app.event_broker.publish('CAM_002', 'left_behind', {'track_id': 9})
+        self.assertEqual(next(chunks).decode().split('\n')[1:3],
+                         ['event: left_behind', 'data: {"track_id": 3}'])
+        self.assertEqual(next(chunks), b': keepalive\n\n')
+        response.close()
+        self.assertEqual(video_app.event_broker.subscriber_count('CAM_001'), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
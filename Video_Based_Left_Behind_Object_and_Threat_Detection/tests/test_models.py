@@ -0,0 +1,504 @@
+"""
+Unit Tests for Detection Models
+"""
+import sys
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.clip_buffer import ClipBuffer
+from src.models.threat_detector import ThreatDetector
+from src.models.threat_scheduler import ThreatScheduler, union_crop
+from src.models.detection_zones import DetectionZones
+from src.models.threat_quantization import (
+    _fusion_groups, load_quantized, quantize_model, save_quantized
+)
+from src.models.onnx_backend import letterbox, nms, postprocess, ort
+from src.tracking.matching import iou_matrix
+
+
+def make_frames(count, height=48, width=64, seed=0):
+    """Random BGR frames"""
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(count)]
+
+
+class TestClipBuffer(unittest.TestCase):
+    """Test the preallocated clip ring buffer"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.detector = ThreatDetector(model_type="i3d", clip_length=8, device="cpu")
+
+    def reference_clip(self, frames):
+        """Clip built the old way: preprocess, stack and transpose"""
+        stacked = np.stack([self.detector.preprocess_frame(f, (32, 32)) for f in frames])
+        return np.transpose(stacked, (3, 0, 1, 2))
+
+    def test_clip_matches_reference_after_wraparound(self):
+        """Test the clip is in temporal order and matches per-frame preprocessing"""
+        frames = make_frames(19)
+        buffer = ClipBuffer(clip_length=8, size=(32, 32))
+
+        for count, frame in enumerate(frames, start=1):
+            buffer.append(frame)
+            if count >= 8:
+                np.testing.assert_allclose(
+                    buffer.clip(), self.reference_clip(frames[count - 8:count]),
+                    rtol=1e-5, atol=1e-5
+                )
+
+        self.assertEqual(len(buffer), 8)
+
+    def test_clip_is_a_view(self):
+        """Test reading the clip allocates no new frame memory"""
+        buffer = ClipBuffer(clip_length=4, size=(16, 16))
+        for frame in make_frames(6):
+            buffer.append(frame)
+
+        clip = buffer.clip()
+
+        self.assertEqual(clip.shape, (3, 4, 16, 16))
+        self.assertEqual(clip.dtype, np.float32)
+        self.assertTrue(np.shares_memory(clip, buffer.data))
+
+    def test_clear_restarts_buffering(self):
+        """Test a cleared buffer reports empty and refills from the start"""
+        buffer = ClipBuffer(clip_length=4, size=(16, 16))
+        for frame in make_frames(5):
+            buffer.append(frame)
+
+        buffer.clear()
+
+        self.assertEqual(len(buffer), 0)
+
+
+class TestThreatDetector(unittest.TestCase):
+    """Test threat detection on the fallback 3D CNN"""
+
+    def setUp(self):
+        self.detector = ThreatDetector(model_type="i3d", clip_length=8, device="cpu")
+
+    def test_buffering_until_clip_is_full(self):
+        """Test detection waits for a full clip"""
+        frames = make_frames(8)
+        for frame in frames[:7]:
+            result = self.detector.detect(frame)
+            self.assertEqual(result['status'], 'buffering')
+
+        result = self.detector.detect(frames[7])
+
+        self.assertIn(result['status'], ('normal', 'detected'))
+        self.assertAlmostEqual(sum(result['all_scores'].values()), 1.0, places=4)
+
+    def test_spawned_streams_have_separate_buffers(self):
+        """Test per-camera streams share the model but not frames"""
+        stream = self.detector.spawn_stream()
+        self.detector.add_frame(make_frames(1)[0])
+
+        self.assertIs(stream.model, self.detector.model)
+        self.assertEqual(len(stream.frame_buffer), 0)
+        self.assertEqual(len(self.detector.frame_buffer), 1)
+
+
+class FakeThreatStream:
+    """ThreatDetector stand-in with a fixed clip length and scripted scores"""
+
+    def __init__(self, clip_length=4, scores=None):
+        self.clip_length = clip_length
+        self.confidence_threshold = 0.7
+        self.scores = list(scores or [])
+        self.buffered = 0
+        self.calls = 0
+
+    def add_frame(self, frame):
+        self.buffered += 1
+        self.last_frame = frame
+
+    def reset_buffer(self):
+        self.buffered = 0
+
+    def detect(self, frame=None):
+        if self.buffered < self.clip_length:
+            return {'is_threat': False, 'threat_type': None, 'confidence': 0.0,
+                    'all_scores': {}, 'status': 'buffering'}
+        score = self.scores.pop(0) if self.scores else 0.0
+        self.calls += 1
+        return {'is_threat': score >= 0.7, 'threat_type': 'fighting' if score >= 0.7 else None,
+                'confidence': score, 'all_scores': {}, 'status': 'normal'}
+
+
+class TestThreatScheduler(unittest.TestCase):
+    """Test strided clip inference"""
+
+    def test_fixed_stride_runs_every_n_frames(self):
+        """Test the model runs once per stride after the clip fills"""
+        stream = FakeThreatStream(clip_length=4)
+        scheduler = ThreatScheduler(stream, stride=4)
+
+        fresh = [scheduler.detect(np.zeros(1))['fresh'] for _ in range(15)]
+
+        self.assertEqual([i + 1 for i, f in enumerate(fresh) if f], [4, 8, 12])
+        self.assertEqual(stream.calls, 3)
+        self.assertAlmostEqual(scheduler.stats()['inference_rate'], 3 / 15)
+
+    def test_result_is_carried_between_inferences(self):
+        """Test frames between inferences get the last result"""
+        stream = FakeThreatStream(clip_length=1, scores=[0.9])
+        scheduler = ThreatScheduler(stream, stride=3)
+
+        first = scheduler.detect(np.zeros(1))
+        carried = scheduler.detect(np.zeros(1))
+
+        self.assertTrue(first['fresh'])
+        self.assertFalse(carried['fresh'])
+        self.assertTrue(carried['is_threat'])
+        self.assertEqual(carried['frames_since_inference'], 1)
+
+    def test_adaptive_stride_follows_score(self):
+        """Test suspicious scores shorten the stride and calm scenes lengthen it"""
+        stream = FakeThreatStream(clip_length=1, scores=[0.0, 0.35, 0.1])
+        scheduler = ThreatScheduler(stream, stride=4, adaptive=True, min_stride=2, max_stride=16)
+
+        scheduler.detect(np.zeros(1))
+        self.assertEqual(scheduler.stride, 16)
+
+        for _ in range(16):
+            scheduler.detect(np.zeros(1))
+        self.assertEqual(scheduler.stride, 2)
+
+        for _ in range(2):
+            scheduler.detect(np.zeros(1))
+        self.assertEqual(scheduler.stride, 12)
+
+
+class TestPersonGate(unittest.TestCase):
+    """Test the person-gated threat cascade"""
+
+    PERSON = [[10, 10, 30, 50]]
+
+    def test_empty_scene_is_not_buffered_or_analysed(self):
+        """Test frames without people cost no buffering or inference"""
+        stream = FakeThreatStream(clip_length=2)
+        scheduler = ThreatScheduler(stream, stride=1, min_persons=1)
+
+        results = [scheduler.detect(np.zeros((60, 60, 3)), person_boxes=[]) for _ in range(5)]
+
+        self.assertTrue(all(r['status'] == 'idle' for r in results))
+        self.assertEqual(stream.buffered, 0)
+        self.assertEqual(stream.calls, 0)
+        self.assertEqual(scheduler.stats()['frames_gated'], 5)
+
+    def test_clip_restarts_after_people_leave(self):
+        """Test an idle period clears the partially filled clip"""
+        stream = FakeThreatStream(clip_length=3)
+        scheduler = ThreatScheduler(stream, stride=1, min_persons=1)
+        frame = np.zeros((60, 60, 3))
+
+        scheduler.detect(frame, person_boxes=self.PERSON)
+        scheduler.detect(frame, person_boxes=self.PERSON)
+        scheduler.detect(frame, person_boxes=[])
+        result = scheduler.detect(frame, person_boxes=self.PERSON)
+
+        self.assertEqual(result['status'], 'buffering')
+        self.assertEqual(stream.buffered, 1)
+
+    def test_min_persons_threshold(self):
+        """Test analysis starts only once enough people are present"""
+        stream = FakeThreatStream(clip_length=1)
+        scheduler = ThreatScheduler(stream, stride=1, min_persons=2)
+        frame = np.zeros((60, 60, 3))
+
+        self.assertEqual(scheduler.detect(frame, person_boxes=self.PERSON)['status'], 'idle')
+        self.assertEqual(
+            scheduler.detect(frame, person_boxes=self.PERSON * 2)['status'], 'normal'
+        )
+
+    def test_crop_to_union_of_people(self):
+        """Test clips are cropped to the people when enabled"""
+        stream = FakeThreatStream(clip_length=1)
+        scheduler = ThreatScheduler(stream, min_persons=1, crop_to_persons=True, crop_margin=0)
+
+        scheduler.detect(np.zeros((100, 200, 3)), person_boxes=[[10, 20, 30, 40], [50, 5, 70, 25]])
+
+        self.assertEqual(stream.last_frame.shape, (35, 60, 3))
+
+    def test_union_crop_clamps_to_frame(self):
+        """Test the margin never extends the crop outside the frame"""
+        frame = np.zeros((100, 100, 3))
+
+        crop = union_crop(frame, [[0, 0, 90, 95]], margin=0.5)
+
+        self.assertEqual(crop.shape, (100, 100, 3))
+        self.assertIs(union_crop(frame, []), frame)
+
+
+class TestDetectionZones(unittest.TestCase):
+    """Test zone cropping and filtering"""
+
+    def test_crop_to_zone_bounds_with_margin(self):
+        """Test the crop covers all zones plus the margin, clipped to the frame"""
+        zones = DetectionZones([
+            [[100, 50], [200, 50], [200, 150], [100, 150]],
+            [[300, 200], [400, 200], [400, 470]]
+        ], margin=20)
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+
+        crop, offset = zones.crop(frame)
+
+        self.assertEqual(offset, (80, 30))
+        self.assertEqual(crop.shape, (450, 340, 3))
+        self.assertTrue(np.shares_memory(crop, frame))
+
+    def test_full_frame_zone_is_not_cropped(self):
+        """Test a zone covering the whole frame passes the frame through"""
+        zones = DetectionZones.from_camera({
+            'detection_zones': [{'type': 'classroom',
+                                 'coordinates': [[0, 0], [640, 0], [640, 480], [0, 480]]}]
+        })
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+
+        crop, offset = zones.crop(frame)
+
+        self.assertIs(crop, frame)
+        self.assertEqual(offset, (0, 0))
+
+    def test_boxes_mapped_back_and_filtered_by_centre(self):
+        """Test crop boxes are shifted to frame coordinates and outside centres dropped"""
+        # Right triangle: the lower-left half of the square (100, 100)-(300, 300)
+        zones = DetectionZones([[[100, 100], [100, 300], [300, 300]]])
+        inside = {'bbox': [10, 150, 50, 190]}     # centre (130, 270) after shifting
+        outside = {'bbox': [150, 10, 190, 50]}    # centre (270, 130): above the diagonal
+
+        detections = zones.filter(zones.to_frame([inside, outside], (100, 100)))
+
+        self.assertEqual(detections, [inside])
+        self.assertEqual(inside['bbox'], [110, 250, 150, 290])
+        self.assertEqual(zones.stats()['detections_dropped'], 1)
+
+    def test_camera_without_zones(self):
+        """Test cameras without polygons get no zones"""
+        self.assertIsNone(DetectionZones.from_camera({'id': 'CAM_001'}))
+        self.assertIsNone(DetectionZones.from_camera({'detection_zones': [{'coordinates': []}]}))
+
+
+class TestThreatQuantization(unittest.TestCase):
+    """Test INT8 quantization of the fallback threat model"""
+
+    def calibration_clips(self, count, clip_length):
+        """Clips preprocessed as at runtime"""
+        import torch
+
+        buffer = ClipBuffer(clip_length)
+        for seed in range(count):
+            buffer.clear()
+            for frame in make_frames(clip_length, seed=seed):
+                buffer.append(frame)
+            yield torch.from_numpy(buffer.clip().copy()).unsqueeze(0)
+
+    def test_fusion_groups(self):
+        """Test conv/linear + batch norm + ReLU runs are found for fusion"""
+        import torch.nn as nn
+
+        model = nn.Sequential(
+            nn.Conv3d(3, 4, 3), nn.BatchNorm3d(4), nn.ReLU(), nn.MaxPool3d(2),
+            nn.Conv3d(4, 4, 3), nn.ReLU(),
+            nn.Flatten(), nn.Linear(4, 4), nn.Dropout(), nn.Linear(4, 2), nn.ReLU()
+        )
+
+        self.assertEqual(_fusion_groups(model), [['0', '1', '2'], ['4', '5'], ['9', '10']])
+
+    def test_static_artifact_matches_fp32(self):
+        """Test a calibrated static INT8 artifact loads and tracks the FP32 scores"""
+        import copy
+
+        fp32 = ThreatDetector(model_type="i3d", clip_length=4, device="cpu")
+        quantized = quantize_model(copy.deepcopy(fp32.model), 'static', self.calibration_clips(3, 4))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'threat_int8.pt')
+            save_quantized(quantized, path, 'static', {'model_type': 'i3d'})
+            int8 = ThreatDetector(model_type="i3d", clip_length=4, device="cpu",
+                                  quantized_model_path=path)
+
+        self.assertTrue(any('quantized' in type(m).__module__ for m in int8.model.modules()))
+        for frame in make_frames(4, seed=7):
+            fp32.add_frame(frame)
+            int8.add_frame(frame)
+        expected, result = fp32.detect(), int8.detect()
+
+        self.assertIn(result['status'], ('normal', 'detected'))
+        self.assertAlmostEqual(sum(result['all_scores'].values()), 1.0, places=4)
+        for name, score in expected['all_scores'].items():
+            self.assertAlmostEqual(result['all_scores'][name], score, delta=0.05)
+
+    def test_dynamic_round_trip_and_type_check(self):
+        """Test dynamic artifacts reload exactly and reject other model types"""
+        import torch
+
+        detector = ThreatDetector(model_type="i3d", clip_length=4, device="cpu")
+        quantized = quantize_model(detector.model, 'dynamic')
+        clip = next(self.calibration_clips(1, 4))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'threat_int8.pt')
+            save_quantized(quantized, path, 'dynamic', {'model_type': 'i3d'})
+            fresh = ThreatDetector(model_type="i3d", clip_length=4, device="cpu").model
+            reloaded = load_quantized(fresh, path, 'i3d')
+
+            with self.assertRaises(ValueError):
+                load_quantized(fresh, path, 'x3d')
+
+        with torch.no_grad():
+            self.assertTrue(torch.allclose(quantized(clip), reloaded(clip)))
+
+    def test_static_requires_calibration(self):
+        """Test static quantization refuses to run uncalibrated"""
+        detector = ThreatDetector(model_type="i3d", clip_length=4, device="cpu")
+
+        with self.assertRaises(ValueError):
+            quantize_model(detector.model, 'static')
+
+
+def build_random_yolo(directory):
+    """
+    Save an untrained YOLOv8n with calibrated BatchNorm statistics
+
+    Pretrained weights need a download; a random network whose class biases
+    are raised produces plenty of distinct boxes for backend comparisons.
+    """
+    import torch
+    from ultralytics import YOLO
+
+    torch.manual_seed(0)
+    yolo = YOLO('yolov8n.yaml')
+    model = yolo.model
+    for module in model.modules():
+        if isinstance(module, torch.nn.BatchNorm2d):
+            module.momentum = None
+            module.reset_running_stats()
+
+    model.train()
+    with torch.no_grad():
+        for _ in range(3):
+            model(torch.rand(2, 3, 320, 320))
+        for branch in model.model[-1].cv3:
+            branch[-1].bias += 6.0
+    model.eval()
+
+    path = os.path.join(directory, 'detector.pt')
+    yolo.save(path)
+    return path
+
+
+class TestOnnxPostprocessing(unittest.TestCase):
+    """Test letterboxing and NMS of the ONNX backend"""
+
+    def test_letterbox_full_and_minimum_rectangle(self):
+        """Test padding to the full size or only to the stride"""
+        image = np.zeros((480, 640, 3), dtype=np.uint8)
+
+        padded, gain, pad = letterbox(image, (640, 640))
+        self.assertEqual(padded.shape, (640, 640, 3))
+        self.assertEqual(pad, (0, 80))
+        self.assertEqual(gain, (1.0, 1.0))
+
+        padded, gain, pad = letterbox(np.zeros((500, 1000, 3), np.uint8), (640, 640), auto=True)
+        self.assertEqual(padded.shape, (320, 640, 3))
+        self.assertEqual(pad, (0, 0))
+
+    def test_nms_suppresses_overlaps(self):
+        """Test lower-scoring overlapping boxes are removed"""
+        boxes = np.array([[0, 0, 10, 10], [1, 1, 10, 10], [20, 20, 30, 30]], dtype=float)
+        scores = np.array([0.8, 0.9, 0.7])
+
+        keep = nms(boxes, scores, iou_threshold=0.5)
+
+        self.assertEqual(keep.tolist(), [1, 2])
+
+    def test_postprocess_is_class_aware(self):
+        """Test overlapping boxes of different classes both survive"""
+        output = np.zeros((4 + 3, 3), dtype=np.float32)
+        output[:4] = np.array([[5, 5, 10, 10], [5, 5, 10, 10], [5, 5, 10, 10]]).T
+        output[4, 0], output[5, 1], output[4, 2] = 0.9, 0.8, 0.2
+
+        boxes, scores, class_ids = postprocess(output, conf_threshold=0.25, iou_threshold=0.45)
+
+        self.assertEqual(class_ids.tolist(), [0, 1])
+        np.testing.assert_allclose(boxes[0], [0, 0, 10, 10])
+
+
+@unittest.skipIf(ort is None, "onnxruntime not installed")
+class TestOnnxParity(unittest.TestCase):
+    """Test the ONNX Runtime backend against the ultralytics PyTorch path"""
+
+    @classmethod
+    def setUpClass(cls):
+        from src.models.object_detector import LeftBehindObjectDetector
+
+        directory = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(directory.cleanup)
+        weights = build_random_yolo(directory.name)
+        cls.torch_detector = LeftBehindObjectDetector(
+            weights, confidence_threshold=0.5, device='cpu', target_classes=['person']
+        )
+        cls.torch_detector.export_model('onnx')
+        cls.onnx_detector = LeftBehindObjectDetector(
+            weights, confidence_threshold=0.5, target_classes=['person'], model_type='onnx'
+        )
+
+    def assert_same_detections(self, expected, actual):
+        self.assertGreater(len(expected), 0)
+        self.assertLessEqual(abs(len(expected) - len(actual)), max(1, len(expected) // 50))
+
+        iou = iou_matrix([d['bbox'] for d in expected], [d['bbox'] for d in actual])
+        same_class = (np.array([d['class_id'] for d in expected])[:, None]
+                      == np.array([d['class_id'] for d in actual])[None, :])
+        matched = ((iou > 0.99) & same_class).any(axis=1)
+        self.assertGreaterEqual(matched.mean(), 0.97)
+
+    def test_parity_on_camera_sized_frames(self):
+        """Test both backends find the same boxes, classes and scores"""
+        rng = np.random.default_rng(1)
+        for shape in [(640, 640, 3), (480, 640, 3), (720, 1280, 3)]:
+            frame = rng.integers(0, 256, shape, dtype=np.uint8)
+
+            expected = self.torch_detector.detect(frame)
+            actual = self.onnx_detector.detect(frame)
+
+            with self.subTest(shape=shape):
+                self.assert_same_detections(expected, actual)
+                self.assertEqual(actual[0]['class_name'], expected[0]['class_name'])
+
+    def test_batch_matches_single_frames(self):
+        """Test detect_batch returns the per-frame results"""
+        rng = np.random.default_rng(2)
+        frames = [rng.integers(0, 256, (480, 640, 3), dtype=np.uint8) for _ in range(3)]
+
+        batched = self.onnx_detector.detect_batch(frames)
+
+        for frame, detections in zip(frames, batched):
+            self.assert_same_detections(self.onnx_detector.detect(frame), detections)
+
+    def test_small_crops_are_not_scaled_up(self):
+        """Test scale_up=False runs zone crops at their own size on both backends"""
+        crop = np.random.default_rng(3).integers(0, 256, (200, 300, 3), dtype=np.uint8)
+        for detector in (self.torch_detector, self.onnx_detector):
+            detector.scale_up = False
+        try:
+            self.assertEqual(self.torch_detector._input_size([crop]), (224, 320))
+            self.assertEqual(self.onnx_detector._input_size([crop, crop[:100]]), (224, 320))
+            self.assert_same_detections(
+                self.torch_detector.detect(crop), self.onnx_detector.detect(crop)
+            )
+        finally:
+            for detector in (self.torch_detector, self.onnx_detector):
+                detector.scale_up = True
+
+
+if __name__ == '__main__':
+    unittest.main()
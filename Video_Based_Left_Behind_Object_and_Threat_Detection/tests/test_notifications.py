@@ -0,0 +1,385 @@
+"""
+Unit Tests for Alert Delivery
+"""
+import sys
+import os
+import time
+import threading
+import socket
+import socketserver
+import tempfile
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.notifications.alert_system import AlertSystem
+from src.notifications.alert_dispatcher import AlertDispatcher, DeliveryNotConfigured
+from src.notifications.smtp_pool import SMTPConnectionPool
+from src.notifications.snapshots import SnapshotPipeline
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP (EHLO, AUTH PLAIN, MAIL/RCPT/DATA, NOOP) for smtplib"""
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        server.sockets.append(self.connection)
+        self.reply("220 localhost ESMTP")
+        while True:
+            line = self.rfile.readline().decode().strip()
+            if not line:
+                return
+            command = line.split(' ', 1)[0].upper()
+            if command == 'EHLO':
+                self.wfile.write(b"250-localhost\r\n250 AUTH PLAIN\r\n")
+            elif command == 'AUTH':
+                server.logins += 1
+                self.reply("235 Authenticated")
+            elif command in ('MAIL', 'RCPT', 'RSET', 'NOOP'):
+                self.reply("250 OK")
+            elif command == 'DATA':
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data = self.rfile.readline().decode()
+                    if data in ('.\r\n', ''):
+                        break
+                    lines.append(data)
+                time.sleep(server.delay)
+                if server.failures > 0:
+                    server.failures -= 1
+                    self.reply("451 Try again later")
+                else:
+                    server.messages.append(''.join(lines))
+                    self.reply("250 Queued")
+            elif command == 'QUIT':
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Not implemented")
+
+
+class LocalSMTPServer(socketserver.ThreadingTCPServer):
+    """SMTP stand-in recording connections, logins and messages"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, delay=0.0, failures=0):
+        super().__init__(('127.0.0.1', 0), SMTPHandler)
+        self.delay = delay
+        self.failures = failures
+        self.connections = 0
+        self.logins = 0
+        self.messages = []
+        self.sockets = []
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def hang_up(self):
+        """Drop every open client connection, as servers do with idle ones"""
+        for sock in self.sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
+
+
+class TelegramHandler(BaseHTTPRequestHandler):
+    """Telegram Bot API stand-in with keep-alive connections"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.server.requests.append((self.path, body, self.client_address[1]))
+        reply = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_http_server():
+    """Telegram stand-in serving on a free local port"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), TelegramHandler)
+    server.daemon_threads = True
+    server.requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+CAMERA = {'id': 'CAM_001', 'name': 'Classroom 1A', 'location': 'Building A'}
+OBJECT = {'track_id': 1, 'class_name': 'backpack', 'first_seen': 'now', 'stationary_since': 'now'}
+
+
+class TestSMTPConnectionPool(unittest.TestCase):
+    """Test SMTP connections are kept between emails"""
+
+    def setUp(self):
+        self.smtp = LocalSMTPServer()
+        self.addCleanup(self.smtp.close)
+
+    def alert_system(self, **kwargs):
+        return AlertSystem(
+            smtp_server='127.0.0.1', smtp_port=self.smtp.port,
+            smtp_username='user', smtp_password='secret', from_email='alerts@school.com',
+            smtp_use_tls=False, **kwargs
+        )
+
+    def test_emails_share_one_login(self):
+        """Test several emails go over one connection and one login"""
+        alerts = self.alert_system()
+        self.addCleanup(alerts.close)
+
+        for n in range(3):
+            self.assertTrue(alerts.send_email(['security@school.com'], f"Alert {n}", "<p>body</p>"))
+
+        self.assertEqual(len(self.smtp.messages), 3)
+        self.assertEqual(self.smtp.connections, 1)
+        self.assertEqual(self.smtp.logins, 1)
+        self.assertEqual(alerts.smtp_pool.stats()['reused'], 2)
+
+    def test_dead_connection_is_replaced(self):
+        """Test a connection the server closed is reopened transparently"""
+        pool = SMTPConnectionPool('127.0.0.1', self.smtp.port, 'user', 'secret', use_tls=False)
+        self.addCleanup(pool.close)
+        with pool.connection() as connection:
+            connection.noop()
+        # Server side hangs up on the idle connection
+        self.smtp.hang_up()
+
+        with pool.connection() as connection:
+            self.assertEqual(connection.noop()[0], 250)
+
+        self.assertEqual(pool.stats()['opened'], 2)
+
+
+class TestAlertDispatcher(unittest.TestCase):
+    """Test background delivery, retries and queue metrics"""
+
+    def test_submit_does_not_wait_for_delivery(self):
+        """Test submit returns while a slow delivery runs"""
+        release = threading.Event()
+        dispatcher = AlertDispatcher(num_workers=1, queue_size=10)
+        dispatcher.start()
+        self.addCleanup(dispatcher.stop, 0)
+
+        start = time.perf_counter()
+        for _ in range(3):
+            self.assertTrue(dispatcher.submit('email', release.wait, 5))
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+        time.sleep(0.05)
+        stats = dispatcher.stats()
+        self.assertEqual(stats['in_flight'], 1)
+        self.assertEqual(stats['queue_depth'], 2)
+        self.assertGreaterEqual(stats['max_queue_depth'], 2)
+
+        release.set()
+        self.assertTrue(dispatcher.join(2))
+        self.assertEqual(dispatcher.stats()['channels']['email']['delivered'], 3)
+
+    def test_full_queue_drops_deliveries(self):
+        """Test deliveries beyond the queue size are dropped and counted"""
+        dispatcher = AlertDispatcher(num_workers=1, queue_size=2)
+
+        results = [dispatcher.submit('telegram', lambda: True) for _ in range(4)]
+
+        self.assertEqual(results, [True, True, False, False])
+        self.assertEqual(dispatcher.stats()['dropped'], 2)
+        self.assertEqual(dispatcher.stats()['queue_depth'], 2)
+
+    def test_failed_delivery_is_retried_with_backoff(self):
+        """Test a failing delivery is retried with growing delays until it works"""
+        attempts = []
+
+        def flaky():
+            attempts.append(time.monotonic())
+            if len(attempts) < 3:
+                raise ConnectionError("server busy")
+            return True
+
+        dispatcher = AlertDispatcher(num_workers=1, retry_delay=0.05, max_retry_delay=1.0)
+        dispatcher.start()
+        self.addCleanup(dispatcher.stop, 0)
+        dispatcher.submit('sms', flaky)
+        self.assertTrue(dispatcher.join(2))
+
+        self.assertEqual(len(attempts), 3)
+        self.assertGreater(attempts[2] - attempts[1], attempts[1] - attempts[0])
+        stats = dispatcher.stats()
+        self.assertEqual((stats['delivered'], stats['retries'], stats['failed']), (1, 2, 0))
+
+    def test_delivery_gives_up_after_max_retries(self):
+        """Test a delivery that never succeeds is counted as failed"""
+        dispatcher = AlertDispatcher(num_workers=1, max_retries=2, retry_delay=0.01)
+        dispatcher.start()
+        self.addCleanup(dispatcher.stop, 0)
+        calls = []
+        dispatcher.submit('email', lambda: calls.append(1) and False)
+        self.assertTrue(dispatcher.join(2))
+
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(dispatcher.stats()['channels']['email']['failed'], 1)
+
+    def test_unconfigured_channel_is_not_retried(self):
+        """Test a delivery failing on missing configuration fails without retries"""
+        dispatcher = AlertDispatcher(num_workers=1, retry_delay=0.01)
+        dispatcher.start()
+        self.addCleanup(dispatcher.stop, 0)
+        calls = []
+
+        def unconfigured():
+            calls.append(1)
+            raise DeliveryNotConfigured("SMTP not configured")
+
+        dispatcher.submit('email', unconfigured)
+        self.assertTrue(dispatcher.join(2))
+
+        self.assertEqual(len(calls), 1)
+        stats = dispatcher.stats()
+        self.assertEqual((stats['failed'], stats['retries']), (1, 0))
+
+    def test_email_is_not_queued_without_smtp(self):
+        """Test alerts submit nothing for email when SMTP is not configured"""
+        dispatcher = AlertDispatcher(num_workers=1)
+        alerts = AlertSystem(dispatcher=dispatcher)
+
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertTrue(alerts.send_left_behind_alert(
+                OBJECT, CAMERA, {'email': ['security@school.com']}
+            ))
+
+        self.assertEqual(dispatcher.stats()['submitted'], 0)
+
+
+class TestDispatchedAlerts(unittest.TestCase):
+    """Test AlertSystem alerts delivered through the dispatcher"""
+
+    def setUp(self):
+        self.smtp = LocalSMTPServer(delay=0.3, failures=1)
+        self.addCleanup(self.smtp.close)
+        self.http = start_http_server()
+        self.addCleanup(self.http.server_close)
+        self.addCleanup(self.http.shutdown)
+
+        self.dispatcher = AlertDispatcher(num_workers=2, retry_delay=0.05)
+        self.dispatcher.start()
+        self.alerts = AlertSystem(
+            smtp_server='127.0.0.1', smtp_port=self.smtp.port,
+            smtp_username='user', smtp_password='secret', from_email='alerts@school.com',
+            smtp_use_tls=False, telegram_api_url=f"http://127.0.0.1:{self.http.server_port}",
+            dispatcher=self.dispatcher
+        )
+        self.addCleanup(self.alerts.close)
+
+    def test_alert_returns_before_slow_channels_deliver(self):
+        """Test an alert is queued at once and delivered with retry in the background"""
+        recipients = {'email': ['security@school.com'], 'telegram': ['CHAT_1', 'CHAT_2']}
+
+        with mock.patch.dict(os.environ, {'TELEGRAM_BOT_TOKEN': 'TOKEN'}):
+            start = time.perf_counter()
+            self.assertTrue(self.alerts.send_left_behind_alert(OBJECT, CAMERA, recipients))
+            elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 0.2)
+        self.assertTrue(self.dispatcher.join(5))
+
+        # The first DATA was rejected with 451 and retried on the same login
+        self.assertEqual(len(self.smtp.messages), 1)
+        self.assertEqual(self.smtp.logins, 1)
+        channels = self.alerts.stats()['dispatcher']['channels']
+        self.assertEqual(channels['email'], {'delivered': 1, 'failed': 0, 'retries': 1, 'dropped': 0})
+        self.assertEqual(channels['telegram']['delivered'], 2)
+
+        # One Telegram message per chat, all on kept-alive connections
+        paths = [path for path, _, _ in self.http.requests]
+        self.assertEqual(paths, ['/botTOKEN/sendMessage'] * 2)
+        self.assertLessEqual(len({port for _, _, port in self.http.requests}), 2)
+
+
+
+def camera_frame(height=720, width=1280):
+    """Smooth synthetic frame that compresses like a camera image"""
+    rng = np.random.default_rng(0)
+    small = rng.integers(0, 256, (height // 16, width // 16, 3), dtype=np.uint8)
+    return cv2.resize(small, (width, height), interpolation=cv2.INTER_CUBIC)
+
+
+class TestSnapshotPipeline(unittest.TestCase):
+    """Test in-memory alert snapshots"""
+
+    def test_downscale_and_quality_shrink_snapshots(self):
+        """Test max_width and JPEG quality keep attachments small"""
+        frame = camera_frame()
+        full = SnapshotPipeline(quality=95, max_width=None).encode(frame)
+        small = SnapshotPipeline(quality=70, max_width=640).encode(frame)
+
+        self.assertLess(len(small), len(full) / 2)
+        decoded = cv2.imdecode(np.frombuffer(small, np.uint8), cv2.IMREAD_COLOR)
+        self.assertEqual(decoded.shape, (360, 640, 3))
+
+    def test_background_writer_saves_the_encoded_bytes(self):
+        """Test the saved file holds exactly the bytes attached to alerts"""
+        with tempfile.TemporaryDirectory() as directory:
+            pipeline = SnapshotPipeline(os.path.join(directory, 'snapshots'), max_width=320)
+            pipeline.start()
+            snapshot = pipeline.capture(camera_frame(), 'CAM_001', 'threat')
+            pipeline.stop()
+
+            self.assertTrue(snapshot.filename.startswith('CAM_001_threat_'))
+            with open(snapshot.path, 'rb') as f:
+                self.assertEqual(f.read(), snapshot.jpeg)
+            self.assertEqual(pipeline.stats()['written'], 1)
+
+    def test_channels_attach_the_snapshot_without_a_file(self):
+        """Test email and Telegram send the in-memory JPEG"""
+        smtp = LocalSMTPServer()
+        self.addCleanup(smtp.close)
+        http = start_http_server()
+        self.addCleanup(http.server_close)
+        self.addCleanup(http.shutdown)
+        alerts = AlertSystem(
+            smtp_server='127.0.0.1', smtp_port=smtp.port,
+            smtp_username='user', smtp_password='secret', from_email='alerts@school.com',
+            smtp_use_tls=False, telegram_api_url=f"http://127.0.0.1:{http.server_port}"
+        )
+        self.addCleanup(alerts.close)
+        snapshot = SnapshotPipeline(max_width=320).capture(camera_frame(), 'CAM_001', 'leftbehind')
+        self.assertIsNone(snapshot.path)
+
+        recipients = {'email': ['security@school.com'], 'telegram': ['CHAT_1']}
+        with mock.patch.dict(os.environ, {'TELEGRAM_BOT_TOKEN': 'TOKEN'}):
+            self.assertTrue(alerts.send_left_behind_alert(OBJECT, CAMERA, recipients,
+                                                          snapshot=snapshot))
+
+        self.assertIn(f'filename="{snapshot.filename}"', smtp.messages[0])
+        self.assertIn('Content-Type: image/jpeg', smtp.messages[0])
+        path, body, _ = http.requests[0]
+        self.assertEqual(path, '/botTOKEN/sendPhoto')
+        self.assertIn(snapshot.jpeg, body)
+
+
+if __name__ == '__main__':
+    unittest.main()
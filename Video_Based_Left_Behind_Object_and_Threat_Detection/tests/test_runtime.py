@@ -0,0 +1,748 @@
+"""
+Unit Tests for the Multi-Camera Runtime
+"""
+import sys
+import os
+import time
+import queue
+import tempfile
+import threading
+import unittest
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.runtime.supervisor import (
+    CameraSupervisor, QueueAlertSink, camera_source, group_cameras, MSG_ALERT, MSG_RESULT
+)
+from src.runtime.inference_service import BatchInferenceService, RemoteDetector
+from src.runtime.sessions import CameraSession, SessionRegistry
+from src.runtime.stream_pull import EventBroker, StreamPullWorker, format_sse
+from src.runtime.offline_analysis import analyze_segment, merge_segments, plan_segments
+from src.runtime.metrics import MetricsRegistry, PipelineMetrics, pipeline_metrics
+from src.runtime.load_governor import LoadGovernor, input_size_ladder
+from src.tracking.object_tracker import ObjectTracker
+
+
+class FakeSystem:
+    """Minimal stand-in for SchoolSecuritySystem used in worker processes"""
+
+    def __init__(self, config_path, alert_system=None, object_detector=None):
+        self.config_path = config_path
+        self.alert_system = alert_system
+        self.object_detector = object_detector
+
+    def process_cameras(self, sources, stop_event=None, result_callback=None):
+        # First start of a worker crashes, restarts run normally
+        if not os.path.exists(self.config_path):
+            open(self.config_path, 'w').close()
+            raise RuntimeError("simulated crash")
+
+        for camera_id in sources:
+            result_callback(camera_id, {'camera_id': camera_id, 'tracked_objects': 1})
+        self.alert_system.send_threat_alert(camera_info={'id': list(sources)[0]})
+        stop_event.wait(30)
+
+
+class RecordingAlertSystem:
+    def __init__(self):
+        self.calls = []
+
+    def send_threat_alert(self, **kwargs):
+        self.calls.append(kwargs)
+        return True
+
+
+class FakeBatchDetector:
+    """Returns the frame's fill value as a detection and records batch sizes"""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def detect_batch(self, frames):
+        self.batch_sizes.append(len(frames))
+        return [[{'value': int(frame[0, 0])}] for frame in frames]
+
+
+class TestCameraGrouping(unittest.TestCase):
+    """Test camera assignment helpers"""
+
+    def test_group_cameras_round_robin(self):
+        """Test cameras are spread across at most num_workers groups"""
+        cameras = [{'id': f"CAM_{i}"} for i in range(5)]
+
+        groups = group_cameras(cameras, 2)
+
+        self.assertEqual([[c['id'] for c in g] for g in groups],
+                         [['CAM_0', 'CAM_2', 'CAM_4'], ['CAM_1', 'CAM_3']])
+        self.assertEqual(len(group_cameras(cameras, 10)), 5)
+
+    def test_camera_source(self):
+        """Test source selection from camera configuration"""
+        self.assertEqual(camera_source({'stream_url': 'rtsp://x'}), 'rtsp://x')
+        self.assertEqual(camera_source({'ip': '10.0.0.1'}), 'http://10.0.0.1/stream')
+        self.assertEqual(camera_source({}), 0)
+
+    def test_queue_alert_sink_forwards(self):
+        """Test alerts from workers are forwarded over the queue"""
+        result_queue = queue.Queue()
+        sink = QueueAlertSink(result_queue, worker_index=3)
+
+        self.assertTrue(sink.send_left_behind_alert(object_info={'track_id': 1}))
+        self.assertEqual(
+            result_queue.get_nowait(),
+            ('alert', 3, 'send_left_behind_alert', {'object_info': {'track_id': 1}})
+        )
+
+
+class TestCameraSupervisor(unittest.TestCase):
+    """Test worker supervision with real processes"""
+
+    def test_crashed_worker_is_restarted(self):
+        """Test a crashing worker is restarted and its results aggregated"""
+        marker = os.path.join(tempfile.mkdtemp(), 'started')
+        alerts = RecordingAlertSystem()
+        supervisor = CameraSupervisor(
+            config_path=marker,
+            cameras=[{'id': 'CAM_001'}, {'id': 'CAM_002'}],
+            system_factory=FakeSystem,
+            alert_system=alerts,
+            num_workers=1
+        )
+
+        supervisor.start()
+        try:
+            deadline = time.monotonic() + 30
+            while time.monotonic() < deadline and len(supervisor.latest_results) < 2:
+                supervisor.check_workers()
+                time.sleep(0.1)
+        finally:
+            supervisor.stop()
+
+        self.assertEqual(sorted(supervisor.latest_results), ['CAM_001', 'CAM_002'])
+        self.assertEqual(supervisor.restart_counts[0], 1)
+        self.assertEqual(alerts.calls, [{'camera_info': {'id': 'CAM_001'}}])
+
+    def test_handle_result_message(self):
+        """Test results are stored per camera"""
+        supervisor = CameraSupervisor('config.yaml', [{'id': 'CAM_001'}], FakeSystem)
+
+        supervisor.handle_message((MSG_RESULT, 0, 'CAM_001', {'tracked_objects': 2}))
+
+        self.assertEqual(supervisor.status()['cameras']['CAM_001'],
+                         {'tracked_objects': 2, 'worker': 0})
+
+    def test_only_alerts_past_the_cooldown_are_counted(self):
+        """Test forwarded alerts suppressed by the cooldown are not counted as raised"""
+        alerts = RecordingAlertSystem()
+        supervisor = CameraSupervisor('config.yaml', [{'id': 'CAM_COOL'}], FakeSystem, alert_system=alerts)
+        payload = {'camera_info': {'id': 'CAM_COOL'}}
+
+        supervisor.handle_message((MSG_ALERT, 0, 'send_threat_alert', payload))
+        alerts.send_threat_alert = lambda **kwargs: False  # Within the cooldown
+        supervisor.handle_message((MSG_ALERT, 0, 'send_threat_alert', payload))
+
+        self.assertEqual(pipeline_metrics.alerts.value(type='threat', camera_id='CAM_COOL'), 1)
+
+
+class TestBatchInferenceService(unittest.TestCase):
+    """Test cross-camera micro-batching"""
+
+    def setUp(self):
+        self.detector = FakeBatchDetector()
+        self.request_queue = queue.Queue()
+        self.response_queues = {0: queue.Queue(), 1: queue.Queue()}
+
+    def make_service(self, **kwargs):
+        return BatchInferenceService(
+            self.detector, self.request_queue, self.response_queues, **kwargs
+        )
+
+    def test_results_routed_to_each_worker(self):
+        """Test one batch serves frames from several workers"""
+        service = self.make_service(max_batch_size=4)
+        now = time.time()
+        batch = [
+            (0, 'a', 'CAM_1', np.full((2, 2), 1), now),
+            (1, 'b', 'CAM_2', np.full((2, 2), 2), now),
+            (0, 'c', 'CAM_3', np.full((2, 2), 3), now),
+        ]
+
+        service.process_batch(batch)
+
+        self.assertEqual(self.detector.batch_sizes, [3])
+        self.assertEqual(self.response_queues[0].get_nowait(), ('a', [{'value': 1}]))
+        self.assertEqual(self.response_queues[0].get_nowait(), ('c', [{'value': 3}]))
+        self.assertEqual(self.response_queues[1].get_nowait(), ('b', [{'value': 2}]))
+
+    def test_batches_recorded_in_metrics(self):
+        """Test batch sizes and queue waits reach the /metrics registry"""
+        metrics = PipelineMetrics()
+        service = self.make_service(metrics=metrics)
+        now = time.time()
+
+        service.process_batch([(0, i, 'CAM_1', np.zeros((2, 2)), now - 0.02) for i in range(3)])
+        service.process_batch([(1, 'x', 'CAM_2', np.zeros((2, 2)), now)])
+
+        self.assertEqual(metrics.inference_batch_size.count(), 2)
+        self.assertEqual(metrics.inference_queue_wait.count(), 4)
+        self.assertIn('video_inference_batch_size_bucket{le="2"} 1', metrics.render())
+
+    def test_batch_closed_at_max_size(self):
+        """Test queued frames are split into batches of at most max_batch_size"""
+        service = self.make_service(max_batch_size=4, max_wait_ms=1000)
+        for i in range(6):
+            self.request_queue.put((0, i, 'CAM_1', np.zeros((2, 2)), time.time()))
+
+        self.assertEqual(len(service._collect_batch()), 4)
+
+    def test_batch_closed_at_deadline(self):
+        """Test a partial batch is released after max_wait_ms"""
+        service = self.make_service(max_batch_size=8, max_wait_ms=20)
+        self.request_queue.put((0, 0, 'CAM_1', np.zeros((2, 2)), time.time()))
+
+        t0 = time.monotonic()
+        batch = service._collect_batch()
+        elapsed = time.monotonic() - t0
+
+        self.assertEqual(len(batch), 1)
+        self.assertLess(elapsed, 0.5)
+
+    def test_remote_detectors_share_batches(self):
+        """Test concurrent RemoteDetectors are served by batched calls"""
+        service = self.make_service(max_batch_size=8, max_wait_ms=50)
+        service.start()
+        results = {}
+
+        def worker(worker_index):
+            detector = RemoteDetector(
+                worker_index, self.request_queue, self.response_queues[worker_index]
+            )
+            results[worker_index] = [
+                detector.detect(np.full((2, 2), worker_index * 10 + i))
+                for i in range(3)
+            ]
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in (0, 1)]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(10)
+        finally:
+            service.stop()
+
+        self.assertEqual(results[0], [[{'value': 0}], [{'value': 1}], [{'value': 2}]])
+        self.assertEqual(results[1], [[{'value': 10}], [{'value': 11}], [{'value': 12}]])
+
+        stats = service.stats()
+        self.assertEqual(stats['frames'], 6)
+        self.assertLess(stats['batches'], 6)
+        self.assertEqual(sum(k * v for k, v in stats['batch_size_histogram'].items()), 6)
+
+    def test_remote_detector_discards_stale_responses(self):
+        """Test answers to timed-out requests are not returned for new frames"""
+        detector = RemoteDetector(0, self.request_queue, self.response_queues[0], timeout=1)
+        self.response_queues[0].put((('stale', 0), [{'value': -1}]))
+
+        def answer():
+            _, request_id, _, frame, _ = self.request_queue.get(timeout=1)
+            self.response_queues[0].put((request_id, [{'value': int(frame[0, 0])}]))
+
+        responder = threading.Thread(target=answer)
+        responder.start()
+        detections = detector.detect(np.full((2, 2), 7))
+        responder.join()
+
+        self.assertEqual(detections, [{'value': 7}])
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSessionRegistry(unittest.TestCase):
+    """Test per-camera sessions for the API"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.registry = SessionRegistry(
+            lambda camera_id: CameraSession(camera_id, ObjectTracker()),
+            idle_timeout=60, max_sessions=2, clock=self.clock
+        )
+
+    def test_sessions_are_created_once_per_camera(self):
+        """Test each camera keeps its own session across requests"""
+        with self.registry.session('CAM_001') as first:
+            pass
+        with self.registry.session('CAM_001') as again:
+            pass
+        with self.registry.session('CAM_002') as other:
+            pass
+
+        self.assertIs(first, again)
+        self.assertIsNot(first.tracker, other.tracker)
+        self.assertEqual(first.frames, 2)
+        self.assertEqual(self.registry.stats()['created'], 2)
+
+    def test_idle_sessions_are_evicted(self):
+        """Test sessions without frames for idle_timeout are dropped"""
+        with self.registry.session('CAM_001'):
+            pass
+        self.clock.now = 30
+        with self.registry.session('CAM_002'):
+            pass
+
+        self.clock.now = 80
+        self.assertEqual(self.registry.evict_idle(), 1)
+        self.assertNotIn('CAM_001', self.registry)
+        self.assertIn('CAM_002', self.registry)
+
+    def test_full_registry_evicts_least_recently_seen(self):
+        """Test the oldest camera makes room when max_sessions is reached"""
+        for now, camera_id in enumerate(['CAM_001', 'CAM_002', 'CAM_001', 'CAM_003']):
+            self.clock.now = now
+            with self.registry.session(camera_id):
+                pass
+
+        self.assertNotIn('CAM_002', self.registry)
+        self.assertIn('CAM_001', self.registry)
+        self.assertIn('CAM_003', self.registry)
+
+    def test_busy_session_is_never_evicted(self):
+        """Test a session in use survives eviction"""
+        with self.registry.session('CAM_001') as busy:
+            self.clock.now = 1000
+            self.assertEqual(self.registry.evict_idle(), 0)
+            with self.registry.session('CAM_002'):
+                with self.assertRaises(RuntimeError):
+                    with self.registry.session('CAM_003'):
+                        pass
+
+        self.assertIs(self.registry.get('CAM_001'), busy)
+
+    def test_frames_of_one_camera_are_serialized(self):
+        """Test concurrent requests for a camera never overlap"""
+        registry = SessionRegistry(lambda camera_id: CameraSession(camera_id, ObjectTracker()))
+        active, overlaps = [0], []
+
+        def request():
+            for _ in range(20):
+                with registry.session('CAM_001'):
+                    active[0] += 1
+                    overlaps.append(active[0] > 1)
+                    time.sleep(0.0005)
+                    active[0] -= 1
+
+        threads = [threading.Thread(target=request) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertFalse(any(overlaps))
+        self.assertEqual(registry.get('CAM_001').frames, 80)
+
+
+
+class FakeGrabber:
+    """LatestFrameGrabber stand-in delivering a fixed list of frames"""
+
+    def __init__(self, frames):
+        self.source = 'http://camera/stream'
+        self.frames = list(frames)
+        self.stopped = False
+        self.last_decode_time = 0.002
+        self.frames_dropped = 0
+        self.fill_at_read = 0.0
+
+    def start(self):
+        return True
+
+    def stop(self, timeout=None):
+        self.stopped = True
+
+    def read(self, timeout=None):
+        if not self.frames:
+            return False, None
+        return True, self.frames.pop(0)
+
+    @property
+    def is_finished(self):
+        return not self.frames
+
+    def stats(self):
+        return {}
+
+
+def stream_result(left_behind_ids=(), threat=False):
+    """process-frame result with one detection per track id"""
+    return {
+        'success': True,
+        'objects': {'detections': [
+            {'track_id': track_id, 'is_left_behind': True, 'bbox': [0, 0, 1, 1]}
+            for track_id in left_behind_ids
+        ]},
+        'threats': {'is_threat': threat, 'fresh': threat, 'threat_type': 'fighting' if threat else None}
+    }
+
+
+def drain(subscriber):
+    events = []
+    while not subscriber.empty():
+        events.append(subscriber.get_nowait())
+    return events
+
+
+class TestEventBroker(unittest.TestCase):
+    """Test fan-out of SSE events"""
+
+    def test_events_go_to_the_camera_subscribers(self):
+        """Test each subscriber of a camera gets the event, other cameras none"""
+        broker = EventBroker()
+        first = broker.subscribe('CAM_001')
+        second = broker.subscribe('CAM_001')
+        other = broker.subscribe('CAM_002')
+
+        self.assertEqual(broker.publish('CAM_001', 'result', {'n': 1}), 2)
+
+        self.assertEqual(first.get_nowait()['data'], {'n': 1})
+        self.assertEqual(second.get_nowait()['event'], 'result')
+        self.assertTrue(other.empty())
+
+        broker.unsubscribe('CAM_001', first)
+        broker.unsubscribe('CAM_001', second)
+        self.assertEqual(broker.subscriber_count('CAM_001'), 0)
+
+    def test_slow_subscriber_drops_oldest_events(self):
+        """Test a full queue keeps the newest events without blocking"""
+        broker = EventBroker(queue_size=2)
+        subscriber = broker.subscribe('CAM_001')
+        for n in range(5):
+            broker.publish('CAM_001', 'result', {'n': n})
+
+        self.assertEqual([event['data']['n'] for event in drain(subscriber)], [3, 4])
+        self.assertEqual(broker.stats()['dropped'], 3)
+
+    def test_stream_formats_sse_and_unsubscribes(self):
+        """Test the SSE generator output and cleanup on close"""
+        broker = EventBroker()
+        stream = broker.stream('CAM_001', keepalive=0.01)
+
+        self.assertEqual(next(stream), ": connected\n\n")
+        broker.publish('CAM_001', 'threat', {'type': 'fighting'})
+        self.assertEqual(next(stream), 'id: 1\nevent: threat\ndata: {"type": "fighting"}\n\n')
+        self.assertEqual(next(stream), ": keepalive\n\n")
+
+        stream.close()
+        self.assertEqual(broker.subscriber_count('CAM_001'), 0)
+        self.assertEqual(format_sse({'id': 7, 'event': 'status', 'data': {}}),
+                         'id: 7\nevent: status\ndata: {}\n\n')
+
+
+class TestStreamPullWorker(unittest.TestCase):
+    """Test events published by a stream pull worker"""
+
+    def run_worker(self, results):
+        broker = EventBroker()
+        subscriber = broker.subscribe('CAM_001')
+        grabber = FakeGrabber(range(len(results)))
+        worker = StreamPullWorker('CAM_001', grabber, lambda camera_id, frame: results[frame],
+                                  broker, read_timeout=0.01)
+        worker.start()
+        worker._thread.join(5)
+        worker.stop()
+        return worker, drain(subscriber)
+
+    def test_left_behind_and_threat_events(self):
+        """Test left-behind events fire once per track and threats only when fresh"""
+        results = [
+            stream_result(),
+            stream_result([3]),
+            stream_result([3], threat=True),
+            stream_result([3, 4])
+        ]
+        worker, events = self.run_worker(results)
+
+        names = [event['event'] for event in events]
+        self.assertEqual(names.count('result'), 4)
+        self.assertEqual(
+            [event['data']['track_id'] for event in events if event['event'] == 'left_behind'],
+            [3, 4]
+        )
+        threats = [event['data'] for event in events if event['event'] == 'threat']
+        self.assertEqual(len(threats), 1)
+        self.assertEqual(threats[0]['camera_id'], 'CAM_001')
+        self.assertEqual(names[-1], 'status')
+        self.assertEqual(worker.frames_processed, 4)
+        self.assertTrue(worker.grabber.stopped)
+
+    def test_processing_errors_do_not_stop_the_worker(self):
+        """Test a failing frame is counted and later frames are still published"""
+        def process(camera_id, frame):
+            if frame == 0:
+                raise RuntimeError("model failed")
+            return stream_result()
+
+        broker = EventBroker()
+        subscriber = broker.subscribe('CAM_001')
+        worker = StreamPullWorker('CAM_001', FakeGrabber(range(2)), process, broker,
+                                  read_timeout=0.01)
+        worker.start()
+        worker._thread.join(5)
+
+        self.assertEqual(worker.errors, 1)
+        self.assertEqual(worker.last_error, 'model failed')
+        self.assertEqual([event['event'] for event in drain(subscriber)], ['result', 'status'])
+
+    def test_metrics_count_frames_and_alerts(self):
+        """Test a worker with metrics records decode times and one alert per event"""
+        metrics = PipelineMetrics()
+        results = [stream_result([3]), stream_result([3], threat=True), stream_result([3])]
+        grabber = FakeGrabber(range(len(results)))
+        grabber.frames_dropped = 5
+        worker = StreamPullWorker('CAM_001', grabber, lambda camera_id, frame: results[frame],
+                                  EventBroker(), read_timeout=0.01, metrics=metrics)
+        worker.start()
+        worker._thread.join(5)
+        worker.stop()
+
+        self.assertEqual(metrics.alerts.value(type='left_behind', camera_id='CAM_001'), 1)
+        self.assertEqual(metrics.alerts.value(type='threat', camera_id='CAM_001'), 1)
+        self.assertEqual(metrics.stage_seconds.count(stage='decode', camera_id='CAM_001'), 3)
+        self.assertEqual(metrics.frames_dropped.value(camera_id='CAM_001'), 5)
+
+
+
+class TestMetrics(unittest.TestCase):
+    """Test the Prometheus text output"""
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test bucket counts accumulate up to +Inf with sum and count"""
+        registry = MetricsRegistry()
+        histogram = registry.histogram('stage_seconds', 'Stage time', ('stage',), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 3.0):
+            histogram.observe(value, stage='inference')
+
+        lines = registry.render().splitlines()
+        self.assertEqual(lines[:2], ['# HELP stage_seconds Stage time', '# TYPE stage_seconds histogram'])
+        self.assertEqual(lines[2:], [
+            'stage_seconds_bucket{stage="inference",le="0.1"} 1',
+            'stage_seconds_bucket{stage="inference",le="1"} 3',
+            'stage_seconds_bucket{stage="inference",le="+Inf"} 4',
+            'stage_seconds_sum{stage="inference"} 4.05',
+            'stage_seconds_count{stage="inference"} 4'
+        ])
+
+    def test_counters_and_label_escaping(self):
+        """Test counters only grow, labels are escaped and wrong labels are rejected"""
+        registry = MetricsRegistry()
+        counter = registry.counter('drops_total', 'Dropped frames', ('camera_id',))
+        counter.set_total(7, camera_id='Gate "A"')
+        counter.set_total(3, camera_id='Gate "A"')
+        counter.inc(camera_id='Gate "A"')
+
+        self.assertIn('drops_total{camera_id="Gate \\"A\\""} 8', registry.render())
+        self.assertIs(registry.counter('drops_total', 'Dropped frames', ('camera_id',)), counter)
+        with self.assertRaises(ValueError):
+            counter.inc(camera='CAM_001')
+        with self.assertRaises(ValueError):
+            registry.gauge('drops_total', 'Dropped frames')
+
+
+class FakeResizableDetector:
+    """Detector stand-in recording input size changes"""
+
+    def __init__(self, input_size=(640, 640)):
+        self.input_size = input_size
+        self.stride = 32
+        self.resizable = True
+
+    def set_input_size(self, input_size):
+        self.input_size = input_size
+        return True
+
+
+class FakeRateGrabber:
+    """Frame grabber stand-in recording the analysis rate"""
+
+    def __init__(self):
+        self.target_fps = None
+
+    def set_target_fps(self, target_fps):
+        self.target_fps = target_fps
+
+
+class TestLoadGovernor(unittest.TestCase):
+    """Test quality degrades under load and recovers in reverse order"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cpu = 0.3
+        self.detector = FakeResizableDetector()
+        self.metrics = PipelineMetrics()
+        self.governor = LoadGovernor(
+            self.detector, min_fps=2.0, max_fps=8.0, fps_step=0.5,
+            min_input_size=512, input_size_step=64, interval=5.0, recover_after=2,
+            metrics=self.metrics, cpu_monitor=lambda: self.cpu, clock=self.clock
+        )
+        self.grabbers = {'CAM_001': FakeRateGrabber(), 'CAM_002': FakeRateGrabber()}
+        for camera_id, grabber in self.grabbers.items():
+            self.governor.add_camera(camera_id, grabber)
+        self.governor.update()  # Starts the first window
+
+    def step(self, lags):
+        """Report one frame per camera and advance to the next decision"""
+        for camera_id, lag in lags.items():
+            self.governor.record(camera_id, lag)
+        self.clock.now += 5.0
+        return [(d['action'], d['camera_id']) for d in self.governor.update()]
+
+    def test_input_size_ladder(self):
+        """Test sizes shrink by the step, keep the aspect ratio and stay stride multiples"""
+        self.assertEqual(input_size_ladder((640, 640), 448), [(640, 640), (576, 576), (512, 512), (448, 448)])
+        self.assertEqual(input_size_ladder((384, 640), 512), [(384, 640), (352, 576), (320, 512)])
+
+    def test_lagging_camera_slows_down_then_resolution_drops(self):
+        """Test only the lagging camera loses frame rate before the input size shrinks"""
+        self.assertEqual(self.step({'CAM_001': 0.5, 'CAM_002': 0.01}), [('fps_down', 'CAM_001')])
+        self.assertEqual(self.grabbers['CAM_001'].target_fps, 4.0)
+        self.assertEqual(self.grabbers['CAM_002'].target_fps, 8.0)
+
+        self.assertEqual(self.step({'CAM_001': 0.5}), [('fps_down', 'CAM_001')])
+        self.assertEqual(self.step({'CAM_001': 0.6}), [('input_size_down', None)])
+        self.assertEqual(self.detector.input_size, (576, 576))
+        self.assertEqual(self.step({'CAM_001': 0.6}), [('input_size_down', None)])
+        self.assertEqual(self.step({'CAM_001': 0.6}), [])  # Everything at its floor
+
+        self.assertEqual(self.metrics.governor_decisions.value(action='fps_down', reason='lag'), 2)
+        self.assertEqual(self.metrics.governor_decisions.value(action='input_size_down', reason='lag'), 2)
+        self.assertEqual(self.metrics.analysis_fps.value(camera_id='CAM_001'), 2.0)
+        self.assertEqual(self.metrics.input_size.value(), 512)
+
+    def test_cpu_saturation_slows_every_camera(self):
+        """Test a saturated CPU lowers all cameras' frame rates"""
+        self.cpu = 0.95
+
+        self.assertEqual(self.step({}), [('fps_down', 'CAM_001'), ('fps_down', 'CAM_002')])
+        self.assertEqual(self.metrics.governor_decisions.value(action='fps_down', reason='cpu'), 2)
+
+    def test_recovery_restores_resolution_before_frame_rate(self):
+        """Test calm intervals step quality back up in reverse order with hysteresis"""
+        self.cpu = 0.95
+        for _ in range(3):
+            self.step({})
+        self.assertEqual(self.detector.input_size, (576, 576))
+
+        self.cpu = 0.7  # Between the thresholds: hold
+        self.assertEqual(self.step({}), [])
+        self.cpu = 0.3
+        calm = {'CAM_001': 0.05, 'CAM_002': 0.05}
+        self.assertEqual(self.step(calm), [])
+        self.assertEqual(self.step(calm), [('input_size_up', None)])
+        self.assertEqual(self.detector.input_size, (640, 640))
+        self.step(calm)
+        self.assertEqual(self.step(calm), [('fps_up', 'CAM_001'), ('fps_up', 'CAM_002')])
+        self.assertEqual(self.grabbers['CAM_002'].target_fps, 4.0)
+
+
+class FakeBagDetector:
+    """Detects a backpack in frames whose top-left pixel is bright"""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def detect_batch(self, frames):
+        self.batch_sizes.append(len(frames))
+        return [
+            [{'bbox': [10.0, 10.0, 40.0, 40.0], 'confidence': 0.9,
+              'class_id': 24, 'class_name': 'backpack'}]
+            if frame[0, 0, 0] > 100 else []
+            for frame in frames
+        ]
+
+    def filter_by_size(self, detections, min_area=1000):
+        return detections
+
+
+class TestOfflineAnalysis(unittest.TestCase):
+    """Test segmented offline analysis against a single pass over the video"""
+
+    @classmethod
+    def setUpClass(cls):
+        # 60 s at 10 FPS; a bag is put down after 5 s and never moves
+        cls.path = os.path.join(tempfile.mkdtemp(), 'archive.avi')
+        writer = cv2.VideoWriter(cls.path, cv2.VideoWriter_fourcc(*'MJPG'), 10, (64, 48))
+        for i in range(600):
+            writer.write(np.full((48, 64, 3), 200 if i >= 50 else 0, dtype=np.uint8))
+        writer.release()
+
+    def analyze(self, segment_seconds, overlap_seconds):
+        tracking = {'iou_threshold': 0.3, 'max_age': 30, 'min_hits': 3}
+        detector = FakeBagDetector()
+        results = [
+            analyze_segment(self.path, segment, detector, tracking, target_fps=5, batch_size=4)
+            for segment in plan_segments(60.0, segment_seconds, overlap_seconds)
+        ]
+        return merge_segments(results, left_behind_minutes=0.5), detector
+
+    def test_plan_segments_overlap(self):
+        """Test segments cover the video and start their warm-up early"""
+        segments = plan_segments(250.0, 100.0, 10.0)
+
+        self.assertEqual([s['start'] for s in segments], [0.0, 100.0, 200.0])
+        self.assertEqual([s['warmup_start'] for s in segments], [0.0, 90.0, 190.0])
+        self.assertEqual(segments[-1]['end'], 250.0)
+
+    def test_segments_match_single_pass(self):
+        """Test a bag stationary across segment boundaries is one left-behind event at the same time"""
+        single, _ = self.analyze(segment_seconds=60.0, overlap_seconds=0.0)
+        segmented, detector = self.analyze(segment_seconds=20.0, overlap_seconds=5.0)
+
+        self.assertEqual(segmented['segments'], 3)
+        self.assertEqual(len(segmented['tracks']), 1)
+        self.assertEqual(segmented['tracks'][0]['segments'], [0, 1, 2])
+        self.assertLessEqual(max(detector.batch_sizes), 4)
+
+        single_events = [e for e in single['events'] if e['event'] == 'left_behind']
+        segmented_events = [e for e in segmented['events'] if e['event'] == 'left_behind']
+        self.assertEqual(len(single_events), 1)
+        self.assertEqual(len(segmented_events), 1)
+        self.assertAlmostEqual(segmented_events[0]['time'], single_events[0]['time'], places=3)
+        # Put down at 5 s, left behind 30 s after it became stationary
+        self.assertTrue(35.0 <= single_events[0]['time'] < 38.0)
+
+    def test_merge_short_stays_and_threats(self):
+        """Test short stationary intervals raise no event and repeated threat detections form one event"""
+        track = {
+            'track_id': 1, 'class_id': 24, 'class_name': 'backpack', 'first_seen': 0.0,
+            'last_seen': 30.0, 'first_bbox': [0, 0, 10, 10], 'last_bbox': [0, 0, 10, 10],
+            'max_confidence': 0.9, 'stationary': [[5.0, 20.0]]
+        }
+        threats = [
+            {'time': t, 'threat_type': 'fighting', 'confidence': c}
+            for t, c in [(10.0, 0.8), (12.0, 0.9), (50.0, 0.75)]
+        ]
+        result = {
+            'index': 0, 'warmup_start': 0.0, 'start': 0.0, 'end': 60.0,
+            'frames': 300, 'tracks': [track], 'threats': threats
+        }
+
+        report = merge_segments([result], left_behind_minutes=0.5, threat_gap_seconds=10.0)
+
+        self.assertIsNone(report['tracks'][0]['left_behind_since'])
+        self.assertEqual(
+            [(e['time'], e['end'], e['confidence'], e['detections']) for e in report['events']],
+            [(10.0, 12.0, 0.9, 2), (50.0, 50.0, 0.75, 1)]
+        )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,310 @@
+"""
+Unit Tests for Object Tracking
+"""
+import sys
+import os
+import unittest
+from datetime import datetime, timedelta
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.tracking.object_tracker import ObjectTracker, TrackedObject
+from src.tracking.matching import iou_matrix, match_detections
+
+
+def make_detection(bbox, class_id=0, class_name='backpack', confidence=0.9):
+    return {
+        'bbox': list(bbox),
+        'class_id': class_id,
+        'class_name': class_name,
+        'confidence': confidence
+    }
+
+
+class TestMatching(unittest.TestCase):
+    """Test vectorized IoU and assignment"""
+
+    def test_iou_matrix_matches_pairwise_iou(self):
+        """Test IoU matrix against the scalar implementation"""
+        rng = np.random.default_rng(0)
+        tracker = ObjectTracker()
+        xy = rng.uniform(0, 200, size=(12, 2))
+        wh = rng.uniform(5, 80, size=(12, 2))
+        boxes = np.hstack([xy, xy + wh])
+
+        matrix = iou_matrix(boxes[:5], boxes[5:])
+
+        for i in range(5):
+            for j in range(7):
+                expected = tracker._calculate_iou(boxes[i].tolist(), boxes[5 + j].tolist())
+                self.assertAlmostEqual(matrix[i, j], expected)
+
+    def test_assignment_is_one_to_one_and_class_aware(self):
+        """Test that each track takes at most one same-class detection"""
+        track_boxes = np.array([[0, 0, 10, 10], [100, 100, 110, 110]], dtype=float)
+        det_boxes = np.array([[1, 1, 11, 11], [0, 0, 10, 10], [100, 100, 110, 110]], dtype=float)
+
+        matches, unmatched_dets, unmatched_tracks = match_detections(
+            det_boxes, np.array([0, 0, 1]), track_boxes, np.array([0, 0]), 0.3
+        )
+
+        self.assertEqual(matches, [(1, 0)])
+        self.assertEqual(unmatched_dets, [0, 2])
+        self.assertEqual(unmatched_tracks, [1])
+
+    def test_optimal_assignment_beats_greedy(self):
+        """Test that total IoU is maximized rather than matched greedily"""
+        track_boxes = np.array([[0, 0, 10, 10], [6, 0, 16, 10]], dtype=float)
+        det_boxes = np.array([[3, 0, 13, 10], [-1, 0, 9, 10]], dtype=float)
+
+        matches, _, _ = match_detections(
+            det_boxes, np.zeros(2), track_boxes, np.zeros(2), 0.1
+        )
+
+        self.assertEqual(sorted(matches), [(0, 1), (1, 0)])
+
+
+class TestObjectTracker(unittest.TestCase):
+    """Test ObjectTracker class"""
+
+    def setUp(self):
+        self.tracker = ObjectTracker(min_hits=2, max_age=2)
+        self.start = datetime(2024, 1, 15, 8, 0, 0)
+
+    def test_tracks_persist_across_frames(self):
+        """Test that the same object keeps its track ID"""
+        detection = make_detection([10, 10, 50, 50])
+
+        self.tracker.update([detection], timestamp=self.start)
+        tracks = self.tracker.update([detection], timestamp=self.start + timedelta(seconds=1))
+
+        self.assertEqual(len(tracks), 1)
+        self.assertEqual(tracks[0].track_id, 1)
+
+    def test_stale_tracks_are_removed(self):
+        """Test that tracks older than max_age are dropped"""
+        self.tracker.update([make_detection([10, 10, 50, 50])], timestamp=self.start)
+
+        for i in range(3):
+            self.tracker.update([], timestamp=self.start + timedelta(seconds=i + 1))
+
+        self.assertEqual(len(self.tracker.tracks), 0)
+
+
+    def test_left_behind_after_threshold(self):
+        """Test that a stationary object is flagged after the threshold"""
+        tracker = ObjectTracker(min_hits=2, left_behind_threshold_minutes=1)
+        detection = make_detection([10, 10, 50, 50])
+
+        for i in range(3):
+            tracker.update([detection], timestamp=self.start + timedelta(seconds=i))
+
+        self.assertEqual(tracker.get_left_behind_objects(self.start + timedelta(seconds=30)), [])
+        left_behind = tracker.get_left_behind_objects(self.start + timedelta(seconds=61))
+        self.assertEqual([obj.track_id for obj in left_behind], [1])
+        self.assertTrue(left_behind[0].is_left_behind)
+
+    def test_persons_never_left_behind(self):
+        """Test that person tracks are never flagged"""
+        tracker = ObjectTracker(min_hits=1, left_behind_threshold_minutes=1)
+        tracker.update(
+            [make_detection([10, 10, 50, 50], class_name='person')], timestamp=self.start
+        )
+
+        self.assertEqual(tracker.get_left_behind_objects(self.start + timedelta(hours=2)), [])
+
+
+class TestTrackStore(unittest.TestCase):
+    """Test the array-backed track store and TrackedObject views"""
+
+    def setUp(self):
+        self.start = datetime(2024, 1, 15, 8, 0, 0)
+
+    def test_standalone_tracked_object(self):
+        """Test that TrackedObject still works without a tracker"""
+        obj = TrackedObject(7, [0, 0, 10, 10], 3, 'book', 0.8, self.start)
+        obj.update([5, 0, 15, 10], 0.9, self.start + timedelta(seconds=1))
+
+        self.assertEqual(obj.track_id, 7)
+        self.assertEqual(obj.bbox, [5, 0, 15, 10])
+        self.assertEqual(obj.position_history, [(5.0, 5.0), (10.0, 5.0)])
+        self.assertAlmostEqual(obj.get_movement_distance(), 5.0)
+        self.assertEqual(obj.last_seen, self.start + timedelta(seconds=1))
+
+    def test_position_history_is_bounded(self):
+        """Test the circular position buffer keeps the newest entries"""
+        obj = TrackedObject(1, [0, 0, 2, 2], 0, 'book', 0.8, self.start)
+        for i in range(1, 150):
+            obj.update([i, 0, i + 2, 2], 0.9, self.start + timedelta(seconds=i))
+
+        history = obj.position_history
+        self.assertEqual(len(history), obj.max_history_length)
+        self.assertEqual(history[0], (51.0, 1.0))
+        self.assertEqual(history[-1], (150.0, 1.0))
+
+    def test_removed_track_view_keeps_state(self):
+        """Test that views held after pruning are detached, not reused"""
+        tracker = ObjectTracker(min_hits=1, max_age=1)
+        tracks = tracker.update([make_detection([10, 10, 50, 50])], timestamp=self.start)
+        held = tracks[0]
+        held.alert_sent = True
+
+        tracker.update([], timestamp=self.start + timedelta(seconds=1))
+        tracker.update(
+            [make_detection([200, 200, 240, 240], class_id=1, class_name='bottle')],
+            timestamp=self.start + timedelta(seconds=2)
+        )
+
+        self.assertNotIn(1, tracker.tracks)
+
+        self.assertEqual(held.track_id, 1)
+        self.assertEqual(held.class_name, 'backpack')
+        self.assertTrue(held.alert_sent)
+
+    def test_store_grows_beyond_initial_capacity(self):
+        """Test that many simultaneous tracks are supported"""
+        tracker = ObjectTracker(min_hits=1)
+        detections = [make_detection([i * 20, 0, i * 20 + 10, 10]) for i in range(200)]
+
+        tracks = tracker.update(detections, timestamp=self.start)
+
+        self.assertEqual(len(tracks), 200)
+        self.assertEqual([t.track_id for t in tracks], list(range(1, 201)))
+
+
+class TestMovementAccounting(unittest.TestCase):
+    """Test the incremental movement window against the original loop"""
+
+    @staticmethod
+    def reference_distance(history, window):
+        """Original get_movement_distance implementation"""
+        if len(history) < 2:
+            return 0.0
+        recent = history[-window:]
+        total = 0.0
+        for i in range(1, len(recent)):
+            x1, y1 = recent[i - 1]
+            x2, y2 = recent[i]
+            total += np.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
+        return total
+
+    def test_running_window_matches_original(self):
+        """Test distances over many frames, including ring wrap-around"""
+        rng = np.random.default_rng(42)
+        start = datetime(2024, 1, 15, 8, 0, 0)
+        obj = TrackedObject(1, [100, 100, 140, 140], 0, 'book', 0.9, start)
+        history = [(120.0, 120.0)]
+
+        for frame in range(1, 350):
+            # Alternate between moving and stationary stretches
+            jitter = rng.normal(0, 6.0, size=2) if (frame // 40) % 2 else np.zeros(2)
+            cx, cy = np.array(history[-1]) + jitter
+            obj.update([cx - 20, cy - 20, cx + 20, cy + 20], 0.9, start + timedelta(seconds=frame))
+            history.append((cx, cy))
+            history = history[-obj.max_history_length:]
+
+            for window in (1, 2, 5, 10, 100):
+                self.assertAlmostEqual(
+                    obj.get_movement_distance(window),
+                    self.reference_distance(history, window),
+                    places=6
+                )
+            self.assertEqual(
+                obj.is_moving(threshold=10.0),
+                self.reference_distance(history, 10) > 10.0
+            )
+
+
+
+class TestLeftBehindDeadlines(unittest.TestCase):
+    """Test the left-behind deadline heap against a scan of all tracks"""
+
+    def setUp(self):
+        self.start = datetime(2024, 1, 15, 8, 0, 0)
+
+    @staticmethod
+    def reference_left_behind(tracker, current_time):
+        """Original scan: every confirmed track checked against the threshold"""
+        store = tracker.store
+        slots = store.active_slots()
+        slots = slots[store.hits[slots] >= tracker.min_hits]
+        mask = store.check_left_behind(slots, current_time, tracker.left_behind_threshold_minutes)
+        return store.track_id[slots[mask]].tolist()
+
+    def test_moving_again_restarts_the_deadline(self):
+        """Test an object that moves only becomes left behind a full threshold after stopping"""
+        tracker = ObjectTracker(min_hits=1, left_behind_threshold_minutes=1)
+        for second in range(50):
+            tracker.update([make_detection([10, 10, 50, 50])], self.start + timedelta(seconds=second))
+        # Moved 20 px: stationary again once the jump leaves the movement window
+        for second in range(50, 70):
+            tracker.update([make_detection([30, 10, 70, 50])], self.start + timedelta(seconds=second))
+        stopped = tracker.tracks[1].stationary_since
+
+        self.assertEqual(tracker.get_left_behind_objects(stopped + timedelta(seconds=59)), [])
+        left_behind = tracker.get_left_behind_objects(stopped + timedelta(seconds=60))
+        self.assertEqual([obj.track_id for obj in left_behind], [1])
+        self.assertGreater(stopped, self.start + timedelta(seconds=50))
+
+    def test_unconfirmed_track_is_rechecked_once_confirmed(self):
+        """Test a track past its deadline is flagged as soon as it has min_hits"""
+        tracker = ObjectTracker(min_hits=3, max_age=100, left_behind_threshold_minutes=1)
+        detection = make_detection([10, 10, 50, 50])
+        tracker.update([detection], self.start)
+        tracker.update([detection], self.start + timedelta(seconds=1))
+
+        self.assertEqual(tracker.get_left_behind_objects(self.start + timedelta(seconds=90)), [])
+        tracker.update([detection], self.start + timedelta(seconds=91))
+        left_behind = tracker.get_left_behind_objects(self.start + timedelta(seconds=91))
+        self.assertEqual([obj.track_id for obj in left_behind], [1])
+
+    def test_toggling_tracks_do_not_grow_the_heap(self):
+        """Test stale entries from stop-and-go objects are compacted away"""
+        tracker = ObjectTracker(min_hits=1, left_behind_threshold_minutes=1)
+        tracker.update([make_detection([10, 10, 50, 50]), make_detection([100, 10, 140, 50])], self.start)
+        store = tracker.store
+        slots = store.active_slots()
+
+        for second in range(1, 1000):
+            now = self.start + timedelta(seconds=second)
+            # Alternate every track between stationary and moving
+            store.update_stationary(slots, now, movement_threshold=1e9 if second % 2 else -1.0)
+            self.assertLessEqual(len(store._stationary_heap), store.MIN_HEAP_LIMIT + 1)
+
+        stopped = self.start + timedelta(seconds=999)
+        self.assertEqual(tracker.get_left_behind_objects(stopped + timedelta(seconds=59)), [])
+        left_behind = tracker.get_left_behind_objects(stopped + timedelta(seconds=60))
+        self.assertEqual([obj.track_id for obj in left_behind], [1, 2])
+
+    def test_heap_matches_full_scan(self):
+        """Test random appearing, moving and vanishing objects against the scan"""
+        rng = np.random.default_rng(7)
+        heap_tracker = ObjectTracker(min_hits=2, max_age=3, left_behind_threshold_minutes=1)
+        scan_tracker = ObjectTracker(min_hits=2, max_age=3, left_behind_threshold_minutes=1)
+        positions = {i: np.array([i * 60.0, 0.0]) for i in range(12)}
+
+        for second in range(0, 400, 2):
+            detections = []
+            for i, position in positions.items():
+                if rng.random() < 0.1:
+                    continue  # Missed detection
+                if rng.random() < 0.05:
+                    position += rng.normal(0, 30, size=2)  # Object picked up and moved
+                class_name = 'person' if i == 0 else 'backpack'
+                detections.append(make_detection(
+                    [*position, *(position + 40)], class_id=int(i == 0), class_name=class_name
+                ))
+            now = self.start + timedelta(seconds=second)
+            heap_tracker.update(detections, now)
+            scan_tracker.update(detections, now)
+
+            with self.subTest(second=second):
+                self.assertEqual(
+                    [obj.track_id for obj in heap_tracker.get_left_behind_objects(now)],
+                    self.reference_left_behind(scan_tracker, now)
+                )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,397 @@
+"""
+Unit Tests for Video Input
+"""
+import sys
+import os
+import time
+import tempfile
+import unittest
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.video.frame_grabber import LatestFrameGrabber, is_live_source
+from src.video.frame_reader import FrameSampler, read_sampled
+from src.video.motion_gate import MotionGate
+from src.video.replay import EventTimeline, ReplayClock, replay_frames
+from src.tracking.object_tracker import ObjectTracker
+
+
+class FakeCapture:
+    """Stream stand-in producing numbered frames at a fixed rate"""
+
+    def __init__(self, fps=200.0, fail_after=None):
+        self.interval = 1.0 / fps
+        self.fail_after = fail_after
+        self.fps = fps
+        self.count = 0
+        self.decoded = 0
+        self.released = False
+
+    def isOpened(self):
+        return True
+
+    def grab(self):
+        if self.interval:
+            time.sleep(self.interval)
+        if self.fail_after is not None and self.count >= self.fail_after:
+            return False
+        self.count += 1
+        return True
+
+    def retrieve(self):
+        self.decoded += 1
+        return True, np.full((4, 4), self.count, dtype=np.int32)
+
+    def read(self):
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def get(self, prop):
+        # Position in milliseconds of the last grabbed frame
+        return (self.count - 1) * 1000.0 / self.fps
+
+    def release(self):
+        self.released = True
+
+
+def write_test_video(path, num_frames=20):
+    """Write a small MJPG video whose frames have increasing brightness"""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 10, (64, 48))
+    for i in range(num_frames):
+        writer.write(np.full((48, 64, 3), i * 10 % 256, dtype=np.uint8))
+    writer.release()
+
+
+class TestLatestFrameGrabber(unittest.TestCase):
+    """Test background capture and drop-oldest buffering"""
+
+    def test_slow_consumer_gets_freshest_frame(self):
+        """Test a slow reader skips stale frames and they are counted as dropped"""
+        capture = FakeCapture(fps=200)
+        grabber = LatestFrameGrabber(0, 'CAM_1', live=True, capture_factory=lambda src: capture)
+        grabber.start()
+        try:
+            ret, first = grabber.read(timeout=2)
+            time.sleep(0.2)  # Simulate slow inference
+            ret, frame = grabber.read(timeout=2)
+        finally:
+            grabber.stop()
+
+        self.assertTrue(ret)
+        # The delivered frame is the newest one captured, not the next in line
+        self.assertGreater(int(frame[0, 0]), int(first[0, 0]) + 5)
+        self.assertGreaterEqual(int(frame[0, 0]), capture.count - 2)
+
+        stats = grabber.stats()
+        self.assertGreater(stats['frames_dropped'], 5)
+        self.assertEqual(stats['frames_delivered'], 2)
+        self.assertEqual(
+            stats['frames_captured'] - stats['frames_dropped'] - stats['frames_delivered'],
+            len(grabber._buffer)
+        )
+        self.assertTrue(capture.released)
+
+    def test_fill_is_recorded_before_read_empties_the_buffer(self):
+        """Test a live read reports the backlog it found, not the emptied buffer"""
+        capture = FakeCapture(fps=200)
+        grabber = LatestFrameGrabber(0, 'CAM_1', buffer_size=4, live=True,
+                                     capture_factory=lambda src: capture)
+        grabber.start()
+        try:
+            time.sleep(0.2)
+            ret, _ = grabber.read(timeout=2)
+        finally:
+            grabber.stop()
+
+        self.assertTrue(ret)
+        self.assertEqual(grabber.fill_at_read, 1.0)
+
+    def test_stalled_stream_reconnects(self):
+        """Test a stream that stops delivering frames is reopened"""
+        captures = []
+
+        def factory(src):
+            captures.append(FakeCapture(fps=200, fail_after=3))
+            return captures[-1]
+
+        grabber = LatestFrameGrabber(
+            'rtsp://camera', 'CAM_1', read_timeout=0.05,
+            reconnect_delay=0.01, capture_factory=factory
+        )
+        grabber.start()
+        try:
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline and grabber.reconnects < 2:
+                grabber.read(timeout=0.1)
+        finally:
+            grabber.stop()
+
+        self.assertGreaterEqual(grabber.reconnects, 2)
+        self.assertTrue(all(capture.released for capture in captures))
+        self.assertGreater(grabber.frames_captured, 3)
+
+    def test_video_file_is_read_without_drops(self):
+        """Test file sources deliver every frame and then finish"""
+        path = os.path.join(tempfile.mkdtemp(), 'clip.avi')
+        write_test_video(path, num_frames=20)
+        self.assertFalse(is_live_source(path))
+
+        grabber = LatestFrameGrabber(path, 'CAM_1')
+        self.assertTrue(grabber.start())
+        frames = []
+        try:
+            while True:
+                ret, frame = grabber.read(timeout=5)
+                if not ret:
+                    break
+                frames.append(frame)
+                time.sleep(0.005)
+        finally:
+            grabber.stop()
+
+        self.assertEqual(len(frames), 20)
+        self.assertEqual(grabber.frames_dropped, 0)
+        self.assertTrue(grabber.is_finished)
+
+    def test_missing_file_fails_to_start(self):
+        """Test an unreadable file source reports failure instead of retrying"""
+        grabber = LatestFrameGrabber('missing.avi', 'CAM_1', live=False)
+
+        self.assertFalse(grabber.start())
+        self.assertTrue(grabber.is_finished)
+        self.assertEqual(grabber.read(timeout=0), (False, None))
+
+
+class TestFrameSampling(unittest.TestCase):
+    """Test frame_skip / target FPS sampling and decode skipping"""
+
+    def test_frame_skip_keeps_every_nth_frame(self):
+        """Test fixed-count sampling matches the old frame_count % frame_skip rule"""
+        sampler = FrameSampler(frame_skip=3)
+
+        kept = [i + 1 for i in range(10) if sampler.should_sample(float(i))]
+
+        self.assertEqual(kept, [3, 6, 9])
+        self.assertEqual(sampler.frames_skipped, 7)
+
+    def test_target_fps_samples_by_timestamp(self):
+        """Test a 30 FPS stream sampled at 5 FPS keeps one frame in six"""
+        sampler = FrameSampler(frame_skip=1, target_fps=5)
+
+        kept = [i for i in range(90) if sampler.should_sample(i / 30.0)]
+
+        self.assertEqual(len(kept), 15)
+        self.assertTrue(all(b - a == 6 for a, b in zip(kept, kept[1:])))
+
+    def test_target_fps_resyncs_after_gap(self):
+        """Test a timestamp gap does not cause a burst of catch-up frames"""
+        sampler = FrameSampler(target_fps=10)
+        sampler.should_sample(0.0)
+
+        self.assertTrue(sampler.should_sample(5.0))
+        self.assertFalse(sampler.should_sample(5.05))
+        self.assertTrue(sampler.should_sample(5.1))
+
+    def test_set_target_fps_reschedules_from_last_kept_frame(self):
+        """Test a rate change takes effect from the last kept frame without a burst"""
+        sampler = FrameSampler(target_fps=10)
+        kept = [i for i in range(30) if sampler.should_sample(i / 30.0)]
+        self.assertEqual(kept[-1], 27)
+
+        sampler.set_target_fps(2)
+        kept = [i for i in range(30, 90) if sampler.should_sample(i / 30.0)]
+
+        self.assertEqual(kept, [42, 57, 72, 87])
+
+    def test_set_target_fps_from_another_thread(self):
+        """Test rate changes from another thread never interleave with sampling"""
+        import threading
+
+        sampler = FrameSampler(target_fps=10)
+        stop = threading.Event()
+
+        def toggle():
+            while not stop.is_set():
+                sampler.set_target_fps(None)
+                sampler.set_target_fps(10)
+
+        thread = threading.Thread(target=toggle, daemon=True)
+        thread.start()
+        try:
+            for i in range(20000):
+                sampler.should_sample(i / 30.0)
+        finally:
+            stop.set()
+            thread.join()
+
+        self.assertEqual(sampler.frames_seen, 20000)
+        self.assertEqual(sampler.target_fps, 10)
+
+    def test_read_sampled_only_decodes_selected_frames(self):
+        """Test skipped frames are grabbed but never retrieved"""
+        capture = FakeCapture(fps=30, fail_after=12)
+        capture.interval = 0
+        sampler = FrameSampler(frame_skip=4)
+
+        frames = []
+        while True:
+            ret, frame, timestamp = read_sampled(capture, sampler, use_stream_timestamps=True)
+            if not ret:
+                break
+            frames.append((int(frame[0, 0]), timestamp))
+
+        self.assertEqual([value for value, _ in frames], [4, 8, 12])
+        self.assertAlmostEqual(frames[0][1], 0.1)
+        self.assertEqual(capture.count, 12)
+        self.assertEqual(capture.decoded, 3)
+
+    def test_grabber_samples_video_file(self):
+        """Test the grabber delivers only sampled frames of a file"""
+        path = os.path.join(tempfile.mkdtemp(), 'clip.avi')
+        write_test_video(path, num_frames=20)
+
+        grabber = LatestFrameGrabber(path, 'CAM_1', frame_skip=5)
+        grabber.start()
+        delivered = 0
+        try:
+            while grabber.read(timeout=5)[0]:
+                delivered += 1
+        finally:
+            grabber.stop()
+
+        self.assertEqual(delivered, 4)
+        self.assertEqual(grabber.stats()['frames_not_decoded'], 16)
+
+
+class TestMotionGate(unittest.TestCase):
+    """Test change detection used to skip object detection"""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.scene = rng.integers(0, 256, (240, 320, 3), dtype=np.uint8)
+
+    def with_object(self, size):
+        """Scene with a bright square placed in it"""
+        frame = self.scene.copy()
+        frame[100:100 + size, 150:150 + size] = 255
+        return frame
+
+    def test_static_scene_is_skipped(self):
+        """Test unchanged frames skip detection after the first one"""
+        gate = MotionGate(force_every=0)
+
+        decisions = [gate.check(self.scene.copy()) for _ in range(10)]
+
+        self.assertEqual(decisions, [True] + [False] * 9)
+        self.assertAlmostEqual(gate.stats()['skip_ratio'], 0.9)
+
+    def test_change_triggers_detection(self):
+        """Test a new object in the scene triggers detection"""
+        gate = MotionGate(force_every=0)
+        gate.check(self.scene)
+
+        self.assertTrue(gate.check(self.with_object(40)))
+        self.assertFalse(gate.check(self.with_object(40)))
+
+    def test_slow_change_accumulates(self):
+        """Test small per-frame changes add up against the last detected frame"""
+        gate = MotionGate(force_every=0, min_changed_ratio=0.02)
+        gate.check(self.scene)
+
+        decisions = [gate.check(self.with_object(size)) for size in (8, 16, 24, 32, 40)]
+
+        self.assertFalse(decisions[0])
+        self.assertTrue(any(decisions))
+
+    def test_periodic_forced_detection(self):
+        """Test detection is forced every N frames in a static scene"""
+        gate = MotionGate(force_every=4)
+
+        decisions = [gate.check(self.scene) for _ in range(9)]
+
+        self.assertEqual(decisions, [True, False, False, False, True, False, False, False, True])
+        self.assertEqual(gate.stats()['forced'], 2)
+
+    def test_mog2_settles_on_static_scene(self):
+        """Test the MOG2 background model stops flagging a static scene"""
+        gate = MotionGate(method='mog2', force_every=0)
+
+        decisions = [gate.check(self.scene) for _ in range(10)]
+
+        self.assertTrue(decisions[0])
+        self.assertFalse(any(decisions[5:]))
+        self.assertTrue(gate.check(self.with_object(60)))
+
+
+
+class TestReplay(unittest.TestCase):
+    """Test deterministic replay driven by frame timestamps"""
+
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), 'clip.avi')
+
+    def test_replay_frames_yields_pts(self):
+        """Test every sampled frame is delivered with its stream timestamp"""
+        write_test_video(self.path, num_frames=20)
+
+        timestamps = [pts for _, pts in replay_frames(self.path, target_fps=2)]
+
+        self.assertEqual(len(timestamps), 4)
+        for pts, expected in zip(timestamps, [0.0, 0.5, 1.0, 1.5]):
+            self.assertAlmostEqual(pts, expected, places=3)
+
+    def test_left_behind_fires_at_video_time(self):
+        """Test a 60 s recording replays in well under 60 s with the same left-behind time"""
+        write_test_video(self.path, num_frames=600)
+        clock = ReplayClock(datetime(2024, 1, 1, 8, 0, 0))
+        tracker = ObjectTracker(min_hits=3, left_behind_threshold_minutes=0.5, clock=clock)
+        bag = {'bbox': [10.0, 10.0, 30.0, 30.0], 'confidence': 0.9, 'class_id': 24, 'class_name': 'backpack'}
+
+        start = time.perf_counter()
+        first_left_behind = None
+        for _, pts in replay_frames(self.path):
+            clock.advance(pts)
+            tracked = tracker.update([dict(bag)])
+            if tracker.get_left_behind_objects() and first_left_behind is None:
+                first_left_behind = pts
+        elapsed = time.perf_counter() - start
+
+        obj = tracked[0]
+        self.assertLess(elapsed, 30.0)
+        self.assertIsNotNone(first_left_behind)
+        # Left behind exactly 30 s of video time after becoming stationary
+        stationary_offset = (obj.stationary_since - clock.start).total_seconds()
+        self.assertAlmostEqual(first_left_behind - stationary_offset, 30.0, delta=0.11)
+        self.assertAlmostEqual(obj.time_stationary, clock.offset - stationary_offset, places=3)
+
+    def test_clock_never_goes_backwards(self):
+        """Test a smaller PTS does not move the replay clock back"""
+        clock = ReplayClock(datetime(2024, 1, 1))
+        clock.advance(5.0)
+        clock.advance(4.0)
+
+        self.assertEqual(clock(), datetime(2024, 1, 1, 0, 0, 5))
+
+    def test_timeline_applies_cooldown_in_video_time(self):
+        """Test repeated alerts for one track are recorded once within the cooldown"""
+        clock = ReplayClock(datetime(2024, 1, 1))
+        timeline = EventTimeline(clock)
+        camera = {'id': 'CAM_1', 'name': 'Hall', 'location': 'Hall'}
+        obj = {'track_id': 7, 'class_name': 'backpack', 'confidence': 0.9, 'bbox': [0, 0, 1, 1]}
+
+        self.assertTrue(timeline.send_left_behind_alert(object_info=obj, camera_info=camera, cooldown_minutes=1))
+        clock.advance(30.0)
+        self.assertFalse(timeline.send_left_behind_alert(object_info=obj, camera_info=camera, cooldown_minutes=1))
+        clock.advance(61.0)
+        self.assertTrue(timeline.send_left_behind_alert(object_info=obj, camera_info=camera, cooldown_minutes=1))
+
+        self.assertEqual([event['video_time'] for event in timeline.events], [0.0, 61.0])
+
+
+if __name__ == '__main__':
+    unittest.main()